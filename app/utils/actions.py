@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+
+from app.utils import emergency, member_match, reminder, roster
+
+# ---------------------------------------
+# Menu actions without input()/print()
+# ---------------------------------------
+# The same operations as the run_all.py menu, taking plain arguments and
+# returning JSON-friendly values, so they can be served to many sessions
+# (see server.py). Invalid input raises ValueError with a message fit to
+# show the member. Heavy modules (bcrypt, transformers, matplotlib) are
+# imported on first use and then shared by every session in the process.
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def login(username, password):
+    """The member's roster record, or ValueError on bad credentials."""
+    from auth import authenticate_user
+    record = authenticate_user(username, password)
+    if not record:
+        raise ValueError("Invalid credentials.")
+    return _jsonable({k: v for k, v in record.items() if k != "Password"})
+
+# ---------------------------------------
+# Reminders
+# ---------------------------------------
+def add_reminder(member, title, date_str, times, frequency="once", notes=""):
+    frequency = frequency.strip().lower()
+    if frequency not in reminder.FREQUENCIES:
+        raise ValueError(f"Frequency must be one of {', '.join(reminder.FREQUENCIES)}.")
+    try:
+        return reminder.create_reminder(member, title.strip(), notes.strip(), date_str, times.strip(), frequency)
+    except ValueError:
+        raise ValueError("Invalid date format.") from None
+
+def upcoming_reminders(member, days=7):
+    return _jsonable(reminder.upcoming_alerts(member, days=int(days)))
+
+def mark_taken(member, reminder_id):
+    """Record the current dose of one of the member's reminders."""
+    from app.utils import adherence
+    df = reminder.load_reminders(member)
+    rows = df[(df["Username"] == member) & (df["ID"] == reminder_id)]
+    rem = reminder.parse_reminder(rows.iloc[0].to_dict()) if not rows.empty else None
+    if rem is None:
+        raise ValueError("No such reminder.")
+    entry = adherence.mark_taken(rem)
+    if not entry:
+        raise ValueError("No dose due for this reminder right now.")
+    return _jsonable(entry)
+
+# ---------------------------------------
+# Messaging
+# ---------------------------------------
+def send_message(member, to, message, language="en"):
+    """Send to one or more exact member names (use find_members to resolve them)."""
+    from app.utils import messaging
+    names = [to] if isinstance(to, str) else list(to)
+    resolved = roster.resolve_members(names)
+    unknown = [n for n, r in zip(names, resolved) if r is None]
+    if unknown:
+        raise ValueError(f"Unknown member(s): {', '.join(unknown)}")
+    if language != "en" and language not in messaging.model_map:
+        raise ValueError(f"Unsupported language: {language}")
+    return _jsonable(messaging.deliver(member, resolved, message, language))
+
+def inbox(member):
+    from app.utils import messaging
+    return messaging.messages_for(member)
+
+def find_members(member, name):
+    """Roster names containing `name` (case-insensitive)."""
+    df = roster.load_roster()
+    return df.loc[df["Member Name"].str.lower().str.contains(name.strip().lower(), regex=False), "Member Name"].tolist()
+
+def members_like_me(member, page=1):
+    members, total = member_match.members_like_me(member, int(page))
+    return {"members": _jsonable(members), "total": total, "page": int(page)}
+
+# ---------------------------------------
+# Emergencies
+# ---------------------------------------
+def raise_emergency(member, cause):
+    details = emergency.fetch_member_details(member)
+    if not details:
+        raise ValueError("Your member details were not found in the roster.")
+    emergency.log_emergency(details, cause)
+    return {"logged": True}
+
+def list_emergencies(member):
+    return emergency.view_emergencies()
+
+def resolve_emergency(member, index):
+    if not emergency.mark_resolved(int(index)):
+        raise ValueError("Invalid index.")
+    return {"resolved": True}
+
+# ---------------------------------------
+# Health
+# ---------------------------------------
+def record_health(member, temperature, systolic, diastolic, heart_rate, cholesterol):
+    from app.utils import health_checkup
+    try:
+        values = float(temperature), int(systolic), int(diastolic), int(heart_rate), int(cholesterol)
+    except (TypeError, ValueError):
+        raise ValueError("Please enter numeric values.") from None
+    df = roster.load_roster()
+    row = roster.member_lookup().get(roster.normalize_name(member))
+    age = pd.to_numeric(df.at[row, "Age"], errors="coerce") if row is not None and "Age" in df.columns else None
+    age = None if age is None or pd.isna(age) else int(age)
+    return _jsonable(health_checkup.record_health_checkup(member, *values, age))
+
+def view_health_trends(member):
+    """Latest readings with trend labels, plus a rendered chart."""
+    from app.utils import health_charts, health_checkup, health_trends
+    user_df = health_checkup.load_trend_data(member)
+    if user_df.empty:
+        return {"readings": 0, "trends": {}, "chart": None}
+    trends = health_trends.compute_member_trends(user_df).iloc[0]
+    summary = {}
+    for m in ["Temperature (°F)", "Heart Rate (bpm)", "Systolic BP", "Diastolic BP", "Cholesterol (mg/dL)"]:
+        values = user_df[m].tolist()
+        slope = trends[health_trends.VITAL_KEYS[m] + "_slope"]
+        summary[m] = {"first": values[0], "last": values[-1], "trend": health_trends.trend_label(m, slope, values)}
+    chart = health_charts.render_chart(member, user_df)
+    return _jsonable({"readings": len(user_df), "trends": summary, "chart": chart})
+
+# ---------------------------------------
+# Songs
+# ---------------------------------------
+def find_song(member, lyrics, k=5):
+    """Local keyword index first, then the semantic index; [] if neither matches."""
+    from app.utils import lyrics_embeddings, lyrics_index
+    if len(lyrics.strip()) < 3:
+        raise ValueError("Please provide a longer lyric snippet.")
+    if lyrics_index.is_enabled():
+        results = lyrics_index.search(lyrics, k=int(k))
+        if results:
+            return results
+    if lyrics_embeddings.is_enabled():
+        return lyrics_embeddings.search(lyrics, k=int(k))
+    return []
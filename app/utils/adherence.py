@@ -0,0 +1,195 @@
+import os
+import csv
+import json
+from datetime import datetime, timedelta
+
+from app.utils import reminder, storage
+from app.utils.health_checkup import BASE_DIR
+
+# ---------------------------------------
+# Per-occurrence medication adherence
+# ---------------------------------------
+# Every dose occurrence is one row in an append-only log. Statistics are
+# folded in incrementally from the last processed byte offset, so marking a
+# dose and reading a dashboard never re-scan the whole history. Rows arrive
+# out of dose order (a sweep logs misses after later doses were marked), so
+# missed streaks are settled in Scheduled Time order once a row falls behind
+# the sweep horizon; only rows past it are kept in the stats file.
+ADHERENCE_LOG = os.path.join(BASE_DIR, "logs", "adherence_log.csv")
+ADHERENCE_STATS = os.path.join(BASE_DIR, "logs", "adherence_stats.json")
+LOG_COLUMNS = ["Reminder ID", "Username", "Medicine", "Scheduled Time", "Taken Time", "Status"]
+
+ON_TIME_WINDOW = timedelta(minutes=60)   # taken within this of the dose time counts as on time
+EARLY_WINDOW = timedelta(hours=2)        # a dose can be marked this long before it is due
+MISSED_GRACE = timedelta(hours=2)        # unmarked this long after the dose time -> Missed
+ALERT_LEAD = timedelta(hours=3)          # how far before a dose its alerts can fire
+SWEEP_LOOKBACK = timedelta(days=7)       # how far back the first sweep looks for missed doses
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def dose_reminder(rem):
+    """The reminder with its alerts narrowed to the dose times themselves."""
+    return rem._replace(offsets=rem.doses or rem.offsets)
+
+# ---------------------------------------
+# Log writes
+# ---------------------------------------
+def _append_rows(rows, path=ADHERENCE_LOG):
+    storage.append_rows(path, rows, LOG_COLUMNS)
+
+def record_dose(rem, scheduled, taken_at=None, status=None, path=ADHERENCE_LOG):
+    """Append one dose occurrence. O(1)."""
+    if status is None:
+        status = "Taken" if taken_at - scheduled <= ON_TIME_WINDOW else "Late"
+    row = {
+        "Reminder ID": rem.id,
+        "Username": rem.username,
+        "Medicine": rem.title,
+        "Scheduled Time": scheduled.strftime(TIME_FORMAT),
+        "Taken Time": taken_at.strftime(TIME_FORMAT) if taken_at else "",
+        "Status": status,
+    }
+    _append_rows([row], path)
+    return row
+
+# ---------------------------------------
+# Incremental statistics
+# ---------------------------------------
+def _new_counts():
+    return {"taken": 0, "late": 0, "missed": 0, "streak": 0, "max_streak": 0, "settled": [0, 0], "open": []}
+
+def load_stats(stats_path=ADHERENCE_STATS):
+    try:
+        with open(stats_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"offset": 0, "header": None, "swept_until": None,
+                "members": {}, "medicines": {}, "reminders": {}}
+
+def _fold(stats, row):
+    status = row["Status"].strip().lower()
+    member = row["Username"].strip().lower()
+    for bucket, key in (("members", member), ("medicines", f"{member}|{row['Medicine'].strip().lower()}")):
+        counts = stats[bucket].setdefault(key, _new_counts())
+        if status in counts:
+            counts[status] += 1
+        counts.setdefault("open", []).append([row["Scheduled Time"], status == "missed"])
+    stats["reminders"].setdefault(row["Reminder ID"], []).append(row["Scheduled Time"])
+
+def _horizon(stats):
+    """Doses scheduled before this are final: no sweep or mark can log them again."""
+    if stats["swept_until"]:
+        return stats["swept_until"]
+    return (datetime.now() - MISSED_GRACE - SWEEP_LOOKBACK).strftime(TIME_FORMAT)
+
+def _settle(stats):
+    """Recompute missed streaks in Scheduled Time order, folding rows behind
+    the horizon into the settled streak and dropping recorded dose times
+    no sweep or mark will look at again."""
+    horizon = _horizon(stats)
+    for bucket in ("members", "medicines"):
+        for counts in stats[bucket].values():
+            streak, longest = counts.get("settled", [counts["streak"], counts["max_streak"]])
+            pending = sorted(counts.get("open", []))
+            done = 0
+            for scheduled, missed in pending:
+                streak = streak + 1 if missed else 0
+                longest = max(longest, streak)
+                if scheduled < horizon:
+                    counts["settled"] = [streak, longest]
+                    done += 1
+            counts["open"] = pending[done:]
+            counts["streak"], counts["max_streak"] = streak, longest
+    for rid, times in list(stats["reminders"].items()):
+        kept = [t for t in times if t >= horizon]
+        if kept:
+            stats["reminders"][rid] = kept
+        else:
+            del stats["reminders"][rid]
+
+def update_stats(path=ADHERENCE_LOG, stats_path=ADHERENCE_STATS, swept_until=None):
+    """Fold log rows appended since the last update into the stats file."""
+    with storage.FileLock(stats_path):
+        stats = load_stats(stats_path)
+        if not os.path.exists(path) and swept_until is None:
+            return stats
+        data = b""
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                f.seek(stats["offset"])
+                data = f.read()
+        end = data.rfind(b"\n") + 1
+        lines = data[:end].decode("utf-8").splitlines()
+        if stats["header"] is None and lines:
+            stats["header"] = next(csv.reader(lines[:1]))
+            lines = lines[1:]
+        for row in csv.DictReader(lines, fieldnames=stats["header"]):
+            _fold(stats, row)
+        stats["offset"] += end
+        if swept_until is not None:
+            stats["swept_until"] = swept_until.strftime(TIME_FORMAT)
+        _settle(stats)
+        storage.write_json(stats_path, stats)
+    return stats
+
+def on_time_rate(counts):
+    total = counts["taken"] + counts["late"] + counts["missed"]
+    return counts["taken"] / total if total else None
+
+def recorded_times(stats, reminder_id):
+    return [datetime.strptime(t, TIME_FORMAT) for t in stats["reminders"].get(reminder_id, [])]
+
+def is_recorded(stats, reminder_id, alert_time):
+    """Whether the dose an alert belongs to has been logged (taken or missed)."""
+    return any(alert_time <= t <= alert_time + ALERT_LEAD for t in recorded_times(stats, reminder_id))
+
+# ---------------------------------------
+# Marking doses & sweeping missed ones
+# ---------------------------------------
+def pending_dose(rem, stats, now=None):
+    """The dose occurrence a 'mark as taken' now refers to: the earliest
+    unrecorded dose already due (up to MISSED_GRACE ago), else the next one
+    within EARLY_WINDOW ahead of now (None if there is none)."""
+    now = now or datetime.now()
+    recorded = set(recorded_times(stats, rem.id))
+    doses = [t for t in reminder.iter_occurrences(dose_reminder(rem), now - MISSED_GRACE, now + EARLY_WINDOW)
+             if t not in recorded]
+    due = [t for t in doses if t <= now]
+    return (due or doses or [None])[0]
+
+def mark_taken(rem, now=None):
+    """Log the pending dose of a reminder as taken; returns the log row or None."""
+    now = now or datetime.now()
+    scheduled = pending_dose(rem, update_stats(), now)
+    if scheduled is None:
+        return None
+    row = record_dose(rem, scheduled, taken_at=now)
+    update_stats()
+    return row
+
+def sweep_missed(now=None):
+    """Log every dose that passed MISSED_GRACE without being marked.
+
+    Only the time range since the previous sweep (or SWEEP_LOOKBACK on the
+    first run) is expanded.
+    """
+    now = now or datetime.now()
+    stats = update_stats()
+    until = now - MISSED_GRACE
+    since = datetime.strptime(stats["swept_until"], TIME_FORMAT) if stats["swept_until"] else until - SWEEP_LOOKBACK
+    if until <= since:
+        return 0
+
+    rows = []
+    for rem in reminder.iter_reminders():
+        recorded = set(recorded_times(stats, rem.id))
+        for scheduled in reminder.iter_occurrences(dose_reminder(rem), since, until):
+            if scheduled not in recorded and scheduled >= rem.start:
+                rows.append({
+                    "Reminder ID": rem.id, "Username": rem.username, "Medicine": rem.title,
+                    "Scheduled Time": scheduled.strftime(TIME_FORMAT), "Taken Time": "", "Status": "Missed",
+                })
+    rows.sort(key=lambda r: r["Scheduled Time"])
+    if rows:
+        _append_rows(rows)
+    update_stats(swept_until=until)
+    return len(rows)
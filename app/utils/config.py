@@ -1,5 +1,8 @@
 import os
-GOOGLE_SHEET_CSV_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vT8IArJoxgQ2EL2fQJn_rUVozWqJbz-n0Qn42rTMDHHZezCbn5MEa-0TcvRfPiEGPyDj3W96LkRFwSH/pub?gid=19136775&single=true&output=csv"
+# HOSLA_ROSTER_CSV points every roster read at a local CSV instead of the
+# Google Sheet (benchmarks, offline testing)
+LOCAL_ROSTER_CSV = os.environ.get("HOSLA_ROSTER_CSV") or None
+GOOGLE_SHEET_CSV_URL = LOCAL_ROSTER_CSV or "https://docs.google.com/spreadsheets/d/e/2PACX-1vT8IArJoxgQ2EL2fQJn_rUVozWqJbz-n0Qn42rTMDHHZezCbn5MEa-0TcvRfPiEGPyDj3W96LkRFwSH/pub?gid=19136775&single=true&output=csv"
 IMAGE_DIR = "data/Hosla_Members_Pic"
 MESSAGE_LOG_PATH = "logs/message_logs.csv"
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
\ No newline at end of file
@@ -1,30 +1,31 @@
-import csv
 import datetime
-import requests
-from app.utils import config
+from app.utils import log_partitions, profiling, roster, storage
 
 EMERGENCY_LOG = "logs/emergency_logs.csv"
+EMERGENCY_COLUMNS = ["Member Name", "Locality", "City", "Pin Code", "Contact", "Time", "Cause", "Status", "Resolved At"]
 
 def fetch_member_details(user_name):
-    """Fetch user details from Google Sheets CSV"""
-    response = requests.get(config.GOOGLE_SHEET_CSV_URL)
-    response.raise_for_status()
-    rows = list(csv.DictReader(response.text.splitlines()))
-    
-    for row in rows:
-        if row["Member Name"].strip().lower() == user_name.strip().lower():
-            return {
-                "name": row["Member Name"],
-                "locality": row.get("Locality", "N/A"),
-                "city": row.get("City", "N/A"),
-                "pin": row.get("Pin Code", "N/A"),
-                "contact": row.get("Contact", "N/A")
-            }
-    return None
+    """Member's contact details from the (cached) roster, or None."""
+    df = roster.load_roster()
+    row = roster.member_lookup().get(roster.normalize_name(user_name))
+    if row is None:
+        return None
+    member = df.loc[row]
+    return {
+        "name": member["Member Name"],
+        "locality": member.get("Locality", "N/A"),
+        "city": member.get("City", "N/A"),
+        "pin": member.get("Pin Code", "N/A"),
+        "contact": member.get("Contact", "N/A")
+    }
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+@profiling.timed("emergency.log")
 def log_emergency(details, cause):
     """Log emergency to CSV"""
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    now = _now()
     entry = {
         "Member Name": details["name"],
         "Locality": details["locality"],
@@ -35,39 +36,53 @@ def log_emergency(details, cause):
         "Cause": cause,
         "Status": "Pending"
     }
-    
-    file_exists = False
-    try:
-        with open(EMERGENCY_LOG, "r", encoding="utf-8") as f:
-            file_exists = True
-    except FileNotFoundError:
-        pass
-    
-    with open(EMERGENCY_LOG, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=entry.keys())
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow(entry)
+    if log_partitions.is_enabled("emergencies"):
+        log_partitions.append("emergencies", [entry], EMERGENCY_COLUMNS)
+    else:
+        storage.append_rows(EMERGENCY_LOG, [entry], EMERGENCY_COLUMNS)
+
+def _listed_months():
+    """Partition months the emergency list reads: those with pending
+    emergencies, plus the current month for recently resolved ones."""
+    return sorted(set(log_partitions.pending_months("emergencies")) | {log_partitions.current_month()})
+
+def older_resolved_hidden(all_months=False):
+    """Whether view_emergencies leaves out resolved emergencies of earlier months."""
+    return not all_months and log_partitions.is_enabled("emergencies")
 
-def view_emergencies():
-    """View all emergencies with Pending first, then Resolved."""
-    try:
-        with open(EMERGENCY_LOG, "r", encoding="utf-8") as f:
-            emergencies = list(csv.DictReader(f))
-            # Sort so Pending comes before Resolved
-            emergencies.sort(key=lambda e: 0 if e["Status"] == "Pending" else 1)
-            return emergencies
-    except FileNotFoundError:
-        return []
+@profiling.timed("emergency.read")
+def view_emergencies(all_months=False):
+    """View emergencies with Pending first, then Resolved. With monthly
+    partitions, resolved ones are listed from the current month only
+    unless all_months is set."""
+    if log_partitions.is_enabled("emergencies"):
+        emergencies = log_partitions.read_rows("emergencies", in_months=None if all_months else _listed_months())
+    else:
+        emergencies = storage.read_rows(EMERGENCY_LOG)
+    # Sort so Pending comes before Resolved
+    emergencies.sort(key=lambda e: 0 if e["Status"] == "Pending" else 1)
+    return emergencies
 
-def mark_resolved(index):
+@profiling.timed("emergency.resolve")
+def mark_resolved(index, all_months=False):
     """Mark emergency as resolved"""
-    emergencies = view_emergencies()
-    if 0 <= index < len(emergencies):
-        emergencies[index]["Status"] = "Resolved"
-        with open(EMERGENCY_LOG, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=emergencies[0].keys())
-            writer.writeheader()
-            writer.writerows(emergencies)
-        return True
+    if log_partitions.is_enabled("emergencies"):
+        # Same order as view_emergencies; only the row's month is rewritten
+        in_months = None if all_months else _listed_months()
+        located = sorted(log_partitions.iter_rows("emergencies", origin=True, in_months=in_months),
+                         key=lambda e: 0 if e[0]["Status"] == "Pending" else 1)
+        if not 0 <= index < len(located):
+            return False
+        row, origin = located[index]
+        return log_partitions.update_row(origin, row, {"Status": "Resolved", "Resolved At": _now()})
+    # Read and rewrite under one lock so a concurrent log_emergency isn't lost
+    with storage.FileLock(EMERGENCY_LOG):
+        emergencies = view_emergencies()
+        if 0 <= index < len(emergencies):
+            emergencies[index]["Status"] = "Resolved"
+            emergencies[index]["Resolved At"] = _now()
+            # older logs gain the Resolved At column on their first rewrite
+            header = storage.read_header(EMERGENCY_LOG)
+            storage.rewrite_csv(EMERGENCY_LOG, emergencies, header + [c for c in EMERGENCY_COLUMNS if c not in header])
+            return True
     return False
@@ -0,0 +1,173 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from app.utils import roster, storage
+from app.utils.config import BASE_DIR
+from app.utils.thumbnails import PHOTO_DIR, PHOTO_EXTENSIONS, file_hash
+
+# ---------------------------------------
+# Face index over member photos
+# ---------------------------------------
+# Each member photo is reduced to one 128-d face encoding (face_recognition)
+# and stored in a single matrix, so identifying a face is one vectorized
+# distance computation instead of a comparison per photo:
+#   data/face_index/<version>/encodings.npy   (faces, 128) float32
+#   data/face_index/<version>/faces.json      [{photo, member, sha1, sig}] per row
+# Builds publish a new version directory (storage.new_version), so lookups
+# during a rebuild keep reading a complete index.
+FACE_DIR = os.path.join(BASE_DIR, "data", "face_index")
+MATCH_THRESHOLD = 0.6   # face_recognition's usual tolerance; lower is stricter
+ENCODING_DIM = 128
+
+def _load_face_recognition():
+    try:
+        import face_recognition
+    except ImportError as e:
+        raise ImportError("Face identification needs face_recognition (pip install face_recognition)") from e
+    return face_recognition
+
+def encode_faces(path, largest_only=False):
+    """Face encodings in a photo, largest face first."""
+    face_recognition = _load_face_recognition()
+    image = face_recognition.load_image_file(path)
+    locations = face_recognition.face_locations(image)
+    locations.sort(key=lambda box: (box[2] - box[0]) * (box[1] - box[3]), reverse=True)
+    if largest_only:
+        locations = locations[:1]
+    return np.asarray(face_recognition.face_encodings(image, locations), dtype=np.float32).reshape(-1, ENCODING_DIM)
+
+def _encode_job(path):
+    try:
+        faces = encode_faces(path, largest_only=True)
+        return (faces[0] if len(faces) else None), None
+    except Exception as e:  # one bad photo must not stop the batch
+        return None, str(e)
+
+def photo_members():
+    """{photo file name: Member Name} from the roster's Profile Picture column."""
+    try:
+        df = roster.load_roster()
+    except Exception:  # offline: fall back to names derived from file names
+        return {}
+    if "Profile Picture" not in df.columns:
+        return {}
+    return {os.path.basename(p): n for p, n in zip(df["Profile Picture"], df["Member Name"]) if p}
+
+def member_from_filename(name):
+    return " ".join(os.path.splitext(name)[0].replace("-", "_").split("_")).title()
+
+def _read_version(version_dir):
+    if version_dir is None:
+        return np.empty((0, ENCODING_DIM), dtype=np.float32), []
+    with open(os.path.join(version_dir, "faces.json"), "r", encoding="utf-8") as f:
+        faces = json.load(f)
+    return np.load(os.path.join(version_dir, "encodings.npy")), faces
+
+def load_index(face_dir=FACE_DIR):
+    """(encodings, faces); an empty index if none has been built."""
+    return _read_version(storage.current_version(face_dir))
+
+# ---------------------------------------
+# Build
+# ---------------------------------------
+def build(photo_dir=PHOTO_DIR, face_dir=FACE_DIR, workers=None, full=False):
+    """Encode new and changed photos in a process pool; unchanged ones keep their row.
+
+    Returns a report dict (photos, encoded, unchanged, removed, no_face, failed).
+    """
+    old_encodings, old_faces = (np.empty((0, ENCODING_DIM), dtype=np.float32), []) if full else load_index(face_dir)
+    by_photo = {face["photo"]: i for i, face in enumerate(old_faces)}
+    by_hash = {face["sha1"]: i for i, face in enumerate(old_faces)}
+    members = photo_members()
+    report = {"photos": 0, "encoded": 0, "unchanged": 0, "removed": 0, "no_face": [], "failed": {}}
+
+    rows, faces, todo = [], [], []
+    names = sorted(n for n in os.listdir(photo_dir) if n.lower().endswith(PHOTO_EXTENSIONS)) \
+        if os.path.isdir(photo_dir) else []
+    for name in names:
+        st = os.stat(os.path.join(photo_dir, name))
+        sig = [st.st_mtime_ns, st.st_size]
+        face = {"photo": name, "member": members.get(name) or member_from_filename(name), "sig": sig}
+        report["photos"] += 1
+        i = by_photo.get(name)
+        if i is not None and old_faces[i]["sig"] == sig:
+            face["sha1"] = old_faces[i]["sha1"]
+        else:
+            face["sha1"] = file_hash(os.path.join(photo_dir, name))
+            i = by_hash.get(face["sha1"])  # renamed or touched but identical photo
+        if i is not None:
+            rows.append(old_encodings[i])
+            faces.append(face)
+            report["unchanged"] += 1
+        else:
+            todo.append(face)
+    report["removed"] = len(set(by_photo) - set(names))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_encode_job, [os.path.join(photo_dir, f["photo"]) for f in todo])
+            for face, (encoding, error) in zip(todo, results):
+                if error:
+                    report["failed"][face["photo"]] = error
+                elif encoding is None:
+                    report["no_face"].append(face["photo"])
+                else:
+                    rows.append(encoding)
+                    faces.append(face)
+                    report["encoded"] += 1
+
+    encodings = np.asarray(rows, dtype=np.float32).reshape(-1, ENCODING_DIM)
+    version_dir = storage.new_version(face_dir)
+    np.save(os.path.join(version_dir, "encodings.npy"), encodings)
+    with open(os.path.join(version_dir, "faces.json"), "w", encoding="utf-8") as f:
+        json.dump(faces, f, ensure_ascii=False, indent=1)
+    storage.publish_version(face_dir, version_dir)
+    return report
+
+# ---------------------------------------
+# Query
+# ---------------------------------------
+_loaded = {"key": None}
+
+def _index(face_dir):
+    """Encodings and faces, reloaded only when a new version is published."""
+    version_dir = storage.current_version(face_dir)
+    key = (face_dir, version_dir)
+    if _loaded["key"] != key:
+        encodings, faces = _read_version(version_dir)
+        _loaded.update(key=key, encodings=encodings, faces=faces,
+                       sq_norms=np.einsum("ij,ij->i", encodings, encodings))
+    return _loaded
+
+def nearest(queries, k=3, threshold=MATCH_THRESHOLD, face_dir=FACE_DIR):
+    """For each query encoding, up to k members within threshold, closest first:
+    [[{member, photo, distance}]]. A member matching on several photos is listed once."""
+    index = _index(face_dir)
+    queries = np.asarray(queries, dtype=np.float32).reshape(-1, ENCODING_DIM)
+    if not len(index["faces"]) or not len(queries):
+        return [[] for _ in queries]
+    # |q - e|^2 = |q|^2 - 2 q.e + |e|^2, for all queries and faces at once
+    d2 = (np.einsum("ij,ij->i", queries, queries)[:, None] - 2 * queries @ index["encodings"].T
+          + index["sq_norms"][None, :])
+    distances = np.sqrt(np.maximum(d2, 0))
+    pool = min(distances.shape[1], k * 4)
+    matches = []
+    for row in distances:
+        top = np.argpartition(row, pool - 1)[:pool] if pool < len(row) else np.arange(len(row))
+        found, seen = [], set()
+        for i in top[np.argsort(row[top])]:
+            face = index["faces"][i]
+            if row[i] > threshold or len(found) == k:
+                break
+            if face["member"] in seen:
+                continue
+            seen.add(face["member"])
+            found.append({"member": face["member"], "photo": face["photo"], "distance": round(float(row[i]), 3)})
+        matches.append(found)
+    return matches
+
+def identify(photo_path, k=3, threshold=MATCH_THRESHOLD, face_dir=FACE_DIR):
+    """Members matching each face in a photo, largest face first."""
+    return nearest(encode_faces(photo_path), k, threshold, face_dir)
@@ -0,0 +1,197 @@
+import os
+import json
+import math
+import sqlite3
+import pandas as pd
+
+from app.utils import health_checkup
+from app.utils.health_checkup import BASE_DIR
+
+# ---------------------------------------
+# Per-member running health aggregates
+# ---------------------------------------
+# One small JSON state per member in a SQLite side store, updated as each
+# record is written. Summaries and "above your usual" alerts read a single
+# row instead of re-scanning health_data.csv.
+AGG_DB = os.path.join(BASE_DIR, "data", "health_aggregates.db")
+
+VITALS = ["Temperature (°F)", "Systolic BP", "Diastolic BP", "Heart Rate (bpm)", "Cholesterol (mg/dL)"]
+WINDOW = 10          # readings kept per vital for rolling mean/std
+EWMA_ALPHA = 0.3
+MIN_HISTORY = 3      # readings needed before "usual" alerts fire
+ALERT_SIGMAS = 2.0
+MIN_STD = {          # floor so a very stable history doesn't alert on noise
+    "Temperature (°F)": 0.5,
+    "Systolic BP": 5.0,
+    "Diastolic BP": 4.0,
+    "Heart Rate (bpm)": 5.0,
+    "Cholesterol (mg/dL)": 10.0,
+}
+
+def is_enabled(db_path=AGG_DB):
+    """Aggregates are maintained once the side store has been built (see rebuild)."""
+    return os.path.exists(db_path)
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("CREATE TABLE IF NOT EXISTS aggregates (patient TEXT PRIMARY KEY, state TEXT NOT NULL)")
+    return conn
+
+def _key(name):
+    return str(name).strip().lower()
+
+# ---------------------------------------
+# State updates
+# ---------------------------------------
+def _new_state(name):
+    return {
+        "name": name,
+        "count": 0,
+        "last_timestamp": None,
+        "flag_counts": {},
+        "vitals": {v: {"min": None, "max": None, "ewma": None, "window": []} for v in VITALS},
+    }
+
+def _readings_from_record(record):
+    """Vital values from a record in record_health_checkup's format."""
+    bp = str(record.get("Blood Pressure (mmHg)", "")).split("/")
+    raw = {
+        "Temperature (°F)": record.get("Temperature (°F)"),
+        "Systolic BP": bp[0] if len(bp) == 2 else None,
+        "Diastolic BP": bp[1] if len(bp) == 2 else None,
+        "Heart Rate (bpm)": record.get("Heart Rate (bpm)"),
+        "Cholesterol (mg/dL)": record.get("Cholesterol (mg/dL)"),
+    }
+    readings = {}
+    for vital, value in raw.items():
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            continue
+        if not math.isnan(value):
+            readings[vital] = value
+    return readings
+
+def _apply(state, timestamp, readings, flags):
+    state["count"] += 1
+    state["last_timestamp"] = timestamp
+    for flag in str(flags).split(", "):
+        if flag and flag != "Normal":
+            state["flag_counts"][flag] = state["flag_counts"].get(flag, 0) + 1
+    for vital, value in readings.items():
+        v = state["vitals"][vital]
+        v["min"] = value if v["min"] is None else min(v["min"], value)
+        v["max"] = value if v["max"] is None else max(v["max"], value)
+        v["ewma"] = value if v["ewma"] is None else EWMA_ALPHA * value + (1 - EWMA_ALPHA) * v["ewma"]
+        v["window"] = (v["window"] + [value])[-WINDOW:]
+    return state
+
+def update(record, db_path=AGG_DB):
+    """Fold one new record into its member's aggregates. O(1)."""
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        key = _key(record["Patient Name"])
+        row = conn.execute("SELECT state FROM aggregates WHERE patient = ?", (key,)).fetchone()
+        state = json.loads(row[0]) if row else _new_state(record["Patient Name"])
+        _apply(state, record.get("Timestamp"), _readings_from_record(record), record.get("Flags", ""))
+        conn.execute("INSERT OR REPLACE INTO aggregates (patient, state) VALUES (?, ?)",
+                     (key, json.dumps(state, ensure_ascii=False)))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def update_many(records, db_path=AGG_DB):
+    """Fold many records (in time order) in a single transaction."""
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        states = {}
+        for record in records:
+            key = _key(record["Patient Name"])
+            if key not in states:
+                row = conn.execute("SELECT state FROM aggregates WHERE patient = ?", (key,)).fetchone()
+                states[key] = json.loads(row[0]) if row else _new_state(record["Patient Name"])
+            _apply(states[key], record.get("Timestamp"), _readings_from_record(record), record.get("Flags", ""))
+        conn.executemany("INSERT OR REPLACE INTO aggregates (patient, state) VALUES (?, ?)",
+                         [(k, json.dumps(s, ensure_ascii=False)) for k, s in states.items()])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return len(states)
+
+def rebuild(csv_path=None, db_path=AGG_DB, chunksize=100_000):
+    """Recompute every member's aggregates from the full health history."""
+    csv_paths = [csv_path] if csv_path else health_checkup.health_data_files()
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    _connect(db_path).close()
+
+    members = set()
+    for path in csv_paths:
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+            if "Patient Name" not in chunk.columns:
+                continue
+            chunk = chunk[chunk["Patient Name"].notna()].fillna("")
+            members.update(chunk["Patient Name"].map(_key))
+            update_many(chunk.to_dict("records"), db_path)
+    return len(members)
+
+# ---------------------------------------
+# Reads
+# ---------------------------------------
+def get(username, db_path=AGG_DB):
+    """A member's aggregate state, or None."""
+    if not is_enabled(db_path):
+        return None
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT state FROM aggregates WHERE patient = ?", (_key(username),)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row else None
+
+def rolling_stats(state, vital):
+    """(mean, std) over the member's last WINDOW readings of a vital."""
+    window = state["vitals"][vital]["window"]
+    if not window:
+        return None, None
+    mean = sum(window) / len(window)
+    std = math.sqrt(sum((x - mean) ** 2 for x in window) / len(window))
+    return mean, std
+
+def trend_summary(state, last_n=5):
+    """Summary lines comparing the first and last of the recent readings."""
+    lines = []
+    for vital in VITALS:
+        values = state["vitals"][vital]["window"][-last_n:]
+        if not values:
+            continue
+        trend = "increasing" if values[-1] > values[0] else "decreasing" if values[-1] < values[0] else "stable"
+        mean, std = rolling_stats(state, vital)
+        lines.append(f"{vital}: {values[0]:g} → {values[-1]:g} ({trend}, usual {mean:.1f} ± {std:.1f})")
+    return lines
+
+def usual_alerts(record, state=None, db_path=AGG_DB):
+    """Alerts for vitals in record that are well above or below the member's
+    usual (rolling mean ± ALERT_SIGMAS std). Call before update()."""
+    state = state or get(record["Patient Name"], db_path)
+    if not state or state["count"] < MIN_HISTORY:
+        return []
+    alerts = []
+    for vital, value in _readings_from_record(record).items():
+        mean, std = rolling_stats(state, vital)
+        if mean is None or len(state["vitals"][vital]["window"]) < MIN_HISTORY:
+            continue
+        band = ALERT_SIGMAS * max(std, MIN_STD[vital])
+        if value > mean + band:
+            alerts.append(f"📈 Your {vital} ({value:g}) is above your usual ({mean:.1f}).")
+        elif value < mean - band:
+            alerts.append(f"📉 Your {vital} ({value:g}) is below your usual ({mean:.1f}).")
+    return alerts
@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from app.utils import health_checkup
+from app.utils.health_checkup import BASE_DIR
+from app.utils.storage import FileLock, write_json
+
+# ---------------------------------------
+# Headless chart rendering with a fingerprint cache
+# ---------------------------------------
+CHART_DIR = os.path.join(BASE_DIR, "data", "charts")
+CACHE_FILE = "chart_cache.json"
+CHART_VERSION = 1  # bump when plot_trends changes so cached charts are redrawn
+
+FINGERPRINT_COLUMNS = ["Timestamp", "Flags"] + [col for col, _, _ in health_checkup.TREND_METRICS]
+
+def chart_path(username, fmt="png", out_dir=CHART_DIR):
+    return os.path.join(out_dir, f"health_trends_{username.strip().lower()}.{fmt}")
+
+def fingerprint(user_df, fmt="png"):
+    """Stable hash of the data a chart is drawn from."""
+    hashed = pd.util.hash_pandas_object(user_df[FINGERPRINT_COLUMNS].astype(str), index=False)
+    digest = hashlib.sha1(hashed.to_numpy().tobytes())
+    digest.update(f"{CHART_VERSION}:{fmt}".encode())
+    return digest.hexdigest()
+
+def _cache_path(out_dir):
+    return os.path.join(out_dir, CACHE_FILE)
+
+def load_cache(out_dir=CHART_DIR):
+    try:
+        with open(_cache_path(out_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _update_cache(entries, out_dir):
+    """Merge {path: fingerprint} entries into the cache file atomically."""
+    with FileLock(_cache_path(out_dir)):
+        cache = load_cache(out_dir)
+        cache.update(entries)
+        write_json(_cache_path(out_dir), cache, indent=1)
+
+def _is_fresh(cache, path, digest):
+    return cache.get(os.path.basename(path)) == digest and os.path.exists(path)
+
+def _draw(username, user_df, path):
+    """Render one chart with the Agg canvas (no display or pyplot state)."""
+    fig = Figure(figsize=(12, 15))
+    FigureCanvasAgg(fig)
+    health_checkup.plot_trends(fig, user_df, username)
+    fig.savefig(path)
+    return path
+
+def render_chart(username, user_df=None, fmt="png", out_dir=CHART_DIR, force=False):
+    """Write a member's trend chart to out_dir, skipping unchanged data."""
+    if user_df is None:
+        user_df = health_checkup.load_trend_data(username)
+    if user_df.empty:
+        return None
+    os.makedirs(out_dir, exist_ok=True)
+    path = chart_path(username, fmt, out_dir)
+    digest = fingerprint(user_df, fmt)
+    if not force and _is_fresh(load_cache(out_dir), path, digest):
+        return path
+    _draw(username, user_df, path)
+    _update_cache({os.path.basename(path): digest}, out_dir)
+    return path
+
+def render_all_charts(fmt="png", out_dir=CHART_DIR, workers=None, force=False, last_n=5):
+    """Render every member's chart across a process pool.
+
+    Fingerprints are checked up front so only members whose readings changed
+    are sent to the pool. Returns (rendered, skipped) counts.
+    """
+    df = health_checkup.load_trend_data(last_n=last_n)
+    if df.empty:
+        return 0, 0
+    os.makedirs(out_dir, exist_ok=True)
+    cache = load_cache(out_dir)
+
+    jobs, digests, skipped = [], {}, 0
+    keys = df["Patient Name"].astype(str).str.strip().str.lower()
+    for _, user_df in df.groupby(keys, sort=False):
+        username = str(user_df["Patient Name"].iloc[0]).strip()
+        path = chart_path(username, fmt, out_dir)
+        digest = fingerprint(user_df, fmt)
+        if not force and _is_fresh(cache, path, digest):
+            skipped += 1
+            continue
+        jobs.append((username, user_df.reset_index(drop=True), path))
+        digests[os.path.basename(path)] = digest
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_draw, *zip(*jobs), chunksize=max(1, len(jobs) // 64)))
+        _update_cache(digests, out_dir)
+    return len(jobs), skipped
@@ -1,17 +1,23 @@
 import os
+import csv
+import io
+import numpy as np
 import pandas as pd
 from datetime import datetime
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+from app.utils import profiling, shards, storage
+
 # Fallback if config is missing
 try:
     from app.utils.config import BASE_DIR
 except ImportError:
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Google Sheet CSV link
-SHEET_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vT8IArJoxgQ2EL2fQJn_rUVozWqJbz-n0Qn42rTMDHHZezCbn5MEa-0TcvRfPiEGPyDj3W96LkRFwSH/pub?gid=19136775&single=true&output=csv"
+# Google Sheet CSV link (or the local roster stand-in)
+from app.utils.config import GOOGLE_SHEET_CSV_URL as SHEET_URL
 
 # ---------------------------------------
 # Fetch exact member name & age
@@ -33,20 +39,66 @@ def load_user_info(username: str):
 # ---------------------------------------
 # Health CSV loader
 # ---------------------------------------
+HEALTH_COLUMNS = [
+    "Timestamp", "Patient Name", "Age",
+    "Temperature (°F)", "Blood Pressure (mmHg)",
+    "Heart Rate (bpm)", "Cholesterol (mg/dL)",
+    "Flags", "Advice"
+]
+
 def load_health_data(filename="health_data.csv"):
     """Load or create the health data CSV."""
     file_path = os.path.join(BASE_DIR, "data", filename)
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     if not os.path.exists(file_path):
-        df = pd.DataFrame(columns=[
-            "Timestamp", "Patient Name", "Age",
-            "Temperature (°F)", "Blood Pressure (mmHg)",
-            "Heart Rate (bpm)", "Cholesterol (mg/dL)",
-            "Flags", "Advice"
-        ])
+        df = pd.DataFrame(columns=HEALTH_COLUMNS)
         df.to_csv(file_path, index=False)
     return file_path
 
+def health_data_files():
+    """The CSV file(s) holding health records: every member shard when the
+    sharded layout is enabled, otherwise the single health data CSV."""
+    if shards.is_enabled("health"):
+        return list(shards.paths("health").values())
+    return [load_health_data()]
+
+# ---------------------------------------
+# Append-only writes
+# ---------------------------------------
+def _upgrade_header(file_path, header):
+    """One-time rewrite adding missing HEALTH_COLUMNS to an older-schema file."""
+    missing = [c for c in HEALTH_COLUMNS if c not in header]
+    df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+    storage.rewrite_frame(file_path, df.reindex(columns=header + missing, fill_value=""))
+    return header + missing
+
+@profiling.timed("health.append")
+def append_health_records(records, file_path=None):
+    """Append records to the health CSV without rewriting existing rows.
+
+    Rows are written in the file's own column order under an exclusive lock,
+    then flushed and fsync'ed, so concurrent recorders never interleave and a
+    crash can at worst lose the row being written. Without an explicit
+    file_path and with the sharded layout enabled, each record goes to its
+    member's shard instead.
+    """
+    if file_path is None and shards.is_enabled("health"):
+        shards.append("health", records, HEALTH_COLUMNS)
+        return
+    file_path = file_path or load_health_data()
+    with storage.FileLock(file_path):
+        header = storage.read_header(file_path)
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        if not header:
+            header = list(HEALTH_COLUMNS)
+            writer.writerow(header)
+        elif any(c not in header for c in HEALTH_COLUMNS):
+            header = _upgrade_header(file_path, header)
+        for record in records:
+            writer.writerow([record.get(c, "") for c in header])
+        storage.append_bytes(file_path, buf.getvalue().encode("utf-8"))
+
 # ---------------------------------------
 # Generate advice with age-specific tips
 # ---------------------------------------
@@ -100,12 +152,73 @@ def generate_advice(temp_f, systolic, diastolic, heart_rate, cholesterol, age=No
 
     return ", ".join(flags) if flags else "Normal", " | ".join(advice)
 
+# ---------------------------------------
+# Vectorized advice for many readings
+# ---------------------------------------
+# Every reading falls into one of 3 temperature x 3 BP x 3 heart-rate x
+# 3 cholesterol bands x senior/not outcomes. The batch version classifies
+# readings with array masks and looks the strings up in a table built by
+# calling generate_advice once per outcome, so results are identical.
+_BAND_SAMPLES = {
+    "temp": [98.6, 101.0, 94.0],
+    "bp": [(120, 70), (140, 70), (85, 70)],
+    "hr": [70, 110, 50],
+    "chol": [150, 250, 220],
+    "age": [None, 60],
+}
+_advice_table = None
+
+def _build_advice_table():
+    global _advice_table
+    if _advice_table is None:
+        flags, advice = [], []
+        for t in _BAND_SAMPLES["temp"]:
+            for s, d in _BAND_SAMPLES["bp"]:
+                for hr in _BAND_SAMPLES["hr"]:
+                    for chol in _BAND_SAMPLES["chol"]:
+                        for age in _BAND_SAMPLES["age"]:
+                            f, a = generate_advice(t, s, d, hr, chol, age)
+                            flags.append(f)
+                            advice.append(a)
+        _advice_table = (np.array(flags, dtype=object), np.array(advice, dtype=object))
+    return _advice_table
+
+def generate_advice_batch(temp_f, systolic=None, diastolic=None, heart_rate=None, cholesterol=None, age=None):
+    """Vectorized generate_advice.
+
+    Accepts either arrays for each vital or a DataFrame as the first argument
+    with the chart column names ("Temperature (°F)", "Systolic BP",
+    "Diastolic BP", "Heart Rate (bpm)", "Cholesterol (mg/dL)", optional "Age").
+    Returns (flags, advice) as object arrays.
+    """
+    if isinstance(temp_f, pd.DataFrame):
+        df = temp_f
+        temp_f, systolic, diastolic = df["Temperature (°F)"], df["Systolic BP"], df["Diastolic BP"]
+        heart_rate, cholesterol = df["Heart Rate (bpm)"], df["Cholesterol (mg/dL)"]
+        age = df["Age"] if "Age" in df.columns else None
+
+    def num(values):
+        return pd.to_numeric(pd.Series(np.asarray(values, dtype=object)), errors="coerce").to_numpy(dtype="float64")
+
+    temp, sys_bp, dia_bp, hr, chol = map(num, (temp_f, systolic, diastolic, heart_rate, cholesterol))
+    ages = num(age) if age is not None else np.full(len(temp), np.nan)
+
+    temp_band = np.select([temp > 100.4, temp < 95], [1, 2], 0)
+    bp_band = np.select([(sys_bp > 130) | (dia_bp > 80), (sys_bp < 90) | (dia_bp < 60)], [1, 2], 0)
+    hr_band = np.select([hr > 100, hr < 60], [1, 2], 0)
+    chol_band = np.select([chol >= 240, (chol >= 200) & (chol < 240)], [1, 2], 0)
+    senior = ((ages >= 50) & (ages <= 100)).astype(int)
+
+    code = (((temp_band * 3 + bp_band) * 3 + hr_band) * 3 + chol_band) * 2 + senior
+    flags, advice = _build_advice_table()
+    return flags[code], advice[code]
+
 # ---------------------------------------
 # Record a health checkup
 # ---------------------------------------
+@profiling.timed("health.record")
 def record_health_checkup(username, temp_f, systolic, diastolic, heart_rate, cholesterol, age=None):
     """Record a health checkup with flags and advice."""
-    file_path = load_health_data()
     bp = f"{systolic}/{diastolic}"
     flags, advice = generate_advice(temp_f, systolic, diastolic, heart_rate, cholesterol, age)
 
@@ -121,68 +234,95 @@ def record_health_checkup(username, temp_f, systolic, diastolic, heart_rate, cho
         "Advice": advice
     }
 
-    # Safe append to CSV
-    if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-        df = pd.read_csv(file_path)
-    else:
-        df = pd.DataFrame(columns=new_record.keys())
+    append_health_records([new_record])
 
-    df = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
-    df.to_csv(file_path, index=False)
+    from app.utils import health_store, health_aggregates
+    if health_store.is_enabled():
+        health_store.append_record(new_record)
+    if health_aggregates.is_enabled():
+        alerts = health_aggregates.usual_alerts(new_record)
+        health_aggregates.update(new_record)
+        new_record["Alerts"] = alerts
 
     return new_record
 
 # ---------------------------------------
-# Generate health trends and summary
+# Trend data loaders
 # ---------------------------------------
-def generate_trends(username):
-    """Plot clear health trends with subplots for easy interpretation."""
-    file_path = load_health_data()  # Ensure this is defined elsewhere
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        print("📭 No health records found yet.")
-        return
+def _add_bp_columns(df):
+    """Split the "120/80" BP strings into numeric Systolic/Diastolic columns."""
+    bp_values = df["Blood Pressure (mmHg)"].astype(str).str.split("/", n=1, expand=True)
+    bp_values = bp_values.reindex(columns=[0, 1])
+    df["Systolic BP"] = pd.to_numeric(bp_values[0], errors="coerce")
+    df["Diastolic BP"] = pd.to_numeric(bp_values[1], errors="coerce")
+    return df
 
-    df = pd.read_csv(file_path)
-    user_df = df[df["Patient Name"].str.strip().str.lower() == username.strip().lower()]
+@profiling.timed("health.load_trend")
+def load_trend_data(username=None, last_n=5):
+    """Last `last_n` chart-ready readings for one member (or every member if
+    username is None), sorted by Timestamp. last_n=None returns all of them."""
+    from app.utils import health_store
+    if health_store.is_enabled():
+        # Typed store: reads only the rows needed, BP already numeric
+        if username is not None:
+            return health_store.load(patient=username, last_n=last_n, display=True)
+        df = health_store.load(display=True)
+        if last_n is None:
+            return df
+        return df.groupby("Patient Name", observed=True, sort=False).tail(last_n).reset_index(drop=True)
 
-    if user_df.empty:
-        print(f"📭 No health records found for {username}.")
-        return
+    if shards.is_enabled("health"):
+        # Sharded layout: a single member's history is one small file
+        df = shards.read("health", username) if username is not None else shards.read_all("health")
+    else:
+        file_path = load_health_data()
+        if os.path.getsize(file_path) == 0:
+            return pd.DataFrame()
+        df = pd.read_csv(file_path)
+    if "Patient Name" not in df.columns:
+        return pd.DataFrame()
+    df = df[df["Patient Name"].notna()]
+    if username is not None:
+        df = df[df["Patient Name"].str.strip().str.lower() == username.strip().lower()]
+    if df.empty:
+        return df
 
-    # Convert timestamp to datetime
-    user_df["Timestamp"] = pd.to_datetime(user_df["Timestamp"])
-    user_df = user_df.sort_values("Timestamp").tail(5)
+    df = df.copy()
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+    df = df.sort_values("Timestamp", kind="stable")
+    if last_n is not None:
+        df = df.groupby(df["Patient Name"].str.strip().str.lower(), sort=False).tail(last_n)
+    return _add_bp_columns(df).reset_index(drop=True)
 
-    # Split BP into systolic and diastolic
-    bp_values = user_df["Blood Pressure (mmHg)"].str.split("/", expand=True).astype(float)
-    user_df["Systolic BP"] = bp_values[0]
-    user_df["Diastolic BP"] = bp_values[1]
+# ---------------------------------------
+# Generate health trends and summary
+# ---------------------------------------
+TREND_METRICS = [
+    ("Temperature (°F)", "Temperature (°F)", "green"),
+    ("Systolic BP", "Systolic BP (mmHg)", "blue"),
+    ("Diastolic BP", "Diastolic BP (mmHg)", "cyan"),
+    ("Heart Rate (bpm)", "Heart Rate (bpm)", "orange"),
+    ("Cholesterol (mg/dL)", "Cholesterol (mg/dL)", "purple"),
+]
 
-    # Create subplots
-    fig, axes = plt.subplots(5, 1, figsize=(12, 15), sharex=True)
+def plot_trends(fig, user_df, username):
+    """Draw the five trend subplots for one member onto fig."""
+    axes = fig.subplots(5, 1, sharex=True)
     fig.suptitle(f"📈 Health Trends for {username}", fontsize=16, fontweight="bold")
 
-    metrics = [
-        ("Temperature (°F)", "Temperature (°F)", "green"),
-        ("Systolic BP", "Systolic BP (mmHg)", "blue"),
-        ("Diastolic BP", "Diastolic BP (mmHg)", "cyan"),
-        ("Heart Rate (bpm)", "Heart Rate (bpm)", "orange"),
-        ("Cholesterol (mg/dL)", "Cholesterol (mg/dL)", "purple"),
-    ]
+    abnormal = user_df["Flags"].astype(str) != "Normal"
 
     # Plot each metric separately
-    for ax, (col, ylabel, color) in zip(axes, metrics):
+    for ax, (col, ylabel, color) in zip(axes, TREND_METRICS):
         ax.plot(user_df["Timestamp"], user_df[col], marker='o', color=color, label=col)
 
         # ✅ Format x-axis ticks as dates
         ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
         ax.format_xdata = mdates.DateFormatter("%Y-%m-%d")  # ✅ fixes (x,y) readout
 
-        # Highlight abnormal values in red
-        for i, row in user_df.iterrows():
-            flags = str(row.get("Flags", "Normal"))
-            if flags != "Normal":
-                ax.scatter(row["Timestamp"], row[col], color="red", s=100, zorder=5)
+        # Highlight abnormal values in red (one scatter call per metric)
+        ax.scatter(user_df.loc[abnormal, "Timestamp"], user_df.loc[abnormal, col],
+                   color="red", s=100, zorder=5)
 
         ax.set_ylabel(ylabel, fontsize=10)
         ax.grid(True, linestyle="--", alpha=0.6)
@@ -190,17 +330,67 @@ def generate_trends(username):
 
     # X-axis formatting
     axes[-1].set_xlabel("Date", fontsize=12)
-    plt.xticks(rotation=45)
+    axes[-1].tick_params(axis="x", labelrotation=45)
 
-    plt.tight_layout(rect=[0, 0, 1, 0.96])  # leave space for suptitle
-    plt.show()
+    fig.tight_layout(rect=[0, 0, 1, 0.96])  # leave space for suptitle
+    return axes
 
-    # Trend summaries
+@profiling.timed("health.trends")
+def generate_trends(username, headless=None, fmt="png"):
+    """Plot clear health trends with subplots for easy interpretation.
+
+    In headless mode (the default when matplotlib has no display) the chart
+    is written to data/charts/ instead of being shown.
+    """
+    user_df = load_trend_data(username)
+    if user_df.empty:
+        print(f"📭 No health records found for {username}.")
+        return
+
+    if headless is None:
+        headless = matplotlib.get_backend().lower() == "agg"
+
+    if headless:
+        from app.utils import health_charts
+        with profiling.span("health.chart"):
+            path = health_charts.render_chart(username, user_df, fmt=fmt)
+        print(f"🖼️ Health trend chart saved to {path}")
+    else:
+        fig = plt.figure(figsize=(12, 15))
+        with profiling.span("health.chart"):
+            plot_trends(fig, user_df, username)
+        plt.show()
+
+    # Trend summaries (least-squares slope over the readings shown)
     print(f"\n📊 Weekly Health Trends for {username} (last {len(user_df)} records):")
-    def summarize_trend(metric):
-        values = user_df[metric].tolist()
-        trend = "increasing" if values[-1] > values[0] else "decreasing" if values[-1] < values[0] else "stable"
-        return f"{metric}: {values[0]} → {values[-1]} ({trend})"
+    from app.utils import health_aggregates, health_trends
+    trends = health_trends.compute_member_trends(user_df).iloc[0]
+    state = health_aggregates.get(username)
 
     for m in ["Temperature (°F)", "Heart Rate (bpm)", "Systolic BP", "Diastolic BP", "Cholesterol (mg/dL)"]:
-        print(summarize_trend(m))
+        values = user_df[m].tolist()
+        slope = trends[health_trends.VITAL_KEYS[m] + "_slope"]
+        line = f"{m}: {values[0]} → {values[-1]} ({health_trends.trend_label(m, slope, values)})"
+        if state:
+            mean, std = health_aggregates.rolling_stats(state, m)
+            if mean is not None:
+                line += f" | usual {mean:.1f} ± {std:.1f}"
+        print(line)
+
+# ---------------------------------------
+# Population screening
+# ---------------------------------------
+def screen_latest(df=None):
+    """Flag every member's latest reading in one vectorized pass.
+
+    Returns the at-risk members (Flags != "Normal"), most flags first.
+    """
+    if df is None:
+        df = load_trend_data(last_n=1)
+    if df.empty:
+        return df
+    df = df.copy()
+    df["Flags"], df["Advice"] = generate_advice_batch(df)
+    at_risk = df[df["Flags"] != "Normal"].copy()
+    at_risk["Flag Count"] = at_risk["Flags"].str.count(", ") + 1
+    return at_risk.sort_values(["Flag Count", "Timestamp"], ascending=[False, False]).reset_index(drop=True)
@@ -0,0 +1,180 @@
+import os
+import csv
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+from app.utils import health_checkup, health_store, health_aggregates, roster
+
+# ---------------------------------------
+# Streaming bulk import of device / camp vitals
+# ---------------------------------------
+# Source column names accepted for each field (first match wins).
+COLUMN_ALIASES = {
+    "name": ["Patient Name", "Member Name", "Name", "User", "Patient"],
+    "timestamp": ["Timestamp", "Date", "Datetime", "Recorded At", "Time"],
+    "age": ["Age"],
+    "temperature": ["Temperature (°F)", "Temperature (°C)", "Temperature", "Temp (F)", "Temp (C)", "Temp"],
+    "bp": ["Blood Pressure (mmHg)", "Blood Pressure", "BP"],
+    "systolic": ["Systolic BP", "Systolic", "BP_Systolic", "SBP"],
+    "diastolic": ["Diastolic BP", "Diastolic", "BP_Diastolic", "DBP"],
+    "heart_rate": ["Heart Rate (bpm)", "Heart Rate", "Heart_Rate", "Pulse", "HR"],
+    "cholesterol": ["Cholesterol (mg/dL)", "Cholesterol (mmol/L)", "Cholesterol"],
+}
+MMOL_TO_MGDL = 38.67
+
+# Plausible ranges after unit normalization; rows outside are rejected.
+VALID_RANGES = {
+    "temperature": (85.0, 110.0),
+    "systolic": (60.0, 260.0),
+    "diastolic": (30.0, 160.0),
+    "heart_rate": (25.0, 250.0),
+    "cholesterol": (50.0, 600.0),
+}
+
+def _resolve_columns(columns):
+    found = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            match = next((c for c in columns if c.strip().lower() == alias.lower()), None)
+            if match is not None:
+                found[field] = match
+                break
+    return found
+
+def _fmt(values):
+    return ["" if np.isnan(v) else f"{v:g}" for v in values]
+
+def normalize_chunk(chunk, cols, lookup=None, roster_df=None, celsius=None):
+    """Validate and normalize one chunk.
+
+    Returns (records, rejected) where records is a DataFrame in the health
+    CSV layout and rejected is the offending input rows with a
+    "Reject Reason" column.
+    """
+    reason = pd.Series("", index=chunk.index, dtype=object)
+
+    def reject(mask, why):
+        mask = mask & (reason == "")
+        reason[mask] = why
+
+    def numeric(field):
+        if field not in cols:
+            return pd.Series(np.nan, index=chunk.index)
+        return pd.to_numeric(chunk[cols[field]], errors="coerce")
+
+    names = chunk[cols["name"]].fillna("").astype(str) if "name" in cols else pd.Series("", index=chunk.index)
+    reject(names.str.strip() == "", "missing name")
+
+    member_rows = pd.Series(np.nan, index=chunk.index)
+    if lookup is not None:
+        member_rows = names.map(lambda n: lookup.get(roster.normalize_name(n)))
+        reject(member_rows.isna(), "not in roster")
+
+    timestamps = pd.to_datetime(chunk[cols["timestamp"]], errors="coerce", format="mixed") \
+        if "timestamp" in cols else pd.Series(pd.NaT, index=chunk.index)
+    reject(timestamps.isna(), "invalid timestamp")
+
+    # Temperature: explicit °C column / flag, otherwise any reading < 50 is °C
+    temperature = numeric("temperature")
+    temp_col = cols.get("temperature", "")
+    if celsius or "°c" in temp_col.lower() or "(c)" in temp_col.lower():
+        temperature = temperature * 9 / 5 + 32
+    elif celsius is None:
+        temperature = pd.Series(health_store.to_fahrenheit(temperature), index=chunk.index)
+
+    systolic, diastolic = numeric("systolic"), numeric("diastolic")
+    if "bp" in cols:
+        bp = chunk[cols["bp"]].astype(str).str.split("/", n=1, expand=True).reindex(columns=[0, 1])
+        systolic = systolic.fillna(pd.to_numeric(bp[0], errors="coerce"))
+        diastolic = diastolic.fillna(pd.to_numeric(bp[1], errors="coerce"))
+
+    cholesterol = numeric("cholesterol")
+    if "mmol" in cols.get("cholesterol", "").lower():
+        cholesterol = cholesterol * MMOL_TO_MGDL
+    heart_rate = numeric("heart_rate")
+
+    vitals = {"temperature": temperature, "systolic": systolic, "diastolic": diastolic,
+              "heart_rate": heart_rate, "cholesterol": cholesterol}
+    reject(pd.concat([temperature, systolic, diastolic, heart_rate], axis=1).isna().all(axis=1), "no vitals")
+    reject(systolic.isna() != diastolic.isna(), "partial blood pressure")
+    for field, (low, high) in VALID_RANGES.items():
+        values = vitals[field]
+        reject(values.notna() & ((values < low) | (values > high)), f"{field} out of range")
+
+    age = numeric("age")
+    if roster_df is not None and "Age" in roster_df.columns:
+        roster_age = pd.to_numeric(roster_df["Age"], errors="coerce")
+        age = age.fillna(member_rows.map(roster_age))
+
+    ok = reason == ""
+    rejected = chunk[~ok].assign(**{"Reject Reason": reason[~ok]})
+    if not ok.any():
+        return pd.DataFrame(columns=health_checkup.HEALTH_COLUMNS), rejected
+
+    if lookup is not None:
+        exact = member_rows[ok].astype(int).map(roster_df["Member Name"])
+    else:
+        exact = names[ok].str.strip()
+    v = {k: s[ok].round(1).to_numpy(dtype="float64") for k, s in vitals.items()}
+    ages = age[ok].to_numpy(dtype="float64")
+    flags, advice = health_checkup.generate_advice_batch(
+        v["temperature"], v["systolic"], v["diastolic"], v["heart_rate"], v["cholesterol"], ages
+    )
+    records = pd.DataFrame({
+        "Timestamp": timestamps[ok].dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(),
+        "Patient Name": exact.to_numpy(),
+        "Age": np.where(np.isnan(ages), "Unknown", _fmt(ages)),
+        "Temperature (°F)": _fmt(v["temperature"]),
+        "Blood Pressure (mmHg)": [f"{s}/{d}" if s and d else ""
+                                  for s, d in zip(_fmt(v["systolic"]), _fmt(v["diastolic"]))],
+        "Heart Rate (bpm)": _fmt(v["heart_rate"]),
+        "Cholesterol (mg/dL)": _fmt(v["cholesterol"]),
+        "Flags": flags,
+        "Advice": advice,
+    })
+    return records, rejected
+
+def import_vitals(path, chunksize=50_000, use_roster=True, reject_path=None, celsius=None, dry_run=False):
+    """Stream a vitals export into the health data in bounded-memory chunks.
+
+    Each accepted chunk is appended in one locked write (and mirrored into the
+    typed store / aggregates when those are enabled). Rejected rows go to
+    reject_path with a reason. Returns a report dict.
+    """
+    lookup = roster.member_lookup() if use_roster else None
+    roster_df = roster.load_roster() if use_roster else None
+    report = {"read": 0, "imported": 0, "rejected": 0, "reasons": Counter()}
+    cols = None
+    reject_header_written = False
+
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize, skipinitialspace=True):
+        if cols is None:
+            cols = _resolve_columns(chunk.columns)
+            if "name" not in cols:
+                raise ValueError(f"No patient name column found in {path}")
+        records, rejected = normalize_chunk(chunk, cols, lookup, roster_df, celsius)
+        report["read"] += len(chunk)
+        report["imported"] += len(records)
+        report["rejected"] += len(rejected)
+        report["reasons"].update(rejected["Reject Reason"])
+
+        if reject_path and not rejected.empty:
+            rejected.to_csv(reject_path, mode="a" if reject_header_written else "w",
+                            header=not reject_header_written, index=False, quoting=csv.QUOTE_MINIMAL)
+            reject_header_written = True
+        if dry_run or records.empty:
+            continue
+
+        rows = records.to_dict("records")
+        health_checkup.append_health_records(rows)
+        if health_store.is_enabled():
+            health_store.append_frame(health_store.frame_from_csv(records))
+        if health_aggregates.is_enabled():
+            health_aggregates.update_many(sorted(rows, key=lambda r: r["Timestamp"]))
+
+    return report
+
+def default_reject_path(path):
+    root, _ = os.path.splitext(path)
+    return root + "_rejected.csv"
@@ -0,0 +1,339 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+from app.utils import health_checkup
+from app.utils.health_checkup import BASE_DIR
+from app.utils.storage import FileLock, write_json
+
+# ---------------------------------------
+# Typed columnar health store
+# ---------------------------------------
+# Each column lives in its own raw binary file under STORE_DIR and is read
+# through np.memmap, so a query only pages in the columns (and rows) it uses.
+# meta.json is the commit point: bytes beyond meta["rows"] are ignored and
+# trimmed by the next append, so a crash mid-append never corrupts the store.
+STORE_DIR = os.path.join(BASE_DIR, "data", "health_store")
+META_FILE = "meta.json"
+
+COLUMNS = {
+    "timestamp": "int64",      # seconds since epoch, NaT encoded as int64 min
+    "patient": "int32",        # code into meta["patients"]
+    "prev_row": "int64",       # previous row of the same patient (-1 if none)
+    "age": "int16",            # -1 when unknown
+    "temperature": "float32",  # °F
+    "systolic": "float32",
+    "diastolic": "float32",
+    "heart_rate": "float32",
+    "cholesterol": "float32",
+    "flags": "uint16",         # bitmask over FLAG_NAMES
+}
+VITALS = ["temperature", "systolic", "diastolic", "heart_rate", "cholesterol"]
+
+FLAG_NAMES = [
+    "Fever", "Hypothermia", "High BP", "Low BP",
+    "Tachycardia", "Bradycardia", "High Cholesterol", "Borderline Cholesterol"
+]
+
+DISPLAY_NAMES = {
+    "timestamp": "Timestamp",
+    "patient": "Patient Name",
+    "age": "Age",
+    "temperature": "Temperature (°F)",
+    "systolic": "Systolic BP",
+    "diastolic": "Diastolic BP",
+    "heart_rate": "Heart Rate (bpm)",
+    "cholesterol": "Cholesterol (mg/dL)",
+    "flags": "Flags",
+}
+
+# ---------------------------------------
+# Metadata
+# ---------------------------------------
+def _meta_path(store_dir):
+    return os.path.join(store_dir, META_FILE)
+
+def is_enabled(store_dir=STORE_DIR):
+    """The store is in use once it has been created (e.g. by migrate_from_csv)."""
+    return os.path.exists(_meta_path(store_dir))
+
+def load_meta(store_dir=STORE_DIR):
+    try:
+        with open(_meta_path(store_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _new_meta():
+    return {"rows": 0, "columns": COLUMNS, "patients": [], "last_row": [], "counts": []}
+
+def _save_meta(meta, store_dir):
+    write_json(_meta_path(store_dir), meta)
+
+def _patient_key(name):
+    return str(name).strip().lower()
+
+def patient_code(meta, name):
+    """Code of a patient in meta, or None (case-insensitive)."""
+    key = _patient_key(name)
+    for code, stored in enumerate(meta["patients"]):
+        if _patient_key(stored) == key:
+            return code
+    return None
+
+# ---------------------------------------
+# Conversions
+# ---------------------------------------
+def to_fahrenheit(values):
+    """Readings below 50 can only be °C; convert them to °F."""
+    values = np.asarray(values, dtype="float64")
+    return np.where(values < 50, values * 9 / 5 + 32, values)
+
+def encode_flags(flags):
+    """Encode 'Fever, High BP' style strings into a FLAG_NAMES bitmask."""
+    out = np.zeros(len(flags), dtype="uint16")
+    flags = pd.Series(flags, dtype=object).fillna("").astype(str)
+    for bit, name in enumerate(FLAG_NAMES):
+        has = flags.str.split(", ").apply(lambda parts, n=name: n in parts)
+        out[has.to_numpy(dtype=bool)] |= np.uint16(1 << bit)
+    return out
+
+def decode_flags(mask):
+    """Inverse of encode_flags; 0 decodes to 'Normal'."""
+    mask = np.asarray(mask)
+    names = np.full(len(mask), "", dtype=object)
+    for bit, name in enumerate(FLAG_NAMES):
+        hit = (mask & (1 << bit)) != 0
+        names[hit] = np.where(names[hit] == "", name, names[hit] + ", " + name)
+    names[names == ""] = "Normal"
+    return names
+
+def _fmt(values):
+    """Compact number formatting for CSV export ('' for missing)."""
+    return ["" if np.isnan(v) else f"{v:g}" for v in np.asarray(values, dtype="float64")]
+
+def _pick(df, *names):
+    """First non-null value across the given columns (legacy/current schema)."""
+    result = pd.Series(np.nan, index=df.index, dtype=object)
+    for name in names:
+        if name in df.columns:
+            result = result.where(result.notna(), df[name])
+    return result
+
+def frame_from_csv(df):
+    """Convert rows in any health CSV schema into typed store columns.
+
+    Handles the current layout ("Blood Pressure (mmHg)" = "120/80") as well
+    as the older User/Date/BP_Systolic/... layout. Rows without a patient
+    name are dropped.
+    """
+    df = df.replace("", np.nan)
+    names = _pick(df, "Patient Name", "User")
+    df = df[names.notna()]
+    names = names[names.notna()].astype(str).str.strip()
+
+    bp = _pick(df, "Blood Pressure (mmHg)").astype(str).str.split("/", n=1, expand=True)
+    bp = bp.reindex(columns=[0, 1])
+    systolic = pd.to_numeric(bp[0], errors="coerce")
+    diastolic = pd.to_numeric(bp[1], errors="coerce")
+    systolic = systolic.fillna(pd.to_numeric(_pick(df, "BP_Systolic"), errors="coerce"))
+    diastolic = diastolic.fillna(pd.to_numeric(_pick(df, "BP_Diastolic"), errors="coerce"))
+
+    timestamps = pd.to_datetime(_pick(df, "Timestamp", "Date"), errors="coerce")
+    seconds = timestamps.to_numpy(dtype="datetime64[ns]").astype("datetime64[s]").astype("int64")
+
+    out = pd.DataFrame({
+        "patient_name": names.to_numpy(),
+        "timestamp": seconds,
+        "age": pd.to_numeric(_pick(df, "Age"), errors="coerce").fillna(-1).to_numpy(),
+        "temperature": to_fahrenheit(pd.to_numeric(_pick(df, "Temperature (°F)", "Temperature"), errors="coerce")),
+        "systolic": systolic.to_numpy(),
+        "diastolic": diastolic.to_numpy(),
+        "heart_rate": pd.to_numeric(_pick(df, "Heart Rate (bpm)", "Heart_Rate"), errors="coerce").to_numpy(),
+        "cholesterol": pd.to_numeric(_pick(df, "Cholesterol (mg/dL)"), errors="coerce").to_numpy(),
+    })
+
+    flags = _pick(df, "Flags").to_numpy(dtype=object, copy=True)
+    missing = pd.isna(flags)
+    if missing.any():
+        computed, _ = health_checkup.generate_advice_batch(
+            *(out[v].to_numpy()[missing] for v in VITALS)
+        )
+        flags[missing] = computed
+    out["flags"] = encode_flags(flags)
+    return out
+
+# ---------------------------------------
+# Writes
+# ---------------------------------------
+def append_frame(frame, store_dir=STORE_DIR):
+    """Append rows produced by frame_from_csv. Cost is O(len(frame))."""
+    if frame.empty:
+        return 0
+    os.makedirs(store_dir, exist_ok=True)
+    with FileLock(_meta_path(store_dir)):
+        meta = load_meta(store_dir) or _new_meta()
+        start = meta["rows"]
+
+        lookup = {_patient_key(p): code for code, p in enumerate(meta["patients"])}
+        codes = np.empty(len(frame), dtype="int32")
+        for i, name in enumerate(frame["patient_name"]):
+            key = _patient_key(name)
+            if key not in lookup:
+                lookup[key] = len(meta["patients"])
+                meta["patients"].append(name)
+                meta["last_row"].append(-1)
+                meta["counts"].append(0)
+            codes[i] = lookup[key]
+
+        # Chain each row to the previous row of the same patient
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        first = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+        prev = np.empty(len(frame), dtype="int64")
+        prev[order[~first]] = start + order[np.flatnonzero(~first) - 1]
+        last_row = np.asarray(meta["last_row"], dtype="int64")
+        prev[order[first]] = last_row[sorted_codes[first]]
+        last = np.r_[first[1:], True]
+        for code, row in zip(sorted_codes[last], order[last]):
+            meta["last_row"][code] = int(start + row)
+        for code, count in zip(*np.unique(codes, return_counts=True)):
+            meta["counts"][code] += int(count)
+
+        data = {
+            "timestamp": frame["timestamp"].to_numpy(),
+            "patient": codes,
+            "prev_row": prev,
+            "age": frame["age"].to_numpy(),
+            "temperature": frame["temperature"].to_numpy(),
+            "systolic": frame["systolic"].to_numpy(),
+            "diastolic": frame["diastolic"].to_numpy(),
+            "heart_rate": frame["heart_rate"].to_numpy(),
+            "cholesterol": frame["cholesterol"].to_numpy(),
+            "flags": frame["flags"].to_numpy(),
+        }
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(store_dir, name + ".bin")
+            itemsize = np.dtype(dtype).itemsize
+            with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+                f.truncate(start * itemsize)
+                f.seek(start * itemsize)
+                f.write(np.asarray(data[name]).astype(dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        meta["rows"] = start + len(frame)
+        _save_meta(meta, store_dir)
+    return len(frame)
+
+def append_record(record, store_dir=STORE_DIR):
+    """Append one record in record_health_checkup's CSV format."""
+    return append_frame(frame_from_csv(pd.DataFrame([record], dtype=object)), store_dir)
+
+def migrate_from_csv(csv_path=None, store_dir=STORE_DIR, chunksize=100_000, overwrite=False):
+    """Build the store from the health CSV, streaming it in chunks."""
+    csv_paths = [csv_path] if csv_path else health_checkup.health_data_files()
+    if is_enabled(store_dir):
+        if not overwrite:
+            raise FileExistsError(f"Health store already exists at {store_dir}")
+        shutil.rmtree(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    _save_meta(_new_meta(), store_dir)
+
+    total = 0
+    for path in csv_paths:
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+            total += append_frame(frame_from_csv(chunk), store_dir)
+    return total
+
+# ---------------------------------------
+# Reads
+# ---------------------------------------
+def open_column(name, store_dir=STORE_DIR, meta=None):
+    """Memory-map one column (read-only)."""
+    meta = meta or load_meta(store_dir)
+    dtype = COLUMNS[name]
+    if not meta or meta["rows"] == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(os.path.join(store_dir, name + ".bin"), dtype=dtype,
+                     mode="r", shape=(meta["rows"],))
+
+def patient_rows(name, last_n=None, store_dir=STORE_DIR, meta=None):
+    """Row numbers of a patient's records (ascending), following the
+    prev_row chain so only the rows actually returned are touched."""
+    meta = meta or load_meta(store_dir)
+    code = patient_code(meta, name) if meta else None
+    if code is None:
+        return np.empty(0, dtype="int64")
+    count = meta["counts"][code] if last_n is None else min(last_n, meta["counts"][code])
+    prev_row = open_column("prev_row", store_dir, meta)
+    rows = np.empty(count, dtype="int64")
+    row = meta["last_row"][code]
+    for i in range(count - 1, -1, -1):
+        rows[i] = row
+        row = prev_row[row]
+    return rows
+
+def load(columns=None, patient=None, last_n=None, store_dir=STORE_DIR, display=False):
+    """Load selected columns as a DataFrame.
+
+    With patient set only that member's rows are read; last_n keeps the most
+    recent N of them. display=True renames columns to the CSV/chart names and
+    decodes flags.
+    """
+    meta = load_meta(store_dir)
+    columns = list(columns or [c for c in COLUMNS if c != "prev_row"])
+    if patient is not None:
+        rows = patient_rows(patient, last_n, store_dir, meta)
+    else:
+        total = meta["rows"] if meta else 0
+        rows = np.arange(max(0, total - last_n) if last_n else 0, total)
+
+    out = {}
+    for name in columns:
+        values = np.asarray(open_column(name, store_dir, meta)[rows])
+        if name == "timestamp":
+            values = pd.to_datetime(values.astype("datetime64[s]"))
+        elif name == "patient":
+            values = pd.Categorical.from_codes(values, categories=meta["patients"]) if meta else values
+        elif name == "age":
+            values = pd.array(np.where(values < 0, pd.NA, values), dtype="Int16")
+        elif name == "flags" and display:
+            values = decode_flags(values)
+        elif name in VITALS and display:
+            values = values.astype("float64").round(1)
+        out[name] = values
+    df = pd.DataFrame(out)
+    if "timestamp" in df.columns:
+        df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    return df.rename(columns=DISPLAY_NAMES) if display else df
+
+def export_csv(csv_path, store_dir=STORE_DIR, chunksize=100_000):
+    """Write the store back out in record_health_checkup's CSV format."""
+    meta = load_meta(store_dir)
+    total = meta["rows"] if meta else 0
+    pd.DataFrame(columns=health_checkup.HEALTH_COLUMNS).to_csv(csv_path, index=False)
+    cols = {name: open_column(name, store_dir, meta) for name in COLUMNS}
+    for start in range(0, total, chunksize):
+        sl = slice(start, min(start + chunksize, total))
+        chunk = {name: np.asarray(col[sl]) for name, col in cols.items()}
+        # float32 -> readings as entered (e.g. 100.4 must not classify as > 100.4)
+        chunk.update({v: chunk[v].astype("float64").round(1) for v in VITALS})
+        _, advice = health_checkup.generate_advice_batch(
+            *(chunk[v] for v in VITALS), age=np.where(chunk["age"] < 0, np.nan, chunk["age"])
+        )
+        ts = pd.to_datetime(chunk["timestamp"].astype("datetime64[s]"))
+        pd.DataFrame({
+            "Timestamp": ts.strftime("%Y-%m-%d %H:%M:%S"),
+            "Patient Name": np.asarray(meta["patients"], dtype=object)[chunk["patient"]],
+            "Age": np.where(chunk["age"] < 0, "Unknown", chunk["age"].astype(str)),
+            "Temperature (°F)": _fmt(chunk["temperature"]),
+            "Blood Pressure (mmHg)": [f"{s}/{d}" for s, d in zip(_fmt(chunk["systolic"]), _fmt(chunk["diastolic"]))],
+            "Heart Rate (bpm)": _fmt(chunk["heart_rate"]),
+            "Cholesterol (mg/dL)": _fmt(chunk["cholesterol"]),
+            "Flags": decode_flags(chunk["flags"]),
+            "Advice": advice,
+        }).to_csv(csv_path, mode="a", header=False, index=False)
+    return total
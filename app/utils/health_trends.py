@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from app.utils import health_checkup, health_store
+
+# ---------------------------------------
+# Population-wide trend engine
+# ---------------------------------------
+# Slopes, percentage change and volatility for every vital of every member,
+# computed from grouped sums in one vectorized pass (no per-member loop).
+VITAL_KEYS = {
+    "Temperature (°F)": "temperature",
+    "Systolic BP": "systolic",
+    "Diastolic BP": "diastolic",
+    "Heart Rate (bpm)": "heart_rate",
+    "Cholesterol (mg/dL)": "cholesterol",
+}
+
+# Change over 30 days that counts as one unit of deterioration. Rising values
+# are treated as worse, except temperature where any drift counts.
+DETERIORATION_SCALE = {
+    "Temperature (°F)": 1.0,
+    "Systolic BP": 10.0,
+    "Diastolic BP": 5.0,
+    "Heart Rate (bpm)": 10.0,
+    "Cholesterol (mg/dL)": 20.0,
+}
+STABLE_FRACTION = 0.1  # |30-day change| below this share of the scale is "stable"
+
+def load_history(window_days=None):
+    """Every member's readings (only the columns the engine needs)."""
+    if health_store.is_enabled():
+        columns = ["timestamp", "patient"] + list(health_store.VITALS)
+        df = health_store.load(columns=columns, display=True)
+    else:
+        df = health_checkup.load_trend_data(last_n=None)
+    return _apply_window(df, window_days)
+
+def _apply_window(df, window_days, as_of=None):
+    if df.empty or not window_days:
+        return df
+    as_of = pd.Timestamp(as_of) if as_of is not None else df["Timestamp"].max()
+    return df[df["Timestamp"] >= as_of - pd.Timedelta(days=window_days)]
+
+def compute_member_trends(df=None, window_days=None, as_of=None):
+    """Per-member trend statistics for every vital.
+
+    Returns one row per member with `<vital>_slope` (units per day, least
+    squares), `<vital>_pct_change` (first to last reading), `<vital>_volatility`
+    (standard deviation) plus reading count and first/last timestamps.
+    """
+    if df is None:
+        df = load_history()
+    df = _apply_window(df, window_days, as_of)
+    if df.empty:
+        return pd.DataFrame()
+
+    key = df["Patient Name"].astype(str).str.strip().str.lower().to_numpy()
+    days = (df["Timestamp"] - df["Timestamp"].min()).dt.total_seconds().to_numpy() / 86400.0
+    order = np.argsort(days, kind="stable")
+    df, key, days = df.iloc[order], key[order], days[order]
+    codes, members = pd.factorize(key)
+    k = len(members)
+
+    def per_member(values):
+        return np.bincount(codes, weights=values, minlength=k)
+
+    def first_last(mask):
+        """Positions of each member's first and last row where mask holds."""
+        first = np.full(k, -1)
+        last = np.full(k, -1)
+        idx = np.flatnonzero(mask)
+        last[codes[idx]] = idx            # later rows overwrite earlier ones
+        first[codes[idx[::-1]]] = idx[::-1]
+        return first, last
+
+    ts = df["Timestamp"].to_numpy()
+    first_row, last_row = first_last(np.ones(len(df), dtype=bool))
+    out = pd.DataFrame({
+        "Patient Name": df["Patient Name"].astype(str).to_numpy()[first_row],
+        "readings": np.bincount(codes, minlength=k),
+        "first_seen": ts[first_row],
+        "last_seen": ts[last_row],
+    })
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for vital, short in VITAL_KEYS.items():
+            y = pd.to_numeric(df[vital], errors="coerce").to_numpy(dtype="float64")
+            valid = ~np.isnan(y)
+            x0, y0 = np.where(valid, days, 0.0), np.where(valid, y, 0.0)
+            n = per_member(valid.astype(float))
+            mean_x, mean = per_member(x0) / n, per_member(y0) / n
+            # Centre per member so long histories don't lose precision
+            xc = np.where(valid, x0 - mean_x[codes], 0.0)
+            yc = np.where(valid, y0 - mean[codes], 0.0)
+            sxx = per_member(xc * xc)
+
+            # Zero time spread (e.g. all readings at one instant) leaves the slope undefined
+            slope = np.where(sxx > 1e-12, per_member(xc * yc) / sxx, np.nan)
+            first, last = first_last(valid)
+            first_y = np.where(first >= 0, y[first], np.nan)
+            last_y = np.where(last >= 0, y[last], np.nan)
+            variance = per_member(yc * yc) / n
+
+            out[f"{short}_slope"] = slope
+            out[f"{short}_pct_change"] = np.where(first_y != 0, (last_y - first_y) / first_y * 100, np.nan)
+            out[f"{short}_volatility"] = np.sqrt(variance)
+
+    return out.reset_index(drop=True)
+
+def deterioration_scores(trends):
+    """Score each member by how fast their vitals are worsening."""
+    score = pd.Series(0.0, index=trends.index)
+    worst = pd.Series("", index=trends.index, dtype=object)
+    worst_value = pd.Series(0.0, index=trends.index)
+    for vital, short in VITAL_KEYS.items():
+        change = trends[f"{short}_slope"].fillna(0) * 30 / DETERIORATION_SCALE[vital]
+        part = change.abs() if short == "temperature" else change.clip(lower=0)
+        score += part
+        is_worst = part > worst_value
+        worst = worst.where(~is_worst, vital)
+        worst_value = worst_value.where(~is_worst, part)
+    return score, worst
+
+def deteriorating_members(trends=None, top=20, min_readings=3, window_days=None):
+    """Ranked report of the members whose vitals are worsening fastest."""
+    if trends is None:
+        trends = compute_member_trends(window_days=window_days)
+    if trends.empty:
+        return trends
+    trends = trends[trends["readings"] >= min_readings].copy()
+    trends["deterioration_score"], trends["worst_vital"] = deterioration_scores(trends)
+    trends = trends[trends["deterioration_score"] > 0]
+    return trends.sort_values("deterioration_score", ascending=False).head(top).reset_index(drop=True)
+
+def trend_label(vital, slope, values=None):
+    """'increasing' / 'decreasing' / 'stable' from a per-day slope.
+
+    Falls back to comparing the first and last value when the slope is
+    undefined (all readings at the same time).
+    """
+    if slope is None or np.isnan(slope):
+        if not values:
+            return "stable"
+        return "increasing" if values[-1] > values[0] else "decreasing" if values[-1] < values[0] else "stable"
+    monthly = slope * 30
+    if abs(monthly) < STABLE_FRACTION * DETERIORATION_SCALE[vital]:
+        return "stable"
+    return f"{'increasing' if monthly > 0 else 'decreasing'}, {slope:+.2f}/day"
@@ -0,0 +1,476 @@
+import os
+import io
+import csv
+import gzip
+import json
+import shutil
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+from app.utils import storage
+from app.utils.config import BASE_DIR
+
+# ---------------------------------------
+# Monthly partitions for the message and emergency logs
+# ---------------------------------------
+# Optional layout where each log is split by the month of its time column:
+#   logs/partitions/manifest.json                 logs, columns, months, compaction state
+#   logs/partitions/<log>/<YYYY-MM>.csv           open month, appended to
+#   logs/partitions/<log>/<YYYY-MM>.csv.gz        closed month, compacted
+#   logs/partitions/messages/members.csv          member index: Member, Role, Month
+# Appends only touch the current month's file, a rewrite (marking an
+# emergency resolved) only the month holding the row, and time-bounded
+# readers (reports, exports) only the months they ask for. A late row for a
+# compacted month goes to a fresh .csv next to its .csv.gz; readers read both
+# and the next compaction merges them.
+#
+# Readers of one member's messages open only the months that member sent
+# or received in: appends add each new (member, role, month) to the
+# append-only member index, which readers fold incrementally (it would make
+# the manifest, read on every append, many MB). The manifest records
+# whether that index is complete, and for emergencies how many rows of
+# each month are still pending, so the pending list opens only those months.
+#
+# Compaction collapses a broadcast (one message logged once per recipient)
+# into a single row listing everyone in "Recipients", drops exact duplicate
+# rows and repeated resolved emergencies; readers expand broadcasts again,
+# so callers always see one dict per recipient in the original columns.
+PART_DIR = os.path.join(BASE_DIR, "logs", "partitions")
+MANIFEST_FILE = "manifest.json"
+LOGS = {"messages": "Timestamp", "emergencies": "Time"}  # log -> time column
+UNDATED = "undated"
+RECIPIENT_SEP = "; "
+BROADCAST_KEY = ["From", "Message", "Language", "Translation", "Timestamp"]
+EMERGENCY_KEY = ["Member Name", "Cause", "Status"]
+MEMBER_INDEX = "members.csv"
+INDEX_COLUMNS = ["Member", "Role", "Month"]
+MEMBER_ROLES = {"messages": {"from": "From", "to": "To"}}  # log -> role -> column
+PENDING = {"emergencies": ("Status", "Pending")}           # log -> rows counted per month
+
+def _manifest_path(part_dir):
+    return os.path.join(part_dir, MANIFEST_FILE)
+
+def load_manifest(part_dir=PART_DIR):
+    try:
+        with open(_manifest_path(part_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": 1, "logs": {}}
+
+def is_enabled(log, part_dir=PART_DIR):
+    """A log is partitioned once it has been migrated (its directory exists)."""
+    return os.path.isdir(os.path.join(part_dir, log))
+
+def month_of(timestamp):
+    """'YYYY-MM' of a '%Y-%m-%d ...' timestamp, or UNDATED."""
+    value = str(timestamp or "")
+    if len(value) >= 7 and value[4] == "-" and value[:4].isdigit() and value[5:7].isdigit():
+        return value[:7]
+    return UNDATED
+
+def current_month():
+    return datetime.now().strftime("%Y-%m")
+
+def partition_files(log, month, part_dir=PART_DIR):
+    """Existing files of one month: the compacted .csv.gz first, then the open .csv."""
+    base = os.path.join(part_dir, log, month)
+    return [p for p in (base + ".csv.gz", base + ".csv") if os.path.exists(p)]
+
+def months(log, since=None, until=None, part_dir=PART_DIR, in_months=None):
+    """Months of a log in order, limited to [since, until) when given
+    ('YYYY-MM' or a full timestamp) and to in_months (e.g. member_months()).
+    Undated rows only belong to unbounded reads."""
+    found = sorted(load_manifest(part_dir)["logs"].get(log, {}).get("months", {}))
+    if in_months is not None:
+        wanted = set(in_months)
+        found = [m for m in found if m in wanted]
+    if since is None and until is None:
+        return found
+    lo, hi = since and str(since)[:7], until and str(until)[:7]
+    return [m for m in found if m != UNDATED and (not lo or m >= lo) and (not hi or m <= hi)]
+
+def _register(log, new_months, columns, part_dir, states=None, pending_added=None):
+    """Add months to the manifest, merge state into months (compaction,
+    pending counts) and/or add to their pending counts."""
+    with storage.FileLock(_manifest_path(part_dir)):
+        manifest = load_manifest(part_dir)
+        info = manifest["logs"].setdefault(log, {"time_column": LOGS[log], "columns": list(columns), "months": {}})
+        changed = False
+        for month in new_months:
+            if month not in info["months"]:
+                info["months"][month] = {"compacted": False, **({"pending": 0} if log in PENDING else {})}
+                changed = True
+        for month, state in (states or {}).items():
+            info["months"].setdefault(month, {"compacted": False}).update(state)
+            changed = True
+        for month, n in (pending_added or {}).items():
+            state = info["months"].get(month, {})
+            if n and "pending" in state:  # unknown counts stay unknown until recounted
+                state["pending"] += n
+                changed = True
+        if changed:
+            storage.write_json(_manifest_path(part_dir), manifest, indent=1)
+
+# ---------------------------------------
+# Member index and pending months
+# ---------------------------------------
+_indexes = {}  # index path -> {"ino", "offset", "months": {(member, role): {month}}}
+_index_lock = threading.Lock()
+
+def member_key(name):
+    return str(name or "").strip().lower()
+
+def _index_path(log, part_dir):
+    return os.path.join(part_dir, log, MEMBER_INDEX)
+
+def _refresh_index(log, part_dir):
+    """Fold rows appended to the member index since the last call (call
+    with _index_lock held)."""
+    path = _index_path(log, part_dir)
+    cached = _indexes.setdefault(path, {"ino": None, "offset": 0, "months": {}})
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        cached.update(ino=None, offset=0, months={})
+        return cached["months"]
+    if st.st_ino != cached["ino"] or st.st_size < cached["offset"]:  # rebuilt
+        cached.update(ino=st.st_ino, offset=0, months={})
+    if st.st_size > cached["offset"]:
+        with open(path, "rb") as f:
+            f.seek(cached["offset"])
+            data = f.read(st.st_size - cached["offset"])
+        end = data.rfind(b"\n") + 1
+        for row in csv.reader(data[:end].decode("utf-8").splitlines()):
+            if len(row) == 3 and row != INDEX_COLUMNS:
+                cached["months"].setdefault((row[0], row[1]), set()).add(row[2])
+        cached["offset"] += end
+    return cached["months"]
+
+def _member_triples(log, rows):
+    """{(member, role, month)} of dict rows, for the member index."""
+    triples = set()
+    for row in rows:
+        month = month_of(row.get(LOGS[log]))
+        for role, column in MEMBER_ROLES[log].items():
+            triples.add((member_key(row.get(column)), role, month))
+    return triples
+
+def _index_members(log, rows, part_dir):
+    """Add the rows' new (member, role, month) entries to the member index."""
+    triples = _member_triples(log, rows)
+    with _index_lock:
+        known = _refresh_index(log, part_dir)
+        new = sorted(t for t in triples if t[2] not in known.get(t[:2], ()))
+    if new:
+        storage.append_rows(_index_path(log, part_dir), [dict(zip(INDEX_COLUMNS, t)) for t in new], INDEX_COLUMNS)
+
+def member_months(log, member, role, part_dir=PART_DIR):
+    """Months in which member appears as role ("from"/"to"), or None when
+    the log has no complete member index (read every month then)."""
+    if load_manifest(part_dir)["logs"].get(log, {}).get("member_index") != "ready":
+        return None
+    with _index_lock:
+        return sorted(_refresh_index(log, part_dir).get((member_key(member), role), ()))
+
+def pending_months(log, part_dir=PART_DIR):
+    """Months that hold pending rows (or whose count is not known yet)."""
+    info = load_manifest(part_dir)["logs"].get(log, {}).get("months", {})
+    return sorted(m for m, state in info.items() if state.get("pending", 1) > 0)
+
+def _count_pending(log, rows):
+    column, value = PENDING[log]
+    return sum(1 for row in rows if row.get(column) == value)
+
+def _recount_pending(log, month, part_dir):
+    rows = [row for path in partition_files(log, month, part_dir) for row in _iter_file(path)]
+    return _count_pending(log, rows)
+
+def reindex(log, part_dir=PART_DIR):
+    """Rebuild the member index (messages) or pending counts (emergencies)
+    from the partitions; needed once for logs migrated before they existed.
+    Returns the number of index entries or pending rows."""
+    if log in MEMBER_ROLES:
+        path = _index_path(log, part_dir)
+        # "building": appends keep the new index up to date, readers ignore it
+        _set_log_state(log, part_dir, member_index="building")
+        if os.path.exists(path):
+            os.remove(path)
+        triples = set()
+        for month in months(log, part_dir=part_dir):
+            triples |= _member_triples(log, (r for p in partition_files(log, month, part_dir)
+                                             for row in _iter_file(p) for r in _expand(row)))
+        storage.append_rows(path, [dict(zip(INDEX_COLUMNS, t)) for t in sorted(triples)], INDEX_COLUMNS)
+        _set_log_state(log, part_dir, member_index="ready")
+        return len(triples)
+    counts = {}
+    for month in months(log, part_dir=part_dir):
+        with _month_lock(os.path.join(part_dir, log, month + ".csv")):
+            counts[month] = _recount_pending(log, month, part_dir)
+    _register(log, [], [], part_dir, states={m: {"pending": n} for m, n in counts.items()})
+    return sum(counts.values())
+
+def _set_log_state(log, part_dir, **state):
+    with storage.FileLock(_manifest_path(part_dir)):
+        manifest = load_manifest(part_dir)
+        manifest["logs"].setdefault(log, {"time_column": LOGS[log], "columns": [], "months": {}}).update(state)
+        storage.write_json(_manifest_path(part_dir), manifest, indent=1)
+
+# ---------------------------------------
+# Reads
+# ---------------------------------------
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return open(path, "r", newline="", encoding="utf-8")
+
+def _iter_file(path):
+    with _open(path) as f:
+        yield from csv.DictReader(f)
+
+def _expand(row):
+    """One dict per recipient for a collapsed broadcast row."""
+    recipients = row.pop("Recipients", None)
+    if not recipients:
+        return [row]
+    return [{**row, "To": name} for name in recipients.split(RECIPIENT_SEP)]
+
+def _in_range(row, time_column, since, until):
+    value = row.get(time_column, "")
+    return (since is None or value >= str(since)) and (until is None or value < str(until))
+
+def iter_rows(log, since=None, until=None, origin=False, part_dir=PART_DIR, in_months=None):
+    """Every row of a log as a dict, oldest month first, optionally only
+    those with since <= time < until and only from in_months. With
+    origin=True yields (row, (path, position)) for update_row (logs without
+    broadcasts only)."""
+    time_column = LOGS[log]
+    bounded = since is not None or until is not None
+    for month in months(log, since, until, part_dir, in_months):
+        for path in partition_files(log, month, part_dir):
+            with _open(path) as f:
+                for position, row in enumerate(csv.DictReader(f)):
+                    if bounded and not _in_range(row, time_column, since, until):
+                        continue
+                    if origin:
+                        yield row, (path, position)
+                    else:
+                        yield from _expand(row)
+
+def read_rows(log, since=None, until=None, part_dir=PART_DIR, in_months=None):
+    return list(iter_rows(log, since, until, part_dir=part_dir, in_months=in_months))
+
+def expand_frame(df):
+    """DataFrame form of _expand: one row per recipient of each collapsed
+    broadcast, without the Recipients column (frames without it pass through)."""
+    if "Recipients" not in df.columns:
+        return df
+    collapsed = df["Recipients"].fillna("").astype(str) != ""
+    if collapsed.any():
+        to = df["To"].astype(object)
+        to[collapsed] = df.loc[collapsed, "Recipients"].str.split(RECIPIENT_SEP)
+        df = df.assign(To=to).explode("To", ignore_index=True)
+        df["To"] = df["To"].astype(df["Message"].dtype)
+    return df.drop(columns="Recipients")
+
+def _read_file(path, kwargs):
+    return expand_frame(pd.read_csv(path, **kwargs))
+
+def read_frame(log, since=None, until=None, part_dir=PART_DIR, workers=8, in_months=None, **read_kwargs):
+    """A log (or the months overlapping [since, until), or in_months) as one
+    DataFrame, partitions read concurrently; rows outside the range are dropped."""
+    files = [p for m in months(log, since, until, part_dir, in_months) for p in partition_files(log, m, part_dir)]
+    if not files:
+        columns = load_manifest(part_dir)["logs"].get(log, {}).get("columns", [])
+        return pd.DataFrame(columns=columns)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda p: _read_file(p, read_kwargs), files))
+    df = pd.concat(frames, ignore_index=True)
+    if since is not None or until is not None:
+        times = df[LOGS[log]].astype(str)
+        keep = pd.Series(True, index=df.index)
+        if since is not None:
+            keep &= times >= str(since)
+        if until is not None:
+            keep &= times < str(until)
+        df = df[keep].reset_index(drop=True)
+    return df
+
+# ---------------------------------------
+# Writes
+# ---------------------------------------
+def append(log, rows, columns, part_dir=PART_DIR):
+    """Append dict rows, each to its month's open file (locked per file)."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(month_of(row.get(LOGS[log])), []).append(row)
+    info = load_manifest(part_dir)["logs"].get(log, {})
+    known = info.get("months", {})
+    if log in MEMBER_ROLES and info.get("member_index"):
+        _index_members(log, rows, part_dir)  # before the rows, so readers never miss them
+    for month, group in groups.items():
+        storage.append_rows(os.path.join(part_dir, log, month + ".csv"), group, columns)
+    new = [m for m in groups if m not in known]
+    pending = {m: _count_pending(log, group) for m, group in groups.items()} if log in PENDING else None
+    if new or (pending and any(pending.values())):
+        _register(log, new, columns, part_dir, pending_added=pending)
+
+def _write_rows(path, rows, fieldnames):
+    """Atomically replace a partition file, gzip-compressed for .gz paths."""
+    if not path.endswith(".gz"):
+        storage.rewrite_csv(path, rows, fieldnames)
+        return
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=fieldnames, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    with storage.atomic_write(path, "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+            gz.write(text.getvalue().encode("utf-8"))
+
+def _month_lock(path):
+    """Both files of a month share the lock of its open .csv, so appends,
+    row updates and compaction of that month exclude each other."""
+    return storage.FileLock(path[:-3] if path.endswith(".gz") else path)
+
+def update_row(origin, expected, changes):
+    """Apply changes to the row at origin (from iter_rows(origin=True)) if it
+    still equals `expected`; only that partition file is rewritten."""
+    path, position = origin
+    with _month_lock(path):
+        if not os.path.exists(path):
+            return False
+        with _open(path) as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = reader.fieldnames
+        if not 0 <= position < len(rows) or rows[position] != expected:
+            return False
+        rows[position].update(changes)
+        _write_rows(path, rows, fieldnames + [c for c in changes if c not in fieldnames])
+        log_dir, name = os.path.split(path)
+        part_dir, log = os.path.split(log_dir)
+        if log in PENDING:
+            month = name.split(".")[0]
+            _register(log, [], [], part_dir, states={month: {"pending": _recount_pending(log, month, part_dir)}})
+    return True
+
+# ---------------------------------------
+# Compaction
+# ---------------------------------------
+def _compact_messages(df):
+    df = df.drop_duplicates()
+    df["Recipients"] = ""
+    key = [c for c in BROADCAST_KEY if c in df.columns]
+    # names containing the separator would not survive a round trip
+    safe = ~df["To"].astype(str).str.contains(RECIPIENT_SEP.strip(), regex=False)
+    sizes = df[safe].groupby(key, sort=False, dropna=False)["To"].transform("size")
+    broadcast = pd.Series(False, index=df.index)
+    broadcast.loc[sizes.index] = sizes > 1
+    if not broadcast.any():
+        return df
+    grouped = df[broadcast].groupby(key, sort=False, dropna=False)
+    collapsed = grouped.first()
+    collapsed["Recipients"] = grouped["To"].agg(RECIPIENT_SEP.join)
+    collapsed["To"] = ""
+    collapsed = collapsed.reset_index()[df.columns]
+    out = pd.concat([df[~broadcast], collapsed], ignore_index=True)
+    return out.sort_values(LOGS["messages"], kind="stable")
+
+def _compact_emergencies(df):
+    df = df.drop_duplicates()
+    resolved = df["Status"] == "Resolved"
+    minute = df[LOGS["emergencies"]].astype(str).str[:16]
+    repeated = resolved & df.assign(_minute=minute).duplicated(subset=EMERGENCY_KEY + ["_minute"])
+    return df[~repeated]
+
+def compact(log, month, part_dir=PART_DIR):
+    """Merge a month's files into one compacted .csv.gz. Returns (rows before, rows after)."""
+    base = os.path.join(part_dir, log, month)
+    with _month_lock(base + ".csv"):  # appenders and row updates of this month wait
+        files = partition_files(log, month, part_dir)
+        if not files:
+            return 0, 0
+        read_kwargs = {"dtype": str, "keep_default_na": False}
+        df = pd.concat([_read_file(p, read_kwargs) for p in files], ignore_index=True)
+        before = len(df)
+        compacted = _compact_messages(df) if log == "messages" else _compact_emergencies(df)
+        _write_rows(base + ".csv.gz", compacted.to_dict("records"), list(compacted.columns))
+        if os.path.exists(base + ".csv"):
+            os.remove(base + ".csv")
+    state = {"compacted": True, "rows": int(len(compacted)), "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    if log in PENDING:
+        column, value = PENDING[log]
+        state["pending"] = int((compacted[column] == value).sum())
+    _register(log, [], compacted.columns, part_dir, states={month: state})
+    return before, len(compacted)
+
+def closed_months(log, part_dir=PART_DIR):
+    """Months before the current one that still have an open .csv."""
+    now = current_month()
+    return [m for m in months(log, part_dir=part_dir)
+            if (m < now or m == UNDATED) and os.path.exists(os.path.join(part_dir, log, m + ".csv"))]
+
+# ---------------------------------------
+# Migration
+# ---------------------------------------
+def migrate(log, src_path, columns=None, part_dir=PART_DIR, chunksize=100_000, overwrite=False):
+    """Split a single-file log into monthly partitions.
+
+    Partitions are built in a staging directory and swapped in at the end, so
+    readers see either the old single file or the complete set.
+    Returns (rows, months).
+    """
+    target = os.path.join(part_dir, log)
+    if is_enabled(log, part_dir) and not overwrite:
+        raise FileExistsError(f"{log} is already partitioned in {target}")
+    staging = target + ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    header = storage.read_header(src_path)
+    columns = header + [c for c in (columns or []) if c not in header]
+    rows, found, triples, pending = 0, set(), set(), {}
+    if header:
+        for chunk in pd.read_csv(src_path, dtype=str, keep_default_na=False, chunksize=chunksize):
+            chunk = chunk.reindex(columns=columns, fill_value="")
+            keys = chunk[LOGS[log]].map(month_of) if LOGS[log] in chunk.columns else pd.Series(UNDATED, index=chunk.index)
+            for month, part in chunk.groupby(keys, sort=False):
+                path = os.path.join(staging, month + ".csv")
+                part.to_csv(path, mode="a", header=not os.path.exists(path), index=False, lineterminator="\n")
+                found.add(month)
+                for role, column in MEMBER_ROLES.get(log, {}).items():
+                    triples.update((member_key(name), role, month) for name in part[column].unique())
+                if log in PENDING:
+                    column, value = PENDING[log]
+                    pending[month] = pending.get(month, 0) + int((part[column] == value).sum())
+            rows += len(chunk)
+    if log in MEMBER_ROLES:
+        storage.rewrite_csv(os.path.join(staging, MEMBER_INDEX),
+                            [dict(zip(INDEX_COLUMNS, t)) for t in sorted(triples)], INDEX_COLUMNS)
+
+    with storage.FileLock(_manifest_path(part_dir)):
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(staging, target)
+        manifest = load_manifest(part_dir)
+        manifest["logs"][log] = {"time_column": LOGS[log], "columns": columns,
+                                 "months": {m: {"compacted": False, **({"pending": pending.get(m, 0)} if log in PENDING else {})}
+                                            for m in sorted(found)}}
+        if log in MEMBER_ROLES:
+            manifest["logs"][log]["member_index"] = "ready"
+        storage.write_json(_manifest_path(part_dir), manifest, indent=1)
+    return rows, len(found)
+
+def export(log, dest_path, since=None, until=None, part_dir=PART_DIR):
+    """Write a log (or a time range of it) back out as one plain CSV; returns rows."""
+    columns = load_manifest(part_dir)["logs"].get(log, {}).get("columns", [])
+    with storage.atomic_write(dest_path) as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        count = 0
+        for row in iter_rows(log, since, until, part_dir=part_dir):
+            writer.writerow(row)
+            count += 1
+    return count
@@ -0,0 +1,260 @@
+import os
+import json
+import numpy as np
+
+from app.utils import lyrics_index, storage
+from app.utils.config import BASE_DIR
+
+# ---------------------------------------
+# Semantic lyrics search (embedding index)
+# ---------------------------------------
+# Songs are cut into short overlapping passages (a few lines each) that are
+# embedded once, in batches, with a sentence-transformers model. Normalized
+# float32 vectors live in one memory-mapped matrix, so a query is a single
+# matrix-vector product (cosine similarity). Large corpora are split into
+# IVF lists: vectors are stored grouped by their nearest k-means centroid
+# and a query only scans the lists of its closest centroids.
+#   meta.json          model, dimensions, per-file passage ranges, IVF layout
+#   vectors.f32        (passages, dim) float32, rows grouped by IVF list
+#   passage_song.npy   song of each passage;  songs.json: [title, artist, file]
+#   text.bin / text_offsets.npy   passage text for display
+#   centroids.npy / list_offsets.npy   IVF centroids and row range per list
+# A build writes a new version directory and then publishes it (see
+# storage.new_version), so searches running meanwhile keep a complete index.
+EMBED_DIR = os.path.join(BASE_DIR, "data", "lyrics_embeddings")
+DEFAULT_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"  # covers Bengali and Hindi
+PASSAGE_LINES = 4      # lines per passage...
+PASSAGE_STRIDE = 2     # ...starting every this many lines
+BATCH_SIZE = 256
+IVF_MIN_PASSAGES = 200_000  # below this an exact scan takes tens of ms
+IVF_PROBES = 32
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 100_000
+
+_models = {}
+
+def load_model(model_name=DEFAULT_MODEL):
+    """The sentence-transformers model (loaded once per process)."""
+    if model_name not in _models:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("Semantic lyrics search needs sentence-transformers "
+                              "(pip install sentence-transformers)") from e
+        _models[model_name] = SentenceTransformer(model_name, device="cpu")
+    return _models[model_name]
+
+def model_encoder(model_name=DEFAULT_MODEL):
+    """encode(texts) -> (n, dim) float32 unit vectors."""
+    model = load_model(model_name)
+    return lambda texts: model.encode(list(texts), batch_size=BATCH_SIZE, convert_to_numpy=True,
+                                      normalize_embeddings=True, show_progress_bar=False)
+
+def passages(lines):
+    """Overlapping PASSAGE_LINES-line windows of a song's lyrics."""
+    if len(lines) <= PASSAGE_LINES:
+        return [" / ".join(lines)] if lines else []
+    starts = range(0, len(lines) - PASSAGE_LINES + PASSAGE_STRIDE, PASSAGE_STRIDE)
+    return [" / ".join(lines[s:s + PASSAGE_LINES]) for s in starts]
+
+def _read_meta(version_dir):
+    if version_dir is None:
+        return None
+    try:
+        with open(os.path.join(version_dir, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def load_meta(embed_dir=EMBED_DIR):
+    return _read_meta(storage.current_version(embed_dir))
+
+def is_enabled(embed_dir=EMBED_DIR):
+    return load_meta(embed_dir) is not None
+
+# ---------------------------------------
+# Build / refresh
+# ---------------------------------------
+def _kmeans(vectors, n_lists, seed=0):
+    """Spherical k-means centroids on a sample of the (unit) vectors."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), KMEANS_SAMPLE), replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        sums[empty] = centroids[empty]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+def _assign(vectors, centroids, chunk=65_536):
+    return np.concatenate([np.argmax(vectors[i:i + chunk] @ centroids.T, axis=1)
+                           for i in range(0, len(vectors), chunk)]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+def build_index(corpus_dir=lyrics_index.LYRICS_DIR, embed_dir=EMBED_DIR, model_name=DEFAULT_MODEL,
+                encode=None, full=False):
+    """Embed the lyrics corpus; on refresh only new or changed files are embedded.
+
+    encode(texts) -> unit vectors may be passed instead of a model name.
+    Returns a report dict.
+    """
+    files = lyrics_index.scan_corpus(corpus_dir)
+    old_dir = storage.current_version(embed_dir)
+    old = None if full else _read_meta(old_dir)
+    if old is not None and old["model"] != model_name:
+        old = None  # vectors from another model can't be mixed
+    if old is not None and {rel: tuple(info["sig"]) for rel, info in old["files"].items()} == files:
+        return {"embedded": 0, "reused": old["passages"], "passages": old["passages"], "lists": old["lists"]}
+
+    old_vectors = old_rows = None
+    if old is not None:
+        old_vectors = np.memmap(os.path.join(old_dir, "vectors.f32"), dtype=np.float32, mode="r",
+                                shape=(old["passages"], old["dim"])) if old["passages"] else None
+        old_rows = np.load(os.path.join(old_dir, "passage_rows.npy"))  # passage id -> row
+
+    encode = encode or model_encoder(model_name)
+    songs, texts, passage_song, blocks, file_info = [], [], [], [], {}
+    embedded = reused = 0
+    pending = []  # (block index, texts) still to embed
+
+    for rel in sorted(files):
+        start = len(texts)
+        for title, artist, lines in lyrics_index.read_corpus_file(os.path.join(corpus_dir, rel)):
+            for p in passages(lines):
+                texts.append(p)
+                passage_song.append(len(songs))
+            songs.append([title, artist, rel])
+        count = len(texts) - start
+        prev = old["files"].get(rel) if old is not None else None
+        if prev is not None and prev["sig"] == list(files[rel]) and prev["passages"][1] == count and old_vectors is not None:
+            p0 = prev["passages"][0]
+            blocks.append(np.asarray(old_vectors[old_rows[p0:p0 + count]], dtype=np.float32))
+            reused += count
+        else:
+            blocks.append(None)
+            pending.append((len(blocks) - 1, texts[start:start + count]))
+        file_info[rel] = {"sig": list(files[rel]), "passages": [start, count]}
+
+    dim = None
+    for block_no, block_texts in pending:
+        vectors = [np.asarray(encode(block_texts[i:i + BATCH_SIZE * 16]), dtype=np.float32)
+                   for i in range(0, len(block_texts), BATCH_SIZE * 16)]
+        blocks[block_no] = np.concatenate(vectors) if vectors else None
+        embedded += len(block_texts)
+        dim = dim or (vectors[0].shape[1] if vectors else None)
+    dim = dim or (old["dim"] if old is not None else 0)
+    blocks = [b if b is not None else np.empty((0, dim), dtype=np.float32) for b in blocks]
+    vectors = np.concatenate(blocks) if blocks else np.empty((0, dim), dtype=np.float32)
+
+    # IVF layout: group rows by nearest centroid so each list is contiguous
+    n_lists = int(np.sqrt(len(vectors))) if len(vectors) >= IVF_MIN_PASSAGES else 1
+    if n_lists > 1:
+        centroids = _kmeans(vectors, n_lists)
+        assign = _assign(vectors, centroids)
+    else:
+        centroids = np.zeros((1, dim), dtype=np.float32)
+        assign = np.zeros(len(vectors), dtype=np.int64)
+    order = np.argsort(assign, kind="stable")
+    list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    list_offsets[1:] = np.cumsum(np.bincount(assign, minlength=n_lists))
+    rows = np.empty(len(order), dtype=np.int64)
+    rows[order] = np.arange(len(order))
+
+    staging = storage.new_version(embed_dir)
+    if len(vectors):
+        out = np.memmap(os.path.join(staging, "vectors.f32"), dtype=np.float32, mode="w+", shape=vectors.shape)
+        out[:] = vectors[order]
+        out.flush()
+        del out
+    else:
+        open(os.path.join(staging, "vectors.f32"), "wb").close()
+    encoded = [t.encode("utf-8") for t in texts]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    text_offsets[1:] = np.cumsum([len(b) for b in encoded])
+    with open(os.path.join(staging, "text.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(staging, "text_offsets.npy"), text_offsets)
+    np.save(os.path.join(staging, "passage_song.npy"), np.asarray(passage_song, dtype=np.int32)[order])
+    np.save(os.path.join(staging, "passage_rows.npy"), rows)
+    np.save(os.path.join(staging, "row_passage.npy"), order.astype(np.int64))
+    np.save(os.path.join(staging, "centroids.npy"), centroids.astype(np.float32))
+    np.save(os.path.join(staging, "list_offsets.npy"), list_offsets)
+    with open(os.path.join(staging, "songs.json"), "w", encoding="utf-8") as f:
+        json.dump(songs, f, ensure_ascii=False)
+    meta = {"version": 1, "model": model_name, "dim": int(dim), "passages": len(vectors),
+            "lists": n_lists, "files": file_info}
+    storage.write_json(os.path.join(staging, "meta.json"), meta)
+
+    storage.publish_version(embed_dir, staging)
+    return {"embedded": embedded, "reused": reused, "passages": len(vectors), "lists": n_lists}
+
+# ---------------------------------------
+# Query
+# ---------------------------------------
+class _Index:
+    def __init__(self, version_dir, meta):
+        load = lambda name: np.load(os.path.join(version_dir, name + ".npy"), mmap_mode="r")
+        self.meta = meta
+        self.vectors = np.memmap(os.path.join(version_dir, "vectors.f32"), dtype=np.float32, mode="r",
+                                 shape=(meta["passages"], meta["dim"])) if meta["passages"] else None
+        self.passage_song, self.row_passage = load("passage_song"), load("row_passage")
+        self.text = np.memmap(os.path.join(version_dir, "text.bin"), dtype=np.uint8, mode="r") \
+            if os.path.getsize(os.path.join(version_dir, "text.bin")) else np.empty(0, dtype=np.uint8)
+        self.text_offsets = load("text_offsets")
+        self.centroids = np.load(os.path.join(version_dir, "centroids.npy"))
+        self.list_offsets = np.load(os.path.join(version_dir, "list_offsets.npy"))
+        with open(os.path.join(version_dir, "songs.json"), "r", encoding="utf-8") as f:
+            self.songs = json.load(f)
+
+    def passage_text(self, row):
+        p = self.row_passage[row]
+        return bytes(self.text[self.text_offsets[p]:self.text_offsets[p + 1]]).decode("utf-8")
+
+_loaded = {"key": None, "index": None}
+
+def load_index(embed_dir=EMBED_DIR):
+    """Memory-map the index (reused until a new version is published)."""
+    version_dir = storage.current_version(embed_dir)
+    if version_dir is None:
+        raise FileNotFoundError(f"No lyrics embedding index in {embed_dir}")
+    if _loaded["key"] != version_dir:
+        _loaded.update(key=version_dir, index=_Index(version_dir, _read_meta(version_dir)))
+    return _loaded["index"]
+
+def search_vector(query_vec, k=5, embed_dir=EMBED_DIR, probes=IVF_PROBES):
+    """Top-k songs for a unit query vector: [{title, artist, line, score}]."""
+    index = load_index(embed_dir)
+    if index.vectors is None:
+        return []
+    q = np.asarray(query_vec, dtype=np.float32).ravel()
+    if len(index.centroids) > 1:
+        lists = np.argsort(-(index.centroids @ q))[:probes]
+        spans = [(index.list_offsets[l], index.list_offsets[l + 1]) for l in lists]
+    else:
+        spans = [(0, len(index.vectors))]
+    rows = np.concatenate([np.arange(a, b) for a, b in spans])
+    scores = np.concatenate([index.vectors[a:b] @ q for a, b in spans])
+
+    # Best passage per song, then the top-k songs
+    pool = min(len(scores), k * 20)
+    top = np.argpartition(-scores, pool - 1)[:pool] if pool < len(scores) else np.arange(len(scores))
+    top = top[np.argsort(-scores[top])]
+    results, seen = [], set()
+    for i in top:
+        song = int(index.passage_song[rows[i]])
+        if song in seen:
+            continue
+        seen.add(song)
+        title, artist, _ = index.songs[song]
+        results.append({"title": title, "artist": artist, "line": index.passage_text(rows[i]),
+                        "score": round(float(scores[i]), 3)})
+        if len(results) == k:
+            break
+    return results
+
+def search(query, k=5, embed_dir=EMBED_DIR, encode=None, probes=IVF_PROBES):
+    """Top-k songs whose lyrics mean something close to the query."""
+    encode = encode or model_encoder(load_index(embed_dir).meta["model"])
+    return search_vector(encode([query])[0], k, embed_dir, probes)
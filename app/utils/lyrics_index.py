@@ -0,0 +1,424 @@
+import os
+import re
+import csv
+import json
+import shutil
+import bisect
+import unicodedata
+import numpy as np
+
+from app.utils import storage
+from app.utils.config import BASE_DIR
+
+# ---------------------------------------
+# Offline lyrics search (BM25 inverted index)
+# ---------------------------------------
+# Every lyric line is a BM25 "document". An index is a list of segments,
+# each a directory of .npy arrays that are memory-mapped at query time:
+#   terms.txt                 sorted vocabulary (term id = line number)
+#   offsets / post_line / post_tf   CSR postings: term -> (line, tf)
+#   line_song / line_len      song of each line, tokens per line
+#   lines.bin / line_offsets  raw line text for showing the matched line
+#   tri_* / trigrams.txt      character trigram -> terms, for misspellings
+#   songs.json                [title, artist, source file] per song
+# Incremental builds add a segment for new or changed corpus files and
+# tombstone the songs they replace; a full build compacts to one segment.
+# manifest.json is the commit point: segments are never rewritten in place.
+LYRICS_DIR = os.path.join(BASE_DIR, "data", "lyrics")
+INDEX_DIR = os.path.join(BASE_DIR, "data", "lyrics_index")
+MANIFEST_FILE = "manifest.json"
+CORPUS_EXTENSIONS = (".txt", ".lrc", ".csv")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+FUZZY_MIN_SIMILARITY = 0.4  # trigram Jaccard needed to treat a term as a misspelling
+FUZZY_EXPANSIONS = 3        # similar terms tried per unknown query term
+PREFIX_EXPANSIONS = 8       # completions tried for a partial last word
+PHRASE_BONUS = 2.0          # score multiplier when the line contains the query verbatim
+COMMON_FRACTION = 0.02      # words in more lines than this only count in the re-ranking...
+MIN_DRIVING_WORDS = 3       # ...unless fewer than this many rarer words are in the query
+CANDIDATES_PER_RESULT = 40  # lines re-ranked per requested result
+MAX_SEGMENTS = 8            # more than this (or too many tombstones) triggers compaction
+
+_TOKEN_RE = re.compile(r"[\w\u0900-\u0dff]+")  # \w plus Indic vowel signs
+_TIMESTAMP_RE = re.compile(r"^\s*(\[[^\]]*\]\s*)+")  # .lrc time tags
+
+def normalize(text):
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    return text.replace("'", "").replace("’", "")
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+def _trigrams(term):
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# ---------------------------------------
+# Corpus parsing
+# ---------------------------------------
+def _song_from_text(path, text):
+    """A .txt/.lrc song: optional 'Title:'/'Artist:' header lines, else the
+    file name ('Artist - Title.txt' or 'Title.txt')."""
+    title = artist = ""
+    lines = []
+    for raw in text.splitlines():
+        key, _, value = raw.partition(":")
+        if not lines and key.strip().lower() in ("title", "ti") and value.strip():
+            title = value.strip()
+        elif not lines and key.strip().lower() in ("artist", "ar", "singer") and value.strip():
+            artist = value.strip()
+        else:
+            line = _TIMESTAMP_RE.sub("", raw).strip()
+            if line:
+                lines.append(line)
+    if not title:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if " - " in stem and not artist:
+            artist, title = (s.strip() for s in stem.split(" - ", 1))
+        else:
+            title = stem
+    return title, artist, lines
+
+def read_corpus_file(path):
+    """[(title, artist, [lines])] for one corpus file."""
+    if path.lower().endswith(".csv"):
+        songs = []
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                row = {k.strip().lower(): v or "" for k, v in row.items() if k}
+                lines = [l.strip() for l in row.get("lyrics", "").splitlines() if l.strip()]
+                songs.append((row.get("title", "").strip(), row.get("artist", "").strip(), lines))
+        return songs
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return [_song_from_text(path, f.read())]
+
+def scan_corpus(corpus_dir=LYRICS_DIR):
+    """{relative path: (mtime_ns, size)} for every corpus file."""
+    files = {}
+    for root, _, names in os.walk(corpus_dir):
+        for name in names:
+            if name.lower().endswith(CORPUS_EXTENSIONS):
+                path = os.path.join(root, name)
+                st = os.stat(path)
+                files[os.path.relpath(path, corpus_dir)] = (st.st_mtime_ns, st.st_size)
+    return files
+
+# ---------------------------------------
+# Segment build
+# ---------------------------------------
+def _write_segment(seg_dir, songs):
+    """Write one immutable segment for songs [(title, artist, source, lines)]."""
+    os.makedirs(seg_dir, exist_ok=True)
+    vocab = {}
+    term_ids, line_ids, line_song, line_len, texts = [], [], [], [], []
+    for song_id, (_, _, _, lines) in enumerate(songs):
+        for line in lines:
+            tokens = tokenize(line)
+            if not tokens:
+                continue
+            line_id = len(texts)
+            texts.append(line)
+            line_song.append(song_id)
+            line_len.append(len(tokens))
+            term_ids.extend(vocab.setdefault(t, len(vocab)) for t in tokens)
+            line_ids.extend([line_id] * len(tokens))
+
+    # Renumber terms alphabetically so prefix lookups can bisect terms.txt
+    terms = sorted(vocab)
+    remap = np.empty(len(vocab), dtype=np.int64)
+    remap[[vocab[t] for t in terms]] = np.arange(len(terms))
+    n_lines = max(len(texts), 1)
+    key = remap[np.asarray(term_ids, dtype=np.int64)] * n_lines + np.asarray(line_ids, dtype=np.int64)
+    uniq, tf = np.unique(key, return_counts=True)
+    post_term = uniq // n_lines
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(post_term, minlength=len(terms)))
+
+    encoded = [t.encode("utf-8") for t in texts]
+    line_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    line_offsets[1:] = np.cumsum([len(b) for b in encoded])
+    with open(os.path.join(seg_dir, "lines.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+
+    # Character trigrams of every term (CSR trigram -> term ids)
+    tri_vocab, tri_keys, tri_terms = {}, [], []
+    for term_id, term in enumerate(terms):
+        for tri in _trigrams(term):
+            tri_keys.append(tri_vocab.setdefault(tri, len(tri_vocab)))
+            tri_terms.append(term_id)
+    tri_keys = np.asarray(tri_keys, dtype=np.int64)
+    order = np.argsort(tri_keys, kind="stable")
+    tri_offsets = np.zeros(len(tri_vocab) + 1, dtype=np.int64)
+    tri_offsets[1:] = np.cumsum(np.bincount(tri_keys, minlength=len(tri_vocab)))
+
+    arrays = {
+        "offsets": offsets,
+        "post_line": (uniq % n_lines).astype(np.int32),
+        "post_tf": np.minimum(tf, 65535).astype(np.uint16),
+        "line_song": np.asarray(line_song, dtype=np.int32),
+        "line_len": np.minimum(np.asarray(line_len, dtype=np.int64), 65535).astype(np.uint16),
+        "line_offsets": line_offsets,
+        "tri_offsets": tri_offsets,
+        "tri_terms": np.asarray(tri_terms, dtype=np.int32)[order],
+    }
+    for name, values in arrays.items():
+        np.save(os.path.join(seg_dir, name + ".npy"), values)
+    with open(os.path.join(seg_dir, "terms.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(terms))
+    with open(os.path.join(seg_dir, "trigrams.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(sorted(tri_vocab, key=tri_vocab.get)))
+    with open(os.path.join(seg_dir, "songs.json"), "w", encoding="utf-8") as f:
+        json.dump([[t, a, s] for t, a, s, _ in songs], f, ensure_ascii=False)
+    return {"lines": len(texts), "tokens": int(sum(line_len)), "songs": len(songs)}
+
+def _load_songs(corpus_dir, rel_paths):
+    songs, spans = [], {}
+    for rel in rel_paths:
+        start = len(songs)
+        for title, artist, lines in read_corpus_file(os.path.join(corpus_dir, rel)):
+            songs.append((title, artist, rel, lines))
+        spans[rel] = [start, len(songs) - start]
+    return songs, spans
+
+def load_manifest(index_dir=INDEX_DIR):
+    try:
+        with open(os.path.join(index_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def is_enabled(index_dir=INDEX_DIR):
+    return load_manifest(index_dir) is not None
+
+def build_index(corpus_dir=LYRICS_DIR, index_dir=INDEX_DIR, full=False):
+    """Index new and changed corpus files (everything when full=True).
+
+    Returns a report dict with added/removed file counts and segment stats.
+    """
+    files = scan_corpus(corpus_dir)
+    with storage.FileLock(os.path.join(index_dir, MANIFEST_FILE)):
+        manifest = load_manifest(index_dir)
+        if manifest is not None and not full:
+            known = manifest["files"]
+            changed = sorted(rel for rel, sig in files.items()
+                             if rel not in known or known[rel]["sig"] != list(sig))
+            removed = sorted(rel for rel in known if rel not in files or rel in changed)
+            dead = sum(len(s["tombstones"]) for s in manifest["segments"]) + \
+                sum(known[rel]["songs"][1] for rel in removed)
+            total = sum(s["songs"] for s in manifest["segments"]) or 1
+            full = len(manifest["segments"]) >= MAX_SEGMENTS or dead / total > 0.3
+        if manifest is None or full:
+            return _build_full(corpus_dir, index_dir, files)
+        if not changed and not removed:
+            return {"mode": "incremental", "added": 0, "removed": 0, "segments": len(manifest["segments"])}
+
+        segments = {s["name"]: s for s in manifest["segments"]}
+        for rel in removed:
+            info = manifest["files"].pop(rel)
+            start, count = info["songs"]
+            segments[info["segment"]]["tombstones"].extend(range(start, start + count))
+        if changed:
+            name = f"seg{manifest['next_segment']:05d}"
+            manifest["next_segment"] += 1
+            songs, spans = _load_songs(corpus_dir, changed)
+            stats = _write_segment(os.path.join(index_dir, name), songs)
+            manifest["segments"].append({"name": name, "tombstones": [], **stats})
+            for rel in changed:
+                manifest["files"][rel] = {"segment": name, "sig": list(files[rel]), "songs": spans[rel]}
+        storage.write_json(os.path.join(index_dir, MANIFEST_FILE), manifest)
+    return {"mode": "incremental", "added": len(changed), "removed": len(set(removed) - set(changed)),
+            "segments": len(manifest["segments"])}
+
+def _build_full(corpus_dir, index_dir, files):
+    """Rebuild as a single new segment and swap the manifest over to it.
+
+    The old segments are only retired: searches that read the old manifest
+    may still be opening them, so they are deleted by the next full build.
+    """
+    old = load_manifest(index_dir) or {"next_segment": 0, "segments": []}
+    name = f"seg{old['next_segment']:05d}"
+    staging = index_dir.rstrip(os.sep) + ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    rel_paths = sorted(files)
+    songs, spans = _load_songs(corpus_dir, rel_paths)
+    stats = _write_segment(os.path.join(staging, name), songs)
+    manifest = {
+        "version": 1,
+        "next_segment": old["next_segment"] + 1,
+        "segments": [{"name": name, "tombstones": [], **stats}],
+        "files": {rel: {"segment": name, "sig": list(files[rel]), "songs": spans[rel]} for rel in rel_paths},
+        "retired": [s["name"] for s in old["segments"]],
+    }
+    os.makedirs(index_dir, exist_ok=True)
+    os.replace(os.path.join(staging, name), os.path.join(index_dir, name))
+    storage.write_json(os.path.join(index_dir, MANIFEST_FILE), manifest)
+    shutil.rmtree(staging, ignore_errors=True)
+    keep = {name, *manifest["retired"]}
+    for entry in os.listdir(index_dir):
+        if entry.startswith("seg") and entry not in keep:
+            shutil.rmtree(os.path.join(index_dir, entry), ignore_errors=True)
+    return {"mode": "full", "added": len(rel_paths), "removed": 0, "segments": 1, **stats}
+
+# ---------------------------------------
+# Loading (memory-mapped, cached per process)
+# ---------------------------------------
+class _Segment:
+    def __init__(self, seg_dir, info):
+        load = lambda name: np.load(os.path.join(seg_dir, name + ".npy"), mmap_mode="r")
+        self.offsets, self.post_line, self.post_tf = load("offsets"), load("post_line"), load("post_tf")
+        self.line_song, self.line_len = load("line_song"), load("line_len")
+        self.line_offsets = load("line_offsets")
+        self.tri_offsets, self.tri_terms = load("tri_offsets"), load("tri_terms")
+        self.lines = np.memmap(os.path.join(seg_dir, "lines.bin"), dtype=np.uint8, mode="r") \
+            if os.path.getsize(os.path.join(seg_dir, "lines.bin")) else np.empty(0, dtype=np.uint8)
+        with open(os.path.join(seg_dir, "terms.txt"), "r", encoding="utf-8") as f:
+            self.terms = f.read().split("\n") if info["lines"] else []
+        self.vocab = {t: i for i, t in enumerate(self.terms)}
+        with open(os.path.join(seg_dir, "trigrams.txt"), "r", encoding="utf-8") as f:
+            self.trigrams = {t: i for i, t in enumerate(f.read().split("\n"))} if self.terms else {}
+        with open(os.path.join(seg_dir, "songs.json"), "r", encoding="utf-8") as f:
+            self.songs = json.load(f)
+        self.dead = np.asarray(sorted(info["tombstones"]), dtype=np.int32)
+        self.n_lines, self.n_tokens = info["lines"], info["tokens"]
+
+    def df(self, term):
+        i = self.vocab.get(term)
+        return 0 if i is None else int(self.offsets[i + 1] - self.offsets[i])
+
+    def line_text(self, line):
+        return bytes(self.lines[self.line_offsets[line]:self.line_offsets[line + 1]]).decode("utf-8")
+
+    def prefixed(self, prefix, limit):
+        start = bisect.bisect_left(self.terms, prefix)
+        out = []
+        for term in self.terms[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            out.append(term)
+        return out
+
+    def similar(self, term):
+        """[(vocab term, trigram Jaccard similarity)] for a possibly misspelled term."""
+        tris = [self.trigrams[t] for t in _trigrams(term) if t in self.trigrams]
+        if not tris:
+            return []
+        ids = np.concatenate([self.tri_terms[self.tri_offsets[t]:self.tri_offsets[t + 1]] for t in tris])
+        cand, overlap = np.unique(ids, return_counts=True)
+        lengths = np.fromiter((len(self.terms[c]) for c in cand), dtype=np.int64, count=len(cand))
+        sim = overlap / (len(term) + lengths - overlap)
+        best = np.argsort(-sim)[:FUZZY_EXPANSIONS]
+        return [(self.terms[cand[i]], float(sim[i])) for i in best if sim[i] >= FUZZY_MIN_SIMILARITY]
+
+_loaded = {"key": None, "segments": None}
+
+def load_index(index_dir=INDEX_DIR):
+    """Memory-map every segment (reused until the manifest changes)."""
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    st = os.stat(path)
+    key = (index_dir, st.st_mtime_ns, st.st_size)
+    if _loaded["key"] != key:
+        manifest = load_manifest(index_dir)
+        _loaded.update(key=key, segments=[_Segment(os.path.join(index_dir, s["name"]), s)
+                                          for s in manifest["segments"]])
+    return _loaded["segments"]
+
+# ---------------------------------------
+# Query
+# ---------------------------------------
+def _expand(tokens, segments):
+    """[(query token index, term, weight)]: exact terms, misspelling
+    candidates for unknown terms and completions of a partial last word."""
+    expanded = []
+    for qi, token in enumerate(tokens):
+        known = any(token in seg.vocab for seg in segments)
+        if known:
+            expanded.append((qi, token, 1.0))
+        elif len(token) >= 3:
+            similar = {}
+            for seg in segments:
+                for term, sim in seg.similar(token):
+                    similar[term] = max(similar.get(term, 0.0), sim)
+            expanded.extend((qi, term, sim) for term, sim in similar.items())
+        if qi == len(tokens) - 1 and len(token) >= 2:
+            completions = {t for seg in segments for t in seg.prefixed(token, PREFIX_EXPANSIONS) if t != token}
+            expanded.extend((qi, term, 0.7) for term in sorted(completions)[:PREFIX_EXPANSIONS])
+    return expanded
+
+def search(query, k=5, index_dir=INDEX_DIR):
+    """Top-k songs for a lyric fragment: [{title, artist, line, score}].
+
+    Candidate lines are scored with BM25 over the query's selective terms
+    (very common words are skipped when rarer ones exist), then re-ranked
+    by how many query words each line contains and by exact phrase match.
+    """
+    segments = load_index(index_dir)
+    tokens = tokenize(query)
+    if not tokens or not segments:
+        return []
+    expanded = _expand(tokens, segments)
+    n_lines = sum(seg.n_lines for seg in segments)
+    avg_len = sum(seg.n_tokens for seg in segments) / max(n_lines, 1)
+    df = {}
+    for _, term, _ in expanded:
+        if term not in df:
+            df[term] = sum(seg.df(term) for seg in segments)
+    idf = {t: np.log(1 + (n_lines - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+    # The rarest words drive candidate generation: every word below
+    # COMMON_FRACTION, and at least MIN_DRIVING_WORDS of them
+    word_df = {}
+    for qi, term, _ in expanded:
+        word_df[tokens[qi]] = max(word_df.get(tokens[qi], 0), df[term])
+    ranked_words = sorted(word_df, key=word_df.get)
+    driving = {w for i, w in enumerate(ranked_words)
+               if i < MIN_DRIVING_WORDS or word_df[w] <= COMMON_FRACTION * n_lines}
+    selective = [e for e in expanded if tokens[e[0]] in driving]
+    # Score each distinct (term, weight) once even if the query repeats a word
+    word_of = {}
+    for qi, term, weight in selective:
+        word_of.setdefault((term, weight), tokens[qi])
+    words = sorted(set(word_of.values()))
+
+    candidates = []
+    pool = k * CANDIDATES_PER_RESULT
+    for seg_no, seg in enumerate(segments):
+        n = seg.n_lines
+        if n == 0:
+            continue
+        # Dense per-line accumulators: O(postings + lines), no sorting
+        total = np.zeros(n)
+        matched = np.zeros((len(words), n), dtype=bool)
+        for (term, weight), word in word_of.items():
+            t = seg.vocab.get(term)
+            if t is None:
+                continue
+            start, end = seg.offsets[t], seg.offsets[t + 1]
+            post = np.asarray(seg.post_line[start:end])
+            tf = np.asarray(seg.post_tf[start:end], dtype=np.float64)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * seg.line_len[post] / avg_len)
+            total += np.bincount(post, weights=weight * idf[term] * tf * (BM25_K1 + 1) / (tf + norm), minlength=n)
+            matched[words.index(word), post] = True
+        # Lines holding more of the distinct query words come first
+        total *= matched.sum(axis=0)
+        if len(seg.dead):
+            total[np.isin(seg.line_song, seg.dead)] = 0
+        top = np.argpartition(-total, min(n - 1, pool))[:pool]
+        candidates.extend((float(total[i]), seg_no, int(i)) for i in top if total[i] > 0)
+
+    query_words = set(tokens)
+    phrase = " ".join(tokens)
+    best = {}
+    for score, seg_no, line in candidates:
+        seg = segments[seg_no]
+        text = seg.line_text(line)
+        line_tokens = tokenize(text)
+        covered = len(query_words & set(line_tokens)) / len(query_words)
+        score *= 0.5 + covered
+        if phrase in " ".join(line_tokens):
+            score *= PHRASE_BONUS
+        song = (seg_no, int(seg.line_song[line]))
+        if score > best.get(song, (0,))[0]:
+            best[song] = (score, text)
+    ranked = sorted(best.items(), key=lambda kv: -kv[1][0])[:k]
+    return [{"title": segments[s].songs[i][0], "artist": segments[s].songs[i][1], "line": text, "score": round(score, 3)}
+            for (s, i), (score, text) in ranked]
@@ -0,0 +1,191 @@
+import os
+import csv
+import hashlib
+from collections import Counter
+from datetime import date
+import pandas as pd
+
+from app.utils import reminder, roster, shards
+
+# ---------------------------------------
+# Bulk import of medication schedules
+# ---------------------------------------
+# Clinic schedules (Member Name, Medicine, Time, Dosage, Status) become one
+# daily reminder per (member, medicine, time). The file is read in chunks,
+# times are parsed column-wise, and the merged reminder table is written
+# once at the end.
+COLUMN_ALIASES = {
+    "name": ["Member Name", "Patient Name", "Name", "Member", "Username"],
+    "medicine": ["Medicine", "Medication", "Drug"],
+    "time": ["Time", "Dose Time", "Time(s)"],
+    "dosage": ["Dosage", "Dose", "Quantity"],
+    "status": ["Status"],
+}
+TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I %p", "%H%M", "%H.%M"]
+INACTIVE_STATUSES = {"stopped", "discontinued", "cancelled", "canceled", "inactive"}
+
+def _resolve_columns(columns):
+    found = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            match = next((c for c in columns if c.strip().lower() == alias.lower()), None)
+            if match is not None:
+                found[field] = match
+                break
+    return found
+
+def parse_times(values):
+    """Vectorized "HH:MM" normalization; unparseable entries become NaN."""
+    text = values.fillna("").astype(str).str.strip().str.upper()
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in TIME_FORMATS:
+        todo = parsed.isna()
+        if not todo.any():
+            break
+        parsed[todo] = pd.to_datetime(text[todo], format=fmt, errors="coerce")
+    return parsed.dt.strftime("%H:%M")
+
+def dose_key(username, medicine, time_str):
+    return "|".join((roster.normalize_name(username), roster.normalize_name(medicine), str(time_str).strip()))
+
+def schedule_id(key):
+    """Deterministic reminder ID, so re-importing a schedule updates in place."""
+    return "med" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:9]
+
+def normalize_chunk(chunk, cols, lookup=None, roster_df=None):
+    """Validate one chunk; returns (doses, rejected).
+
+    doses has Username, Title, Time(s), Notes, Active and Key columns.
+    """
+    reason = pd.Series("", index=chunk.index, dtype=object)
+
+    def reject(mask, why):
+        mask = mask & (reason == "")
+        reason[mask] = why
+
+    def text(field):
+        if field not in cols:
+            return pd.Series("", index=chunk.index, dtype=object)
+        return chunk[cols[field]].fillna("").astype(str).str.strip()
+
+    names, medicines = text("name"), text("medicine")
+    reject(names == "", "missing name")
+    reject(medicines == "", "missing medicine")
+
+    usernames = names
+    if lookup is not None:
+        member_rows = names.map(lambda n: lookup.get(roster.normalize_name(n)))
+        reject(member_rows.isna(), "not in roster")
+        known = member_rows.dropna().astype(int)
+        usernames = known.map(roster_df["Member Name"]).reindex(chunk.index).fillna("")
+
+    times = parse_times(text("time"))
+    reject(times.isna(), "invalid time")
+
+    ok = reason == ""
+    rejected = chunk[~ok].assign(**{"Reject Reason": reason[~ok]})
+    dosage = text("dosage")[ok]
+    doses = pd.DataFrame({
+        "Username": usernames[ok],
+        "Title": medicines[ok],
+        "Time(s)": times[ok],
+        "Notes": ("Dosage: " + dosage).where(dosage != "", ""),
+        "Active": ~text("status")[ok].str.lower().isin(INACTIVE_STATUSES),
+    })
+    doses["Key"] = [dose_key(u, m, t) for u, m, t in zip(doses["Username"], doses["Title"], doses["Time(s)"])]
+    return doses, rejected
+
+def merge_schedule(existing, doses, start=None):
+    """Upsert doses into a reminder table on (member, medicine, time).
+
+    Only imported reminders (IDs starting with "med") are matched, so a
+    member's own reminder with the same title and time is left alone.
+    Matching reminders get the new notes, inactive statuses remove them and
+    new doses become daily reminders starting on `start`. Returns
+    (table, added, updated, removed); a reminder counts as updated only if
+    one of its fields changed.
+    """
+    start = (start or date.today()).strftime("%Y-%m-%d")
+    doses = doses.drop_duplicates("Key", keep="last").set_index("Key")
+    imported = existing["ID"].fillna("").astype(str).str.startswith("med")
+    keys = pd.Series([dose_key(u, t, s) if med else None for u, t, s, med in
+                      zip(existing["Username"], existing["Title"], existing["Time(s)"], imported)],
+                     index=existing.index, dtype=object)
+
+    matched = keys.isin(doses.index)
+    active = doses["Active"]
+    drop = matched & keys.map(active).eq(False)
+    notes = keys.map(doses["Notes"])
+    update = matched & ~drop & ((existing["Notes"].fillna("") != notes) | (existing["Frequency"] != "daily"))
+    table = existing.copy()
+    table.loc[update, "Notes"] = notes[update]
+    table.loc[update, "Frequency"] = "daily"
+    table = table[~drop]
+
+    new = doses[active & ~doses.index.isin(keys)]
+    added = pd.DataFrame({
+        "ID": [schedule_id(k) for k in new.index],
+        "Username": new["Username"].to_numpy(),
+        "Title": new["Title"].to_numpy(),
+        "Notes": new["Notes"].to_numpy(),
+        "Date": start,
+        "Time(s)": new["Time(s)"].to_numpy(),
+        "Frequency": "daily",
+        "Taken": "",
+    }, columns=reminder.REMINDER_COLUMNS)
+    table = pd.concat([table, added], ignore_index=True) if len(added) else table.reset_index(drop=True)
+    return table, len(added), int(update.sum()), int(drop.sum())
+
+def import_schedule(path, chunksize=50_000, use_roster=True, reject_path=None, start=None, dry_run=False):
+    """Stream a medication schedule into reminders.csv with a single write.
+
+    With the sharded layout each member's shard is updated on its own.
+    Returns a report dict with read/added/updated/removed/rejected counts.
+    """
+    lookup = roster.member_lookup() if use_roster else None
+    roster_df = roster.load_roster() if use_roster else None
+    report = {"read": 0, "added": 0, "updated": 0, "removed": 0, "rejected": 0, "reasons": Counter()}
+    cols = None
+    parts = []
+    reject_header_written = False
+
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize, skipinitialspace=True):
+        if cols is None:
+            cols = _resolve_columns(chunk.columns)
+            missing = [f for f in ("name", "medicine", "time") if f not in cols]
+            if missing:
+                raise ValueError(f"No {', '.join(missing)} column found in {path}")
+        doses, rejected = normalize_chunk(chunk, cols, lookup, roster_df)
+        report["read"] += len(chunk)
+        report["rejected"] += len(rejected)
+        report["reasons"].update(rejected["Reject Reason"])
+        parts.append(doses)
+
+        if reject_path and not rejected.empty:
+            rejected.to_csv(reject_path, mode="a" if reject_header_written else "w",
+                            header=not reject_header_written, index=False, quoting=csv.QUOTE_MINIMAL)
+            reject_header_written = True
+
+    if not parts:
+        return report
+    doses = pd.concat(parts, ignore_index=True)
+    if shards.is_enabled("reminders"):
+        # Sharded layout: merge each member into their own shard only
+        groups = doses.groupby(doses["Username"].map(shards.member_key), sort=False)
+        batches = [(part["Username"].iloc[0], part) for _, part in groups]
+    else:
+        batches = [(None, doses)]
+
+    for username, part in batches:
+        with reminder.reminder_lock(username):
+            table, added, updated, removed = merge_schedule(reminder.load_reminders(username), part, start)
+            if not dry_run and (added or updated or removed):
+                reminder.save_reminders(table, username)
+        report["added"] += added
+        report["updated"] += updated
+        report["removed"] += removed
+    return report
+
+def default_reject_path(path):
+    root, _ = os.path.splitext(path)
+    return root + "_rejected.csv"
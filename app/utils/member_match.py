@@ -0,0 +1,124 @@
+import re
+import math
+import numpy as np
+import pandas as pd
+
+from app.utils import roster
+
+# ---------------------------------------
+# "Members like me" (inverted index over interests and city)
+# ---------------------------------------
+# Active members are indexed once per roster download:
+#   interest token -> set of roster rows,  city -> set of roster rows
+# A match only looks at the postings of the member's own interests and city,
+# scoring shared interests by rarity (a shared rare hobby counts more than
+# "music") plus a bonus for living in the same city.
+CITY_WEIGHT = 1.5
+PAGE_SIZE = 10
+_SPLIT_RE = re.compile(r"[,;/|&+]|\band\b")
+_STOPWORDS = {"and", "the", "of", "in", "a", "to", "for", "with"}
+_index = {"df": None}
+
+def interest_tokens(text):
+    """Normalized interests: each listed phrase, plus its words for multi-word phrases."""
+    tokens = set()
+    for phrase in _SPLIT_RE.split(str(text).lower()):
+        words = [w for w in re.findall(r"\w+", phrase) if w not in _STOPWORDS]
+        if not words:
+            continue
+        tokens.add(" ".join(words))
+        if len(words) > 1:
+            tokens.update(words)
+    return tokens
+
+def load_index(refresh=False):
+    """The index for the current roster; rebuilt whenever the roster is re-downloaded."""
+    df = roster.load_roster(refresh)
+    if _index["df"] is not df:
+        column = lambda name: (df[name] if name in df.columns else pd.Series("", index=df.index)).to_numpy()
+        active = np.flatnonzero(np.char.lower(column("Active").astype(str)) == "yes") \
+            if "Active" in df.columns else np.arange(len(df))
+        interests, cities, tokens_of = {}, {}, {}
+        for pos, text, city in zip(active, column("Interests")[active], column("City")[active]):
+            tokens = tokens_of[pos] = interest_tokens(text)
+            for t in tokens:
+                interests.setdefault(t, []).append(pos)
+            city = roster.normalize_name(city)
+            if city:
+                cities.setdefault(city, []).append(pos)
+        to_array = lambda postings: {k: np.array(v, dtype=np.int64) for k, v in postings.items()}
+        interests = to_array(interests)
+        idf = {t: math.log(1 + len(active) / len(rows)) for t, rows in interests.items()}
+        _index.update(df=df, interests=interests, cities=to_array(cities), tokens_of=tokens_of, idf=idf,
+                      names=np.char.lower(column("Member Name").astype(str)))
+    return _index
+
+def _shared(mine, theirs):
+    """Shared interests, leaving out single words already covered by a shared phrase."""
+    shared = mine & theirs
+    covered = {w for t in shared if " " in t for w in t.split()}
+    return sorted(shared - covered)
+
+def members_like_me(name, page=1, page_size=PAGE_SIZE, refresh=False):
+    """Active members ranked by shared interests and city, one page at a time.
+
+    Returns (members, total): members are dicts with Member Name, City,
+    Interests, Shared (sorted shared interests) and Score.
+    """
+    index = load_index(refresh)
+    df = index["df"]
+    row = roster.member_lookup().get(roster.normalize_name(name))
+    if row is None:
+        return [], 0
+    me = df.index.get_loc(row)
+    my_tokens = interest_tokens(df.iat[me, df.columns.get_loc("Interests")]) if "Interests" in df.columns else set()
+    my_city = roster.normalize_name(df.iat[me, df.columns.get_loc("City")]) if "City" in df.columns else ""
+
+    scores = np.zeros(len(df))
+    for t in my_tokens:
+        if t in index["interests"]:
+            scores[index["interests"][t]] += index["idf"][t]
+    if my_city in index["cities"]:
+        scores[index["cities"][my_city]] += CITY_WEIGHT
+    scores[me] = 0
+    candidates = np.flatnonzero(scores)
+
+    # Only the requested page is ordered: best score first, then by name
+    start = (max(page, 1) - 1) * page_size
+    top = candidates
+    if start + page_size < len(candidates):
+        top = candidates[np.argpartition(-scores[candidates], start + page_size - 1)[:start + page_size]]
+        cutoff = scores[top].min()
+        top = candidates[scores[candidates] >= cutoff]  # keep ties so name order is stable
+    top = top[np.lexsort((index["names"][top], -scores[top]))][start:start + page_size]
+
+    members = [{
+        "Member Name": df.iat[pos, df.columns.get_loc("Member Name")],
+        "City": df.iat[pos, df.columns.get_loc("City")] if "City" in df.columns else "",
+        "Interests": df.iat[pos, df.columns.get_loc("Interests")] if "Interests" in df.columns else "",
+        "Shared": _shared(my_tokens, index["tokens_of"][pos]),
+        "Score": round(float(scores[pos]), 2),
+    } for pos in top]
+    return members, len(candidates)
+
+def describe(member):
+    shared = f" (you both like {', '.join(member['Shared'])})" if member["Shared"] else ""
+    return f"{member['Member Name']} – {member['City']} interested in {member['Interests']}{shared}"
+
+def browse_members_like_me(name, page_size=PAGE_SIZE):
+    """Page through members like `name` on the console."""
+    page = 1
+    while True:
+        members, total = members_like_me(name, page, page_size)
+        if not total:
+            print("📭 No members with shared interests or city yet.")
+            return
+        pages = math.ceil(total / page_size)
+        print(f"\n🤝 Members like you (page {page}/{pages}, {total} total):")
+        for m in members:
+            print(" - " + describe(m))
+        if page >= pages:
+            return
+        if input("Show more? (y/n): ").strip().lower() != "y":
+            return
+        page += 1
@@ -1,11 +1,15 @@
 import os
 import csv
+import threading
 import pandas as pd
 from datetime import datetime
 from pytz import timezone
 from transformers import MarianTokenizer, MarianMTModel
+from app.utils import log_partitions, profiling, storage
 from app.utils.config import GOOGLE_SHEET_CSV_URL, MESSAGE_LOG_PATH
 
+MESSAGE_COLUMNS = ["From", "To", "Message", "Language", "Translation", "Timestamp"]
+
 # 🌐 Translation models map
 model_map = {
     "bn": "Helsinki-NLP/opus-mt-bn-en",
@@ -16,20 +20,77 @@ model_map = {
     "mr": "Helsinki-NLP/opus-mt-mr-en"
 }
 loaded_models = {}
+_models_lock = threading.Lock()
 
 def translate_to_english(msg, lang_code):
     if lang_code == "en":
         return msg
     if lang_code not in loaded_models:
-        model_name = model_map[lang_code]
-        tokenizer = MarianTokenizer.from_pretrained(model_name)
-        model = MarianMTModel.from_pretrained(model_name)
-        loaded_models[lang_code] = (tokenizer, model)
+        with _models_lock:  # load each model once, even with concurrent sessions
+            if lang_code not in loaded_models:
+                model_name = model_map[lang_code]
+                with profiling.span("messaging.model_load", lang=lang_code):
+                    tokenizer = MarianTokenizer.from_pretrained(model_name)
+                    model = MarianMTModel.from_pretrained(model_name)
+                loaded_models[lang_code] = (tokenizer, model)
     tokenizer, model = loaded_models[lang_code]
     inputs = tokenizer([msg], return_tensors="pt", padding=True)
-    tokens = model.generate(**inputs)
+    with profiling.span("messaging.generate", lang=lang_code):
+        tokens = model.generate(**inputs)
     return tokenizer.decode(tokens[0], skip_special_tokens=True)
 
+def deliver(current_user, audience, message, lang_code="en", translation=None):
+    """Log one message to every recipient in `audience`; returns the log entries.
+    The message is translated here unless a translation is given."""
+    if translation is None:
+        try:
+            translation = translate_to_english(message, lang_code)
+        except Exception:
+            translation = "[Translation Failed]"
+    timestamp = datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S")
+    entries = [{
+        "From": current_user,
+        "To": name,
+        "Message": message,
+        "Language": lang_code,
+        "Translation": translation,
+        "Timestamp": timestamp
+    } for name in audience]
+    with profiling.span("messaging.append"):
+        if log_partitions.is_enabled("messages"):
+            log_partitions.append("messages", entries, MESSAGE_COLUMNS)
+        else:
+            storage.append_rows(MESSAGE_LOG_PATH, entries, MESSAGE_COLUMNS)
+    profiling.count("messaging.rows_written", len(entries))
+    return entries
+
+def inbox_months(member):
+    """Partition months holding messages to member (None: read every month)."""
+    return log_partitions.member_months("messages", member, "to")
+
+def conversation_months(a, b):
+    """Partition months holding messages between a and b (None: read every month)."""
+    sent, received = (log_partitions.member_months("messages", a, role) for role in ("from", "to"))
+    if sent is None:
+        return None
+    other_sent, other_received = (log_partitions.member_months("messages", b, role) for role in ("from", "to"))
+    return sorted((set(sent) & set(other_received)) | (set(other_sent) & set(received)))
+
+def messages_for(current_user):
+    """Messages addressed to a member, oldest first, as dicts."""
+    if log_partitions.is_enabled("messages"):
+        rows = log_partitions.iter_rows("messages", in_months=inbox_months(current_user))
+    else:
+        rows = storage.read_rows(MESSAGE_LOG_PATH)
+    return [r for r in rows if r.get("To", "").lower() == current_user.lower()]
+
+def read_message_log(in_months=None, **read_kwargs):
+    """The message log as a DataFrame (across monthly partitions if enabled,
+    then only in_months when given)."""
+    if log_partitions.is_enabled("messages"):
+        return log_partitions.read_frame("messages", in_months=in_months, **read_kwargs)
+    return pd.read_csv(MESSAGE_LOG_PATH, **read_kwargs)
+
 def find_member_by_partial_name(input_name, df):
     input_name = input_name.lower().strip()
     matches = df[df["Member Name"].str.lower().str.contains(input_name)]
@@ -127,28 +188,15 @@ def send_message(current_user, preselected_recipient=None):
         return
 
     # 📎 Save Message(s)
-    timestamp = datetime.now(timezone('Asia/Kolkata')).strftime("%Y-%m-%d %H:%M:%S")
-    entries = [{
-        "From": current_user,
-        "To": name,
-        "Original Message": message,
-        "Language": lang_code,
-        "Translated Message (EN)": translated_msg,
-        "Timestamp": timestamp
-    } for name in audience]
-
-    file_exists = os.path.exists(MESSAGE_LOG_PATH)
-    with open(MESSAGE_LOG_PATH, "a", newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=entries[0].keys(), quoting=csv.QUOTE_MINIMAL)
-        if not file_exists:
-            writer.writeheader()
-        writer.writerows(entries)
+    deliver(current_user, audience, message, lang_code, translated_msg)
 
     print("\n✅ Message(s) sent successfully!")
 
     # 🕓 Chat History
     try:
-        hist_df = pd.read_csv(MESSAGE_LOG_PATH, quoting=csv.QUOTE_ALL)
+        with profiling.span("messaging.history_read"):
+            months = conversation_months(current_user, receiver_name) if log_partitions.is_enabled("messages") else None
+            hist_df = read_message_log(months, quoting=csv.QUOTE_ALL)
         chat_df = hist_df[((hist_df['From'] == current_user) & (hist_df['To'] == receiver_name)) |
                           ((hist_df['From'] == receiver_name) & (hist_df['To'] == current_user))]
 
@@ -160,13 +208,15 @@ def send_message(current_user, preselected_recipient=None):
             print(f"\n🔔 Chat with {receiver_name}:")
             for _, row in chat_df.iterrows():
                 sender = "👤 You" if row['From'] == current_user else f"👴 {row['From']}"
-                print(f"\n🕓 [{row['Timestamp']}]\n{sender}: {row['Original Message']}")
+                print(f"\n🕓 [{row['Timestamp']}]\n{sender}: {row['Message']}")
     except Exception as e:
         print(f"⚠️ Unable to show chat: {e}")
 
 def view_messages_for_user(current_user):
     try:
-        df = pd.read_csv(MESSAGE_LOG_PATH)
+        with profiling.span("messaging.inbox_read"):
+            months = inbox_months(current_user) if log_partitions.is_enabled("messages") else None
+            df = read_message_log(months)
     except FileNotFoundError:
         print("📂 No message log found.")
         return
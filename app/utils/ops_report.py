@@ -0,0 +1,414 @@
+import os
+import csv
+import glob
+import json
+import hashlib
+import statistics
+from datetime import datetime
+import pandas as pd
+
+from app.utils import adherence, config, emergency, health_checkup, log_partitions, reminder, storage
+
+# ---------------------------------------
+# Streaming daily operations report
+# ---------------------------------------
+# One pass over each data store, in fixed-size chunks, folds every metric
+# into per-day sections saved as data/reports/ops/<YYYY-MM-DD>.json:
+#   messages     per member and language, translation failures
+#   emergencies  by city and status, minutes to resolve
+#   health       readings, flagged readings, members with flagged vitals
+#   adherence    doses taken / late / missed, members who missed doses
+#   reminders    snapshot of active reminders (on the day of the run)
+# Append-only logs (messages, health, adherence) are incremental: state.json
+# keeps each file's inode and the byte offset read so far, so a later run
+# only reads rows added since. A file that was replaced (compaction, a shard
+# rewrite) or removed rebuilds that source from scratch. Emergencies change
+# in place (resolving one) and reminders are rewritten, so those two small
+# stores are re-streamed every run and only days whose numbers changed are
+# written.
+REPORT_DIR = os.path.join(config.BASE_DIR, "data", "reports", "ops")
+STATE_FILE = "state.json"
+CHUNK_ROWS = 100_000
+UNDATED = "undated"
+TRANSLATION_FAILED = "[Translation Failed]"
+
+def _day_path(report_dir, day):
+    return os.path.join(report_dir, f"{day}.json")
+
+def load_day(day, report_dir=REPORT_DIR):
+    try:
+        with open(_day_path(report_dir, day), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"day": day}
+
+def report_days(report_dir=REPORT_DIR):
+    return sorted(os.path.basename(p)[:-5] for p in glob.glob(os.path.join(report_dir, "*.json"))
+                  if os.path.basename(p) != STATE_FILE)
+
+def _load_state(report_dir):
+    try:
+        with open(os.path.join(report_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"files": {}, "digests": {}}
+
+def _days_of(times):
+    """YYYY-MM-DD of each timestamp string, UNDATED where there is none."""
+    days = [str(t).strip()[:10] if isinstance(t, str) else "" for t in times.tolist()]
+    return pd.Series([d if len(d) == 10 and d[4] == "-" and d[7] == "-" else UNDATED for d in days],
+                     index=times.index, dtype=object)
+
+def _write_day(report_dir, report):
+    """Compact JSON via temp file + rename; update() already holds the state
+    lock, so day files need no lock of their own."""
+    path = _day_path(report_dir, report["day"])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(report, ensure_ascii=False))  # one-shot dumps uses the C encoder
+    os.replace(tmp_path, path)
+
+def _add(counts, key, n=1):
+    counts[key] = counts.get(key, 0) + int(n)
+
+class _Days:
+    """Open day reports; flushed to disk chunk by chunk so memory stays flat.
+    A day reopened later (out-of-order rows) is loaded back and added to.
+    Sources being rebuilt are dropped from a saved day the first time this
+    run loads it, so a rebuild costs no extra pass over the report."""
+
+    def __init__(self, report_dir):
+        self.report_dir = report_dir
+        self.open = {}
+        self.recent = set()  # days written to by the current chunk
+        self.reset = set()   # sources being rebuilt this run
+        self.cleared = {}    # day -> sources already dropped from it
+        self.pending = {}    # day -> {source: section} from replace()
+
+    def reset_source(self, source):
+        self.reset.add(source)
+
+    def _get(self, day):
+        if day not in self.open:
+            report = load_day(day, self.report_dir)
+            cleared = self.cleared.setdefault(day, set())
+            for source in self.reset - cleared:
+                report.pop(source, None)
+                cleared.add(source)
+            self.open[day] = report
+            self._apply(day)
+        return self.open[day]
+
+    def section(self, day, source, new):
+        report = self._get(day)
+        self.recent.add(day)
+        if source not in report:
+            report[source] = new()
+        return report[source]
+
+    def replace(self, day, source, value):
+        """Set (None: remove) a whole section; applied when the day is next
+        opened or by sweep(), so it costs no load/write of its own."""
+        self.pending.setdefault(day, {})[source] = value
+        if day in self.open:
+            self._apply(day)
+
+    def _apply(self, day):
+        for source, value in self.pending.pop(day, {}).items():
+            if value is None:
+                self.open[day].pop(source, None)
+            else:
+                self.open[day][source] = value
+
+    def sweep(self):
+        """Apply pending sections and drop rebuilt sources from saved days
+        this run never touched."""
+        for day in set(report_days(self.report_dir)) | set(self.pending):
+            if day in self.pending or self.reset - self.cleared.get(day, set()):
+                self._get(day)
+        self.flush()
+
+    def flush_older(self):
+        """Write out every day but the latest one the last chunk reached
+        (the next chunk most likely continues it)."""
+        keep = {max(self.recent)} if self.recent else set()
+        self.recent.clear()
+        self.flush(keep)
+
+    def flush(self, keep=()):
+        for day in [d for d in self.open if d not in keep]:
+            _write_day(self.report_dir, self.open.pop(day))
+
+# ---------------------------------------
+# Chunked, offset-aware reading
+# ---------------------------------------
+class _Bounded:
+    """File-like view of f limited to `size` bytes (complete rows only)."""
+
+    def __init__(self, f, size):
+        self.f, self.left = f, size
+
+    def read(self, n=-1):
+        if self.left <= 0:
+            return b""
+        n = self.left if n is None or n < 0 else min(n, self.left)
+        data = self.f.read(n)
+        self.left -= len(data)
+        return data
+
+    def __iter__(self):
+        return iter(lambda: self.read(1 << 16), b"")
+
+def _last_newline(f, size):
+    """Offset just past the last newline (rows after it may be half-written)."""
+    pos = size
+    while pos > 0:
+        step = min(1 << 16, pos)
+        f.seek(pos - step)
+        block = f.read(step)
+        i = block.rfind(b"\n")
+        if i >= 0:
+            return pos - step + i + 1
+        pos -= step
+    return 0
+
+def _chunks(path, file_state, chunksize):
+    """DataFrame chunks (all str) of the rows after file_state["offset"];
+    file_state is advanced as chunks are handed out."""
+    if path.endswith(".gz"):  # compacted partitions are only ever replaced whole
+        if file_state["offset"] == 0:
+            yield from pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize)
+            file_state["offset"] = os.path.getsize(path)
+        return
+    with open(path, "rb") as f:
+        end = _last_newline(f, os.path.getsize(path))
+        start = file_state["offset"]
+        if end <= start:
+            return
+        if not file_state.get("header"):
+            f.seek(0)
+            file_state["header"] = next(csv.reader([f.readline().decode("utf-8")]), [])
+            start = max(start, f.tell())
+        if end <= start:
+            file_state["offset"] = end
+            return
+        f.seek(start)
+        reader = pd.read_csv(_Bounded(f, end - start), names=file_state["header"], header=None,
+                             dtype=str, keep_default_na=False, chunksize=chunksize)
+        yield from reader
+        file_state["offset"] = end
+
+# ---------------------------------------
+# Per-source folds
+# ---------------------------------------
+def _new_messages():
+    return {"messages": 0, "translation_failed": 0, "by_language": {}, "by_member": {}}
+
+def _counts(frame, keys):
+    """Rows per combination of `keys` as parallel lists (fast to iterate)."""
+    sizes = frame.groupby(keys, sort=False).size()
+    if len(keys) == 1:
+        return sizes.index.tolist(), sizes.tolist()
+    return [sizes.index.get_level_values(i).tolist() for i in range(len(keys))] + [sizes.tolist()]
+
+def _fold_messages(days, chunk):
+    frame = pd.DataFrame({
+        "day": _days_of(chunk["Timestamp"]),
+        "member": chunk["From"],
+        "lang": chunk["Language"].replace("", "unknown"),
+        "failed": chunk["Translation"] == TRANSLATION_FAILED,
+    })
+    sections = {}
+    for day, row in frame.groupby("day", sort=False)["failed"].agg(["size", "sum"]).iterrows():
+        sec = sections[day] = days.section(day, "messages", _new_messages)
+        sec["messages"] += int(row["size"])
+        sec["translation_failed"] += int(row["sum"])
+    for day, lang, n in zip(*_counts(frame, ["day", "lang"])):
+        _add(sections[day]["by_language"], lang, n)
+    for day, member, lang, n in zip(*_counts(frame, ["day", "member", "lang"])):
+        by_lang = sections[day]["by_member"].setdefault(member, {})
+        by_lang[lang] = by_lang.get(lang, 0) + n
+
+def _new_health():
+    return {"readings": 0, "flagged": 0, "by_flag": {}, "flagged_members": {}}
+
+def _fold_health(days, chunk):
+    def column(name, fallback):
+        values = chunk.get(name, pd.Series("", index=chunk.index))
+        if fallback in chunk.columns:  # legacy rows (User/Date) in upgraded files
+            values = values.where(values.str.strip() != "", chunk[fallback])
+        return values
+    flags = chunk.get("Flags", pd.Series("", index=chunk.index)).str.strip()
+    day = _days_of(column("Timestamp", "Date"))
+    for d, n in zip(*_counts(pd.DataFrame({"day": day}), ["day"])):
+        days.section(d, "health", _new_health)["readings"] += n
+    flagged = (flags != "") & (flags != "Normal")
+    frame = pd.DataFrame({"day": day[flagged], "member": column("Patient Name", "User")[flagged],
+                          "flags": flags[flagged]})
+    for d, part in frame.groupby("day", sort=False):
+        sec = days.section(d, "health", _new_health)
+        sec["flagged"] += len(part)
+        sec["flagged_members"].update(zip(part["member"].tolist(), part["flags"].tolist()))  # latest reading wins
+    each = frame.assign(flag=frame["flags"].str.split(", ")).explode("flag")
+    for d, flag, n in zip(*_counts(each, ["day", "flag"])):
+        _add(days.section(d, "health", _new_health)["by_flag"], flag, n)
+
+def _new_adherence():
+    return {"taken": 0, "late": 0, "missed": 0, "missed_members": {}}
+
+def _fold_adherence(days, chunk):
+    status = chunk["Status"].str.strip().str.lower()
+    for day, part in chunk.assign(_status=status).groupby(_days_of(chunk["Scheduled Time"]), sort=False):
+        sec = days.section(day, "adherence", _new_adherence)
+        for s, n in part["_status"].value_counts().items():
+            if s in ("taken", "late", "missed"):
+                sec[s] += int(n)
+        for member, n in part.loc[part["_status"] == "missed", "Username"].value_counts().items():
+            _add(sec["missed_members"], member, n)
+
+def _emergency_sections(files, chunksize):
+    """{day: section} from a full pass over the emergency log."""
+    sections = {}
+    for path in files:
+        if not os.path.exists(path):
+            continue
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+            resolved_at = chunk.get("Resolved At", pd.Series("", index=chunk.index))
+            minutes = (pd.to_datetime(resolved_at, errors="coerce") -
+                       pd.to_datetime(chunk["Time"], errors="coerce")).dt.total_seconds() / 60
+            frame = pd.DataFrame({"day": _days_of(chunk["Time"]), "minutes": minutes,
+                                  "city": chunk["City"].replace("", "unknown"),
+                                  "status": chunk["Status"].replace("", "unknown")})
+
+            def section(day):
+                return sections.setdefault(day, {"raised": 0, "by_city": {}, "by_status": {}, "resolve_minutes": []})
+            for day, n in zip(*_counts(frame, ["day"])):
+                section(day)["raised"] += n
+            for day, city, n in zip(*_counts(frame, ["day", "city"])):
+                _add(section(day)["by_city"], city, n)
+            for day, status, n in zip(*_counts(frame, ["day", "status"])):
+                _add(section(day)["by_status"], status, n)
+            done = frame[frame["minutes"] >= 0]
+            for day, m in zip(done["day"].tolist(), done["minutes"].round(1).tolist()):
+                section(day)["resolve_minutes"].append(m)
+    for sec in sections.values():
+        sec["resolve_minutes"].sort()
+    return sections
+
+def _reminder_snapshot(files):
+    active, by_frequency, members = 0, {}, set()
+    for path in files:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            continue
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=CHUNK_ROWS):
+            active += len(chunk)
+            for freq, n in chunk["Frequency"].str.strip().str.lower().replace("", "once").value_counts().items():
+                _add(by_frequency, freq, n)
+            members.update(chunk["Username"])
+    return {"active": active, "members": len(members), "by_frequency": by_frequency}
+
+# ---------------------------------------
+# Sources
+# ---------------------------------------
+def _partitioned_or(log, path):
+    if log_partitions.is_enabled(log):
+        return [p for m in log_partitions.months(log) for p in log_partitions.partition_files(log, m)]
+    return [path]
+
+def incremental_sources():
+    """{source: (files, fold)} for the append-only stores."""
+    return {
+        "messages": (_partitioned_or("messages", config.MESSAGE_LOG_PATH), _fold_messages),
+        "health": (health_checkup.health_data_files(), _fold_health),
+        "adherence": ([adherence.ADHERENCE_LOG], _fold_adherence),
+    }
+
+def update(report_dir=REPORT_DIR, full=False, chunksize=CHUNK_ROWS):
+    """Fold everything new into the day reports; returns {source: rows read}."""
+    os.makedirs(report_dir, exist_ok=True)
+    state_path = os.path.join(report_dir, STATE_FILE)
+    with storage.FileLock(state_path):
+        state = {"files": {}, "digests": {}} if full else _load_state(report_dir)
+        days = _Days(report_dir)
+        read = {}
+        # Mutable stores: full pass; days whose numbers changed are queued and
+        # written along with the append-only sources below
+        sections = _emergency_sections(_partitioned_or("emergencies", emergency.EMERGENCY_LOG), chunksize)
+        digests = state["digests"].setdefault("emergencies", {})
+        for day in set(sections) | set(digests):
+            digest = hashlib.sha1(json.dumps(sections.get(day), sort_keys=True).encode()).hexdigest()
+            if digests.get(day) != digest:
+                days.replace(day, "emergencies", sections.get(day))
+                digests[day] = digest
+        today = datetime.now().strftime("%Y-%m-%d")
+        days.replace(today, "reminders", _reminder_snapshot(reminder.reminder_files()))
+        for source, (files, fold) in incremental_sources().items():
+            tracked = state["files"].setdefault(source, {})
+            present = {p: os.stat(p) for p in files if os.path.exists(p) and os.path.getsize(p) > 0}
+            replaced = [p for p, st in tracked.items()
+                        if p not in present or present[p].st_ino != st["ino"] or present[p].st_size < st["offset"]]
+            if full or replaced:
+                days.reset_source(source)
+                tracked.clear()
+            read[source] = 0
+            for path, st in present.items():
+                file_state = tracked.setdefault(path, {"ino": st.st_ino, "offset": 0, "header": None})
+                for chunk in _chunks(path, file_state, chunksize):
+                    chunk = log_partitions.expand_frame(chunk)  # compacted broadcasts
+                    fold(days, chunk)
+                    read[source] += len(chunk)
+                    days.flush_older()
+            days.flush()
+        read["emergencies"] = sum(s["raised"] for s in sections.values())
+        days.sweep()
+        state["updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        storage.write_json(state_path, state)
+    return read
+
+# ---------------------------------------
+# Output
+# ---------------------------------------
+def summarize(report, top=5):
+    """Flat headline numbers of one day report (one CSV row)."""
+    msg = report.get("messages", _new_messages())
+    emg = report.get("emergencies", {"raised": 0, "by_city": {}, "by_status": {}, "resolve_minutes": []})
+    hl = report.get("health", _new_health())
+    adh = report.get("adherence", _new_adherence())
+    doses = adh["taken"] + adh["late"] + adh["missed"]
+    senders = sorted(msg["by_member"].items(), key=lambda kv: -sum(kv[1].values()))[:top]
+    return {
+        "day": report["day"],
+        "messages": msg["messages"],
+        "senders": len(msg["by_member"]),
+        "translation_failed": msg["translation_failed"],
+        "languages": "; ".join(f"{k}={v}" for k, v in sorted(msg["by_language"].items(), key=lambda kv: -kv[1])),
+        "top_senders": "; ".join(f"{m}={sum(c.values())}" for m, c in senders),
+        "emergencies": emg["raised"],
+        "emergencies_pending": emg["by_status"].get("Pending", 0),
+        "emergency_cities": "; ".join(f"{k}={v}" for k, v in sorted(emg["by_city"].items(), key=lambda kv: -kv[1])),
+        "median_minutes_to_resolve": statistics.median(emg["resolve_minutes"]) if emg["resolve_minutes"] else "",
+        "health_readings": hl["readings"],
+        "flagged_readings": hl["flagged"],
+        "flagged_members": len(hl["flagged_members"]),
+        "doses": doses,
+        "on_time_rate": round(adh["taken"] / doses, 3) if doses else "",
+        "missed_doses": adh["missed"],
+        "active_reminders": report.get("reminders", {}).get("active", ""),
+    }
+
+def select_days(since=None, until=None, report_dir=REPORT_DIR):
+    """Saved report days with since <= day <= until."""
+    return [d for d in report_days(report_dir) if d != UNDATED
+            and (since is None or d >= since) and (until is None or d <= until)]
+
+def write_csv(path, days, report_dir=REPORT_DIR):
+    rows = [summarize(load_day(d, report_dir)) for d in days]
+    with storage.atomic_write(path) as f:
+        writer = csv.DictWriter(f, fieldnames=list(summarize({"day": ""})), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
+
+def write_json(path, days, report_dir=REPORT_DIR):
+    storage.write_json(path, [load_day(d, report_dir) for d in days], indent=1)
+    return len(days)
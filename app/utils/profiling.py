@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+from contextlib import contextmanager
+
+# ---------------------------------------
+# Hot-path timing spans and counters
+# ---------------------------------------
+#   with profiling.span("messaging.generate"): ...
+#   @profiling.timed("auth.authenticate")
+#   profiling.count("roster.download")
+# Spans nest per thread: a span opened inside another is recorded under
+# "parent/child", so time can be attributed to the menu action it belongs
+# to. Time inside an untimed() call (a prompt) is left out of open spans.
+# While profiling is disabled span() hands back one shared no-op context
+# and count() returns at once, so instrumented code pays only a function
+# call.
+_state = {"enabled": False, "jsonl": None, "prometheus": None, "report": False}
+_stats = {}      # span path -> [durations in ms]
+_counters = {}   # counter name -> total
+_lock = threading.Lock()
+_local = threading.local()
+_events = []     # JSON-lines records not yet written
+FLUSH_EVERY = 1000
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+def is_enabled():
+    return _state["enabled"]
+
+def enable(jsonl_path=None, prometheus_path=None, report=False):
+    """Start recording. Spans go to jsonl_path as they finish (buffered); a
+    Prometheus text file and/or a printed breakdown are written at exit."""
+    first = not _state["enabled"]
+    _state.update(enabled=True, jsonl=jsonl_path, prometheus=prometheus_path, report=report)
+    if first:
+        atexit.register(finish)
+
+def disable():
+    _state["enabled"] = False
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _counters.clear()
+        _events.clear()
+
+@contextmanager
+def _span(name, labels):
+    stack = _local.__dict__.setdefault("stack", [])
+    paused = _local.__dict__.setdefault("paused", [])  # seconds spent in untimed() calls, per open span
+    stack.append(name)
+    paused.append(0.0)
+    path = "/".join(stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start - paused.pop()) * 1000
+        stack.pop()
+        with _lock:
+            _stats.setdefault(path, []).append(elapsed)
+            if _state["jsonl"]:
+                event = {"ts": round(time.time(), 3), "span": path, "ms": round(elapsed, 3),
+                         "thread": threading.current_thread().name}
+                if labels:
+                    event.update(labels)
+                _events.append(event)
+                if len(_events) >= FLUSH_EVERY:
+                    _flush_events()
+
+def span(name, **labels):
+    """Time a block; nested spans are recorded under their parent's path."""
+    if not _state["enabled"]:
+        return _NO_SPAN
+    return _span(name, labels)
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state["enabled"]:
+                return fn(*args, **kwargs)
+            with _span(name, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def untimed(fn):
+    """Wrap fn so time spent inside it is left out of the spans open around
+    the call, e.g. input() waiting on the member."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            paused = _local.__dict__.get("paused")
+            if paused:
+                waited = time.perf_counter() - start
+                for i in range(len(paused)):
+                    paused[i] += waited
+    return wrapper
+
+def count(name, n=1):
+    """Add n to a named counter (e.g. cache hits, rows written)."""
+    if not _state["enabled"]:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+# ---------------------------------------
+# Output
+# ---------------------------------------
+def _flush_events():
+    if not _events or not _state["jsonl"]:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(_state["jsonl"])), exist_ok=True)
+    with open(_state["jsonl"], "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in _events))
+    _events.clear()
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def summary():
+    """[{span, count, total_ms, avg_ms, p50_ms, p95_ms, max_ms}] sorted by total time."""
+    with _lock:
+        items = list(_stats.items())
+    rows = [{"span": path, "count": len(d), "total_ms": sum(d), "avg_ms": sum(d) / len(d),
+             "p50_ms": _percentile(d, 50), "p95_ms": _percentile(d, 95), "max_ms": max(d)} for path, d in items]
+    return sorted(rows, key=lambda r: -r["total_ms"])
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+def write_prometheus(path):
+    """Spans as summaries (seconds) and counters as *_total, in Prometheus text format."""
+    lines = ["# TYPE hosla_span_seconds summary"]
+    for row in summary():
+        label = row["span"].replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'hosla_span_seconds{{span="{label}",quantile="0.5"}} {row["p50_ms"] / 1000:.6f}')
+        lines.append(f'hosla_span_seconds{{span="{label}",quantile="0.95"}} {row["p95_ms"] / 1000:.6f}')
+        lines.append(f'hosla_span_seconds_sum{{span="{label}"}} {row["total_ms"] / 1000:.6f}')
+        lines.append(f'hosla_span_seconds_count{{span="{label}"}} {row["count"]}')
+    for name, value in sorted(counters().items()):
+        metric = "hosla_" + "".join(c if c.isalnum() else "_" for c in name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    from app.utils import storage
+    with storage.atomic_write(path) as f:
+        f.write("\n".join(lines) + "\n")
+
+def print_report():
+    rows = summary()
+    if not rows:
+        print("⏱️ No profiled spans recorded.")
+        return
+    width = max(len(r["span"]) for r in rows)
+    print(f"\n⏱️ Latency breakdown:\n{'span':<{width}}  {'count':>6} {'total ms':>10} {'avg':>9} {'p95':>9} {'max':>9}")
+    for r in rows:
+        print(f"{r['span']:<{width}}  {r['count']:>6} {r['total_ms']:>10.1f} {r['avg_ms']:>9.1f} "
+              f"{r['p95_ms']:>9.1f} {r['max_ms']:>9.1f}")
+    for name, value in sorted(counters().items()):
+        print(f"🔢 {name}: {value}")
+
+def finish():
+    """Write the configured outputs (runs at exit once profiling was enabled)."""
+    _state["enabled"] = False  # writing the outputs is not part of the profile
+    with _lock:
+        _flush_events()
+    if _state["prometheus"]:
+        write_prometheus(_state["prometheus"])
+    if _state["report"]:
+        print_report()
@@ -1,62 +1,134 @@
 import os
+import re
+import uuid
+import hashlib
+import calendar
+import functools
+import heapq
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+from app.utils import profiling, shards, storage
 
 REMINDER_FILE = os.path.join(os.path.dirname(__file__), "reminders.csv")
+REMINDER_COLUMNS = ["ID", "Username", "Title", "Notes", "Date", "Time(s)", "Frequency", "Taken"]
+
+def reminder_id(row):
+    """Stable ID for rows saved before reminders had an ID column."""
+    key = "|".join(str(row.get(c, "")) for c in ("Username", "Title", "Date", "Time(s)"))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+def new_reminder_id():
+    return uuid.uuid4().hex[:12]
 
-def load_reminders():
-    if not os.path.exists(REMINDER_FILE):
-        return pd.DataFrame(columns=[
-            "Username", "Title", "Notes", "Date", "Time(s)", "Frequency", "Taken"
-        ])
-    df = pd.read_csv(REMINDER_FILE, dtype=str).fillna("")
+@profiling.timed("reminder.load")
+def load_reminders(username=None):
+    """Reminders as a string DataFrame. With a username and the sharded
+    layout enabled only that member's shard is read; otherwise the result
+    still holds every member's rows."""
+    if shards.is_enabled("reminders"):
+        if username:
+            df = shards.read("reminders", username, dtype=str)
+        else:
+            df = shards.read_all("reminders", dtype=str)
+        if df.empty:
+            return pd.DataFrame(columns=REMINDER_COLUMNS)
+    elif not os.path.exists(REMINDER_FILE):
+        return pd.DataFrame(columns=REMINDER_COLUMNS)
+    else:
+        df = pd.read_csv(REMINDER_FILE, dtype=str)
+    df = df.fillna("")
     if "Taken" not in df.columns:
         df["Taken"] = ""
+    if "ID" not in df.columns:
+        df.insert(0, "ID", "")
+    missing = df["ID"] == ""
+    if missing.any():
+        df.loc[missing, "ID"] = df[missing].apply(reminder_id, axis=1)
     return df
 
-def save_reminders(df):
-    df.to_csv(REMINDER_FILE, index=False)
+@profiling.timed("reminder.save")
+def save_reminders(df, username=None):
+    """Replace the stored reminders with df (only that member's, if given)."""
+    if shards.is_enabled("reminders"):
+        if username:
+            shards.rewrite_member("reminders", username, df)
+        else:
+            shards.rewrite_all("reminders", df)
+    else:
+        storage.rewrite_frame(REMINDER_FILE, df)
+
+def reminder_lock(username=None):
+    """Lock for a read-modify-write of reminders (one member's shard, if sharded)."""
+    if username and shards.is_enabled("reminders"):
+        return storage.FileLock(shards.shard_path("reminders", username))
+    return storage.FileLock(REMINDER_FILE)
+
+def reminder_files():
+    """The files reminders are currently stored in."""
+    if shards.is_enabled("reminders"):
+        return list(shards.paths("reminders").values())
+    return [REMINDER_FILE]
 
 # -----------------------------
 # Add reminder
 # -----------------------------
-def add_reminder(username):
-    df = load_reminders()
-    title = input("Reminder Title: ").strip()
-    notes = input("Notes (optional): ").strip()
-    date_str = input("Date (DD/MM/YYYY or DD-MM-YYYY or DD/MM/YY): ").strip()
-    times_str = input("Time(s) (HH:MM, comma-separated for multiple alerts): ").strip()
-    frequency = input("Frequency (Once/Daily/Weekly/Monthly): ").strip().lower()
-    alert_times_str = input("Alert times (comma-separated, e.g., 09:00,30min-before): ").strip()
+DATE_FORMATS = ("%d/%m/%y", "%d/%m/%Y", "%d-%m-%y", "%d-%m-%Y")
 
-    # Standardize 2-digit year
-    try:
-        date_obj = datetime.strptime(date_str, "%d/%m/%y")
-    except:
+def parse_date(date_str):
+    """DD/MM/YYYY, DD-MM-YYYY (or 2-digit years) as "YYYY-MM-DD"; ValueError if invalid."""
+    for fmt in DATE_FORMATS:
         try:
-            date_obj = datetime.strptime(date_str, "%d/%m/%Y")
-        except:
-            try:
-                date_obj = datetime.strptime(date_str, "%d-%m-%y")
-            except:
-                try:
-                    date_obj = datetime.strptime(date_str, "%d-%m-%Y")
-                except ValueError:
-                    print("❌ Invalid date format.")
-                    return
-    date_final = date_obj.strftime("%Y-%m-%d")
-
-    df = pd.concat([df, pd.DataFrame([{
+            return datetime.strptime(date_str.strip(), fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {date_str}")
+
+@profiling.timed("reminder.create")
+def create_reminder(username, title, notes, date_str, times_str, frequency):
+    """Store a new reminder and return its row; ValueError on an invalid date."""
+    row = {
+        "ID": new_reminder_id(),
         "Username": username,
         "Title": title,
         "Notes": notes,
-        "Date": date_final,
+        "Date": parse_date(date_str),
         "Time(s)": times_str,
         "Frequency": frequency,
         "Taken": ""
-    }])], ignore_index=True)
+    }
+    if shards.is_enabled("reminders"):
+        shards.append("reminders", [row], REMINDER_COLUMNS)
+    else:
+        with storage.FileLock(REMINDER_FILE):
+            header = storage.read_header(REMINDER_FILE)
+            if header and any(c not in header for c in REMINDER_COLUMNS):
+                _upgrade_header(header)
+            storage.append_rows(REMINDER_FILE, [row], REMINDER_COLUMNS)
+    return row
+
+def _upgrade_header(header):
+    """One-time rewrite adding missing REMINDER_COLUMNS to an older-schema
+    reminders.csv (so a new row's ID isn't dropped), storing the IDs
+    load_reminders derives for the existing rows."""
+    columns = header + [c for c in REMINDER_COLUMNS if c not in header]
+    storage.rewrite_frame(REMINDER_FILE, load_reminders()[columns])
 
-    save_reminders(df)
+def add_reminder(username):
+    title = input("Reminder Title: ").strip()
+    notes = input("Notes (optional): ").strip()
+    date_str = input("Date (DD/MM/YYYY or DD-MM-YYYY or DD/MM/YY): ").strip()
+    times_str = input("Time(s) (HH:MM, comma-separated for multiple alerts): ").strip()
+    frequency = input("Frequency (Once/Daily/Weekly/Monthly): ").strip().lower()
+    alert_times_str = input("Alert times (comma-separated, e.g., 09:00,30min-before): ").strip()
+
+    try:
+        create_reminder(username, title, notes, date_str, times_str, frequency)
+    except ValueError:
+        print("❌ Invalid date format.")
+        return
     print("✅ Reminder added successfully!")
     # Google Calendar integration (optional)
     try:
@@ -65,60 +137,278 @@ def add_reminder(username):
     except Exception:
         print("⚠️ Google Calendar credentials not found, skipping calendar integration.")
 
+# -----------------------------
+# Parsing & recurrence
+# -----------------------------
+Reminder = namedtuple("Reminder", "id username title notes start frequency offsets doses taken")
+FREQUENCIES = ("once", "daily", "weekly", "monthly")
+_RELATIVE = re.compile(r"\s*(\d+)\s*(min|hr)-before\s*")
+
+def _parse_clock(value):
+    try:
+        hours, minutes = (int(part) for part in value.strip().split(":"))
+    except ValueError:
+        return None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return None
+    return timedelta(hours=hours, minutes=minutes)
+
+@functools.lru_cache(maxsize=4096)
+def parse_alert_offsets(times_str):
+    """Alert times of a Time(s) value as offsets from the start of the day.
+
+    "09:00, 30min-before" -> [08:30, 09:00]; relative entries count back from
+    the first listed time, as check_reminders always has.
+    """
+    entries = [t.strip() for t in str(times_str).split(",") if t.strip()]
+    base = _parse_clock(entries[0]) if entries else None
+    offsets = set()
+    for entry in entries:
+        match = _RELATIVE.fullmatch(entry)
+        if match:
+            if base is None:
+                continue
+            amount = int(match.group(1))
+            offsets.add(base - (timedelta(minutes=amount) if match.group(2) == "min" else timedelta(hours=amount)))
+        else:
+            clock = _parse_clock(entry)
+            if clock is not None:
+                offsets.add(clock)
+    return tuple(sorted(offsets))
+
+def parse_dose_offsets(times_str):
+    """Only the absolute times of a Time(s) value (the doses themselves)."""
+    return parse_alert_offsets(",".join(t for t in str(times_str).split(",") if not _RELATIVE.fullmatch(t.strip())))
+
+def parse_reminder(row):
+    """Parse a reminders.csv row once into a Reminder (None if the date is invalid)."""
+    try:
+        start = datetime.combine(date.fromisoformat(str(row["Date"]).strip()), time())
+    except ValueError:
+        return None
+    frequency = str(row.get("Frequency", "")).strip().lower()
+    return Reminder(
+        id=row.get("ID") or reminder_id(row),
+        username=row.get("Username", ""),
+        title=row.get("Title", ""),
+        notes=row.get("Notes", ""),
+        start=start,
+        frequency=frequency if frequency in FREQUENCIES else "once",
+        offsets=parse_alert_offsets(str(row.get("Time(s)", ""))),
+        doses=parse_dose_offsets(str(row.get("Time(s)", ""))),
+        taken=str(row.get("Taken", "")).strip().lower() == "yes",
+    )
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+def occurrence_day(reminder, k):
+    """Start of the k-th occurrence (k = 0 is the reminder's Date)."""
+    if reminder.frequency == "daily":
+        return reminder.start + timedelta(days=k)
+    if reminder.frequency == "weekly":
+        return reminder.start + timedelta(weeks=k)
+    if reminder.frequency == "monthly":
+        return _add_months(reminder.start, k)
+    return reminder.start
+
+def occurrence_index(reminder, when):
+    """Index of the last occurrence starting on or before `when` (>= 0)."""
+    if reminder.frequency == "once" or when <= reminder.start:
+        return 0
+    if reminder.frequency == "daily":
+        return (when - reminder.start).days
+    if reminder.frequency == "weekly":
+        return (when - reminder.start).days // 7
+    months = (when.year - reminder.start.year) * 12 + when.month - reminder.start.month
+    return max(0, months if _add_months(reminder.start, months) <= when else months - 1)
+
+def next_fire(reminder, after):
+    """Earliest alert time of the reminder strictly after `after`, or None."""
+    if not reminder.offsets:
+        return None
+    if reminder.frequency == "once":
+        return next((reminder.start + off for off in reminder.offsets if reminder.start + off > after), None)
+    # Occurrences whose alerts could still lie after `after`
+    k = max(0, occurrence_index(reminder, after - reminder.offsets[-1]) - 1)
+    while True:
+        day = occurrence_day(reminder, k)
+        if day + reminder.offsets[-1] > after:
+            # Relative alerts can reach into the previous day, so also look at k + 1
+            candidates = [d + off for d in (day, occurrence_day(reminder, k + 1))
+                          for off in reminder.offsets if d + off > after]
+            return min(candidates)
+        k += 1
+
+# -----------------------------
+# Calendar views
+# -----------------------------
+def iter_occurrences(reminder, start, end):
+    """Lazily yield the reminder's alert times in [start, end)."""
+    when = next_fire(reminder, start - timedelta(microseconds=1))
+    while when is not None and when < end:
+        yield when
+        when = next_fire(reminder, when)
+
+def iter_reminders(username=None, df=None):
+    """Parsed reminders, optionally for one member."""
+    df = load_reminders(username) if df is None else df
+    if username:
+        df = df[df["Username"].str.strip().str.lower() == username.strip().lower()]
+    for row in df.to_dict("records"):
+        rem = parse_reminder(row)
+        if rem is not None:
+            yield rem
+
+def iter_due(start, end, username=None, df=None):
+    """Lazily yield (alert time, Reminder) for every alert in [start, end),
+    in chronological order across all reminders (or one member's)."""
+    def stream(i, rem):
+        for when in iter_occurrences(rem, start, end):
+            yield when, i, rem
+
+    streams = [stream(i, rem) for i, rem in enumerate(iter_reminders(username, df))
+               if not (rem.frequency == "once" and rem.taken)]
+    for when, _, rem in heapq.merge(*streams):
+        yield when, rem
+
+_table_cache = {"stat": None, "table": None}
+
+def reminder_table(df=None):
+    """One row per (reminder, alert offset) with typed columns, for vectorized
+    queries. Cached until the reminder file(s) change."""
+    stat = None
+    if df is None:
+        stat = tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, filter(os.path.exists, reminder_files())))
+        if stat and stat == _table_cache["stat"]:
+            return _table_cache["table"]
+    rows = [
+        (rem.id, rem.username, rem.title, rem.notes, rem.start, FREQUENCIES.index(rem.frequency), rem.taken, off)
+        for rem in iter_reminders(df=df) for off in rem.offsets
+    ]
+    table = pd.DataFrame(rows, columns=["ID", "Username", "Title", "Notes", "Start", "Frequency", "Taken", "Offset"])
+    table["Start"] = pd.to_datetime(table["Start"])
+    table["Offset"] = pd.to_timedelta(table["Offset"])
+    if df is None:
+        _table_cache.update(stat=stat, table=table)
+    return table
+
+def due_within(minutes, now=None, username=None, df=None):
+    """Every alert due in the next `minutes` across all members, vectorized.
+
+    Candidate days are checked against all (reminder, offset) rows at once,
+    so a caregiver's view over hundreds of members needs no per-row loop.
+    """
+    now = pd.Timestamp(now or datetime.now())
+    end = now + pd.Timedelta(minutes=minutes)
+    table = reminder_table(df)
+    if username:
+        table = table[table["Username"].str.strip().str.lower() == username.strip().lower()]
+    if table.empty:
+        return table.assign(**{"Alert Time": pd.Series(dtype="datetime64[ns]")})
+
+    start_vals = table["Start"].to_numpy()
+    start_day = table["Start"].dt.day.to_numpy()
+    freq = table["Frequency"].to_numpy()
+    offset = table["Offset"].to_numpy()
+    first_day = (now - table["Offset"].max()).normalize()
+    last_day = (end - table["Offset"].min()).normalize()
+
+    hits = []
+    for day in pd.date_range(first_day, last_day, freq="D"):
+        alert = day.to_datetime64() + offset
+        days_since = (day.to_datetime64() - start_vals) // pd.Timedelta(days=1)
+        occurs = np.select(
+            [freq == 0, freq == 1, freq == 2, freq == 3],
+            [days_since == 0,
+             days_since >= 0,
+             (days_since >= 0) & (days_since % 7 == 0),
+             (days_since >= 0) & (np.minimum(start_day, day.days_in_month) == day.day)],
+            False,
+        )
+        mask = occurs & (alert >= now.to_datetime64()) & (alert < end.to_datetime64())
+        mask &= ~((freq == 0) & table["Taken"].to_numpy())
+        if mask.any():
+            hits.append(table[mask].assign(**{"Alert Time": alert[mask]}))
+    if not hits:
+        return table.iloc[0:0].assign(**{"Alert Time": pd.Series(dtype="datetime64[ns]")})
+    return pd.concat(hits).sort_values("Alert Time").reset_index(drop=True)
+
 # -----------------------------
 # Check reminders
 # -----------------------------
-def check_reminders(username=None, show_all=False):
-    df = load_reminders()
+@profiling.timed("reminder.upcoming")
+def upcoming_alerts(username=None, show_all=False, days=7, now=None):
+    """Alerts as dicts (ID, Username, Title, Notes, Alert Time, Frequency,
+    Taken); recurring reminders are expanded for the next `days` days."""
+    df = load_reminders(username)
     if username:
         df = df[df["Username"] == username]
-
     if df.empty:
+        return []
+
+    from app.utils import adherence
+    stats = adherence.load_stats()
+    now = now or datetime.now()
+    alerts = []
+    for rem in iter_reminders(df=df):
+        if rem.frequency == "once":
+            times = [rem.start + off for off in rem.offsets if show_all or rem.start + off >= now]
+        else:
+            times = iter_occurrences(rem, now, now + timedelta(days=days))
+        for alert_time in times:
+            alerts.append({"ID": rem.id, "Username": rem.username, "Title": rem.title, "Notes": rem.notes,
+                           "Alert Time": alert_time, "Frequency": rem.frequency,
+                           "Taken": bool(rem.taken or adherence.is_recorded(stats, rem.id, alert_time))})
+    return alerts
+
+def check_reminders(username=None, show_all=False, days=7):
+    """Print upcoming alerts; recurring reminders are expanded for the next `days` days."""
+    alerts = upcoming_alerts(username, show_all, days)
+    if not alerts:
         print("📭 No upcoming reminders.")
         return
 
     print("\n🔔 Upcoming Reminders:")
-    now = datetime.now()
-    for i, row in df.iterrows():
-        # Get all alert times
-        times_list = [t.strip() for t in row["Time(s)"].split(",") if t.strip()]
-        for t_str in times_list:
-            try:
-                # Handle relative times like 30min-before, 1hr-before
-                if "min-before" in t_str:
-                    mins = int(t_str.replace("min-before", "").strip())
-                    alert_time = datetime.strptime(row["Date"] + " " + times_list[0], "%Y-%m-%d %H:%M") - timedelta(minutes=mins)
-                elif "hr-before" in t_str:
-                    hrs = int(t_str.replace("hr-before", "").strip())
-                    alert_time = datetime.strptime(row["Date"] + " " + times_list[0], "%Y-%m-%d %H:%M") - timedelta(hours=hrs)
-                else:
-                    alert_time = datetime.strptime(row["Date"] + " " + t_str, "%Y-%m-%d %H:%M")
-            except:
-                continue
-
-            if show_all or alert_time >= now:
-                print(f"🔹 {row['Username']}: {row['Title']} ({row['Notes']}) at {alert_time.strftime('%Y-%m-%d %H:%M')} | Taken: {row['Taken']}")
+    for a in alerts:
+        repeat = "" if a["Frequency"] == "once" else f" [{a['Frequency']}]"
+        print(f"🔹 {a['Username']}: {a['Title']} ({a['Notes']}) at {a['Alert Time'].strftime('%Y-%m-%d %H:%M')}{repeat} | Taken: {'Yes' if a['Taken'] else ''}")
 
 # -----------------------------
 # Mark as Taken
 # -----------------------------
 def mark_as_taken(username):
-    df = load_reminders()
+    """Log the current dose of one of the member's reminders as taken."""
+    from app.utils import adherence
+    df = load_reminders(username)
     df_user = df[df["Username"] == username]
     if df_user.empty:
         print("📭 No reminders to mark as taken.")
         return
 
+    stats = adherence.update_stats()
     print("\n📝 Reminders for marking as taken:")
+    choices = {}
     for idx, row in df_user.iterrows():
-        print(f"[{idx}] {row['Title']} on {row['Date']} at {row['Time(s)']} | Taken: {row['Taken']}")
+        rem = parse_reminder(row.to_dict())
+        if rem is None:
+            continue
+        choices[idx] = rem
+        due = adherence.pending_dose(rem, stats)
+        due_str = f"next dose {due.strftime('%Y-%m-%d %H:%M')}" if due else "no dose due"
+        print(f"[{idx}] {row['Title']} ({rem.frequency}) at {row['Time(s)']} | {due_str}")
 
     try:
         sel = int(input("Enter the index to mark as taken: ").strip())
-        if sel in df.index:
-            df.at[sel, "Taken"] = "Yes"
-            save_reminders(df)
-            print("✅ Marked as Taken!")
+        if sel in choices:
+            entry = adherence.mark_taken(choices[sel])
+            if entry:
+                print(f"✅ Marked dose of {entry['Scheduled Time']} as {entry['Status']}!")
+            else:
+                print("📭 No dose due for this reminder right now.")
         else:
             print("❌ Invalid index.")
     except ValueError:
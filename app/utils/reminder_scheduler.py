@@ -0,0 +1,166 @@
+import os
+import csv
+import heapq
+import hashlib
+import threading
+from datetime import datetime
+
+from app.utils import reminder
+
+# ---------------------------------------
+# Long-running reminder scheduler
+# ---------------------------------------
+# Every reminder is parsed once into a reminder.Reminder and its next alert
+# time is kept in a min-heap. The loop sleeps until the earliest alert (or
+# the next file poll), fires it and pushes the reminder's following alert.
+# Edits to the reminder file(s) are picked up by diffing row hashes, so
+# unchanged reminders are never re-parsed or re-scheduled. With the sharded
+# layout every member shard is followed as its own file.
+POLL_INTERVAL = 30  # seconds between checks of reminders.csv for changes
+
+def _row_hash(row):
+    return hashlib.sha1("\x1f".join(f"{k}={v}" for k, v in sorted(row.items())).encode("utf-8")).hexdigest()
+
+def print_alert(rem, when):
+    print(f"🔔 [{when.strftime('%Y-%m-%d %H:%M')}] {rem.username}: {rem.title}"
+          + (f" ({rem.notes})" if rem.notes else ""), flush=True)
+
+class _FileState:
+    """How much of one reminder file has been parsed."""
+
+    def __init__(self):
+        self.stat = None
+        self.offset = 0       # bytes of the file already parsed
+        self.tail = b""       # last bytes before offset, to detect rewrites
+        self.header = None
+        self.ids = set()      # reminder ids read from this file
+
+class ReminderScheduler:
+    """Min-heap of (next alert time, reminder id) fed from the reminder file(s)."""
+
+    def __init__(self, path=None, on_fire=print_alert, poll_interval=POLL_INTERVAL, clock=datetime.now):
+        self.path = path      # None: follow reminder.reminder_files()
+        self.on_fire = on_fire
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.reminders = {}   # id -> (row hash, Reminder)
+        self.versions = {}    # id -> int, bumped on every reschedule (lazy heap deletion)
+        self.heap = []
+        self.files = {}       # path -> _FileState
+        self._stop = threading.Event()
+
+    # ---------------- scheduling ----------------
+    def _schedule(self, rid, rem, after):
+        self.versions[rid] = self.versions.get(rid, 0) + 1
+        if rem.frequency == "once" and rem.taken:
+            return
+        when = reminder.next_fire(rem, after)
+        if when is not None:
+            heapq.heappush(self.heap, (when, rid, self.versions[rid]))
+
+    def _upsert(self, row, now):
+        """Parse and schedule a new or changed row; returns its reminder id."""
+        rid = row.get("ID") or reminder.reminder_id(row)
+        digest = _row_hash(row)
+        current = self.reminders.get(rid)
+        if current and current[0] == digest:
+            return rid
+        rem = reminder.parse_reminder(row)
+        if rem is None:
+            self._remove(rid)
+            return None
+        self.reminders[rid] = (digest, rem)
+        self._schedule(rid, rem, now)
+        return rid
+
+    def _remove(self, rid):
+        self.reminders.pop(rid, None)
+        self.versions[rid] = self.versions.get(rid, 0) + 1
+
+    # ---------------- file sync ----------------
+    def sync(self):
+        """Pick up additions and edits to the reminder file(s).
+
+        Appended bytes are parsed incrementally; a rewritten file is diffed
+        row by row against the reminders it held before.
+        """
+        paths = [self.path] if self.path else reminder.reminder_files()
+        for path in set(self.files) - set(paths):
+            for rid in self.files.pop(path).ids:
+                self._remove(rid)
+        for path in paths:
+            self._sync_file(path, self.files.setdefault(path, _FileState()))
+
+    def _sync_file(self, path, state):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            for rid in state.ids:
+                self._remove(rid)
+            state.__init__()
+            return
+        stat = (st.st_mtime_ns, st.st_size)
+        if stat == state.stat:
+            return
+        now = self.clock()
+
+        with open(path, "rb") as f:
+            appended = False
+            if state.offset and st.st_size >= state.offset:
+                f.seek(max(0, state.offset - len(state.tail)))
+                appended = f.read(len(state.tail)) == state.tail
+            if appended:
+                data = f.read()
+                end = data.rfind(b"\n") + 1   # ignore a partially written last line
+                lines = data[:end].decode("utf-8").splitlines()
+                for row in csv.DictReader(lines, fieldnames=state.header):
+                    state.ids.add(self._upsert(row, now))
+                state.offset += end
+            else:
+                f.seek(0)
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                lines = data[:end].decode("utf-8").splitlines()
+                state.header = next(csv.reader(lines[:1]), None)
+                seen = {self._upsert(row, now) for row in csv.DictReader(lines)}
+                for rid in state.ids - seen:
+                    self._remove(rid)
+                state.ids = seen
+                state.offset = end
+            state.ids.discard(None)
+            f.seek(max(0, state.offset - 64))
+            state.tail = f.read(min(64, state.offset))
+        state.stat = stat
+
+    # ---------------- main loop ----------------
+    def fire_due(self):
+        """Fire every alert that is due now; returns how many fired."""
+        now = self.clock()
+        fired = 0
+        while self.heap and self.heap[0][0] <= now:
+            when, rid, version = heapq.heappop(self.heap)
+            if self.versions.get(rid) != version or rid not in self.reminders:
+                continue  # stale entry for an edited/removed reminder
+            rem = self.reminders[rid][1]
+            self.on_fire(rem, when)
+            fired += 1
+            self._schedule(rid, rem, when)
+        return fired
+
+    def seconds_until_next(self):
+        while self.heap and self.versions.get(self.heap[0][1]) != self.heap[0][2]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None
+        return max(0.0, (self.heap[0][0] - self.clock()).total_seconds())
+
+    def run(self):
+        """Block until stop(): sleep until the next alert or file poll."""
+        while not self._stop.is_set():
+            self.sync()
+            self.fire_due()
+            wait = self.seconds_until_next()
+            self._stop.wait(self.poll_interval if wait is None else min(wait, self.poll_interval))
+
+    def stop(self):
+        self._stop.set()
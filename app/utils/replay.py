@@ -0,0 +1,220 @@
+import json
+import time
+import random
+import asyncio
+import numpy as np
+
+from app.utils import server
+
+# ---------------------------------------
+# Scripted session replay (load testing)
+# ---------------------------------------
+# A script is JSON lines, one step per line, in the server's request shape
+# plus the session it belongs to:
+#   {"session": "rina", "action": "login", "args": {"username": "rina", "password": "..."}}
+#   {"session": "rina", "action": "send_message", "args": {"to": "Krishna Dutta", "message": "...", "language": "bn"}}
+#   {"session": "rina", "action": "raise_emergency", "args": {"cause": "dizziness"}, "pause_ms": 2000}
+# Steps of one session run in order; sessions run concurrently. A step may
+# carry "member" to act as that member without logging in (local replay
+# only) and "pause_ms" to wait (think time) before it. Actions are the ones
+# in server.ACTIONS, so no prompt or TTY is involved.
+
+def load_script(path):
+    """{session: [step, ...]} from a JSONL script, sessions in first-seen order."""
+    sessions = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                step = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line_no}: {e}") from None
+            action = step.get("action")
+            if action not in server.ACTIONS and action not in ("login", "ping"):
+                raise ValueError(f"Line {line_no}: unknown action {action!r}")
+            sessions.setdefault(str(step.get("session", line_no)), []).append(step)
+    return sessions
+
+def write_script(path, sessions):
+    with open(path, "w", encoding="utf-8") as f:
+        for name, steps in sessions.items():
+            for step in steps:
+                f.write(json.dumps({"session": name, **step}, ensure_ascii=False) + "\n")
+
+# ---------------------------------------
+# Targets: in-process or a running server
+# ---------------------------------------
+class LocalTarget:
+    """Runs steps through server.Server.dispatch in this process, the same
+    code path (and thread pools) a served session uses."""
+
+    def __init__(self, app=None):
+        self.app = app or server.Server()
+
+    async def open(self):
+        return {"member": None}
+
+    async def call(self, session, step):
+        if step.get("member"):
+            session["member"] = step["member"]
+        return await self.app.dispatch(session, step)
+
+    async def close(self, session):
+        pass
+
+class RemoteTarget:
+    """Sends steps to a server started with run_server.py, one connection per session."""
+
+    def __init__(self, host=server.DEFAULT_HOST, port=server.DEFAULT_PORT):
+        self.host, self.port = host, port
+
+    async def open(self):
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def call(self, session, step):
+        if step.get("member"):
+            raise ValueError("'member' steps need a login when replaying against a server")
+        reader, writer = session
+        request = {"id": step["action"], "action": step["action"], "args": step.get("args") or {}}
+        writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    async def close(self, session):
+        _, writer = session
+        writer.write(b'{"action": "quit"}\n')
+        writer.close()
+
+# ---------------------------------------
+# Replay and statistics
+# ---------------------------------------
+class Stats:
+    def __init__(self):
+        self.latencies = {}  # action -> [ms]
+        self.errors = {}     # action -> {message: count}
+
+    def record(self, action, ms, error=None):
+        self.latencies.setdefault(action, []).append(ms)
+        if error is not None:
+            by_message = self.errors.setdefault(action, {})
+            by_message[error] = by_message.get(error, 0) + 1
+
+    def report(self, elapsed):
+        """{"elapsed_s", "requests", "requests_per_s", "errors", "actions": [per-action rows]}."""
+        rows = []
+        for action, values in sorted(self.latencies.items()):
+            ms = np.array(values)
+            errors = self.errors.get(action, {})
+            rows.append({
+                "action": action, "count": len(ms), "errors": sum(errors.values()),
+                "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                "p99_ms": round(float(np.percentile(ms, 99)), 2),
+                "max_ms": round(float(ms.max()), 2),
+                "top_errors": sorted(errors.items(), key=lambda e: -e[1])[:3],
+            })
+        requests = sum(r["count"] for r in rows)
+        return {"elapsed_s": round(elapsed, 3), "requests": requests,
+                "requests_per_s": round(requests / elapsed, 1) if elapsed else 0.0,
+                "errors": sum(r["errors"] for r in rows), "actions": rows}
+
+async def _run_session(target, steps, stats, speed):
+    session = await target.open()
+    try:
+        for step in steps:
+            if step.get("pause_ms") and speed:
+                await asyncio.sleep(step["pause_ms"] / 1000 / speed)
+            error = None
+            start = time.perf_counter()
+            try:
+                await target.call(session, step)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            stats.record(step["action"], (time.perf_counter() - start) * 1000, error)
+    finally:
+        await target.close(session)
+
+async def replay(sessions, target, concurrency=20, repeat=1, speed=0):
+    """Replay every session `repeat` times with at most `concurrency` live at
+    once. speed scales pause_ms (0 ignores pauses, 1 keeps them as recorded).
+    Returns Stats.report()."""
+    stats = Stats()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(steps):
+        async with gate:
+            try:
+                await _run_session(target, steps, stats, speed)
+            except (OSError, ConnectionError) as e:  # could not connect at all
+                stats.record("connect", 0.0, f"{type(e).__name__}: {e}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(steps) for _ in range(repeat) for steps in sessions.values()))
+    return stats.report(time.perf_counter() - start)
+
+def print_report(report):
+    print(f"\n📊 {report['requests']} requests in {report['elapsed_s']:.1f}s "
+          f"({report['requests_per_s']:.0f} req/s), {report['errors']} error(s)")
+    print(f"{'action':<18} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for r in report["actions"]:
+        print(f"{r['action']:<18} {r['count']:>7} {r['errors']:>7} {r['p50_ms']:>9.1f} "
+              f"{r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}")
+        for message, n in r["top_errors"]:
+            print(f"   ⚠️ {n}x {message}")
+
+# ---------------------------------------
+# Synthetic scripts
+# ---------------------------------------
+CAUSES = ["dizziness", "fall at home", "chest pain", "breathlessness"]
+MESSAGES = [("bn", "কাল সকালে হাঁটতে যাবেন?"), ("hi", "आप कैसे हैं?"), ("en", "See you at the event!"),
+            ("ta", "இன்று வானிலை நன்றாக உள்ளது.")]
+
+def _random_step(rng, names):
+    roll = rng.random()
+    if roll < 0.20:
+        return {"action": "reminders", "args": {"days": 7}}
+    if roll < 0.30:
+        return {"action": "add_reminder", "args": {"title": "Event day walk", "date_str": "01/01/2030",
+                                                   "times": "07:00", "frequency": "once"}}
+    if roll < 0.45:
+        language, message = rng.choice(MESSAGES)
+        return {"action": "send_message", "args": {"to": rng.choice(names), "message": message, "language": language}}
+    if roll < 0.60:
+        return {"action": "inbox", "args": {}}
+    if roll < 0.70:
+        return {"action": "members_like_me", "args": {"page": 1}}
+    if roll < 0.78:
+        return {"action": "record_health", "args": {
+            "temperature": round(rng.uniform(97.5, 100.5), 1), "systolic": rng.randint(110, 160),
+            "diastolic": rng.randint(70, 100), "heart_rate": rng.randint(60, 100), "cholesterol": rng.randint(150, 260)}}
+    if roll < 0.84:
+        return {"action": "health_trends", "args": {}}
+    if roll < 0.92:
+        return {"action": "emergencies", "args": {}}
+    if roll < 0.96:
+        return {"action": "find_members", "args": {"name": rng.choice(names).split()[0]}}
+    return {"action": "raise_emergency", "args": {"cause": rng.choice(CAUSES)}}
+
+def make_sessions(roster_df, sessions=100, steps=10, password=None, seed=0):
+    """A random mix of menu actions for `sessions` roster members. Each session
+    logs in with `password`, or acts as its member directly when password is None."""
+    rng = random.Random(seed)
+    names = roster_df["Member Name"].tolist()
+    rows = roster_df.sample(n=min(sessions, len(roster_df)), random_state=seed)
+    script = {}
+    for _, member in rows.iterrows():
+        if password is None:
+            first = {"action": "ping", "args": {}, "member": member["Member Name"]}
+        else:
+            first = {"action": "login", "args": {"username": member.get("Username", ""), "password": password}}
+        script[member["Member Name"]] = [first] + [
+            {**_random_step(rng, names), "pause_ms": rng.randint(500, 5000)} for _ in range(steps)]
+    return script
@@ -0,0 +1,49 @@
+import time
+import threading
+import pandas as pd
+from app.utils import config, profiling
+
+# ---------------------------------------
+# Cached member roster (Google Sheet)
+# ---------------------------------------
+# Downloaded once and reused for ROSTER_TTL seconds, so batch jobs and
+# repeated lookups don't fetch the sheet again for every call.
+ROSTER_TTL = 300
+_cache = {"df": None, "loaded_at": 0.0, "lookup": None}
+_lock = threading.Lock()
+
+def load_roster(refresh=False):
+    """Member roster as a string DataFrame with stripped columns and values."""
+    if refresh or _cache["df"] is None or time.time() - _cache["loaded_at"] > ROSTER_TTL:
+        with _lock:  # concurrent sessions share one download
+            if refresh or _cache["df"] is None or time.time() - _cache["loaded_at"] > ROSTER_TTL:
+                with profiling.span("roster.download"):
+                    df = pd.read_csv(config.GOOGLE_SHEET_CSV_URL, dtype=str).fillna("")
+                df.columns = df.columns.str.strip()
+                for col in ("Member Name", "Username", "Active", "City", "Interests", "Profile Picture"):
+                    if col in df.columns:
+                        df[col] = df[col].str.strip()
+                _cache.update(df=df, loaded_at=time.time(), lookup=None)
+    return _cache["df"]
+
+def normalize_name(name):
+    return " ".join(str(name).split()).lower()
+
+def member_lookup(refresh=False):
+    """{normalized member name or username: roster row index}."""
+    df = load_roster(refresh)
+    if _cache["lookup"] is None:
+        lookup = {}
+        if "Username" in df.columns:
+            lookup.update((normalize_name(u), i) for i, u in zip(df.index, df["Username"]) if u)
+        lookup.update((normalize_name(n), i) for i, n in zip(df.index, df["Member Name"]) if n)
+        _cache["lookup"] = lookup
+    return _cache["lookup"]
+
+def resolve_members(names, refresh=False):
+    """Exact roster Member Name for each name (or None), matched on member
+    name or username, ignoring case and repeated whitespace."""
+    df = load_roster(refresh)
+    lookup = member_lookup()
+    rows = [lookup.get(normalize_name(n)) for n in names]
+    return [df.at[r, "Member Name"] if r is not None else None for r in rows]
@@ -0,0 +1,119 @@
+import os
+import json
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import actions
+
+# ---------------------------------------
+# Multi-user server (JSON lines over TCP)
+# ---------------------------------------
+# One process serves many members at once. Each connection is a session:
+#   -> {"id": 1, "action": "login", "args": {"username": "...", "password": "..."}}
+#   <- {"id": 1, "ok": true, "result": {...member record...}}
+#   -> {"id": 2, "action": "reminders", "args": {"days": 7}}
+#   <- {"id": 2, "ok": true, "result": [...]}
+# Errors come back as {"id": ..., "ok": false, "error": "..."}. Actions run
+# in thread pools so the event loop never blocks; the roster cache,
+# translation models and indexes are loaded once and shared by every session.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+IO_WORKERS = 32                   # CSV reads/appends, roster lookups
+CPU_WORKERS = os.cpu_count() or 4  # bcrypt, model inference, charts, search
+
+# action -> (function, pool); every function takes the session member first
+ACTIONS = {
+    "add_reminder": (actions.add_reminder, "io"),
+    "reminders": (actions.upcoming_reminders, "io"),
+    "mark_taken": (actions.mark_taken, "io"),
+    "send_message": (actions.send_message, "cpu"),
+    "inbox": (actions.inbox, "io"),
+    "find_members": (actions.find_members, "io"),
+    "members_like_me": (actions.members_like_me, "io"),
+    "raise_emergency": (actions.raise_emergency, "io"),
+    "emergencies": (actions.list_emergencies, "io"),
+    "resolve_emergency": (actions.resolve_emergency, "io"),
+    "record_health": (actions.record_health, "io"),
+    "health_trends": (actions.view_health_trends, "cpu"),
+    "find_song": (actions.find_song, "cpu"),
+}
+
+class Server:
+    """Asyncio line-protocol server; `authenticate(username, password)` returns
+    the member record or raises ValueError (defaults to actions.login)."""
+
+    def __init__(self, authenticate=None, io_workers=IO_WORKERS, cpu_workers=CPU_WORKERS):
+        self.authenticate = authenticate or actions.login
+        self.pools = {"io": ThreadPoolExecutor(io_workers, thread_name_prefix="io"),
+                      "cpu": ThreadPoolExecutor(cpu_workers, thread_name_prefix="cpu")}
+        self.sessions = 0
+        self.requests = 0
+
+    async def _run(self, pool, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pools[pool], functools.partial(fn, *args, **kwargs))
+
+    async def dispatch(self, session, request):
+        """Result of one request for a session dict (holding the logged-in member)."""
+        action, args = request.get("action"), request.get("args") or {}
+        if not isinstance(args, dict):
+            raise ValueError("args must be an object")
+        if action == "ping":
+            return "pong"
+        if action == "login":
+            record = await self._run("cpu", self.authenticate, args.get("username", ""), args.get("password", ""))
+            session["member"] = record.get("Member Name") or args.get("username")
+            return record
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+        if not session.get("member"):
+            raise ValueError("Please log in first.")
+        fn, pool = ACTIONS[action]
+        return await self._run(pool, fn, session["member"], **args)
+
+    async def handle(self, reader, writer):
+        session = {"member": None}
+        self.sessions += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    request_id = request.get("id")
+                    if request.get("action") == "quit":
+                        break
+                    response = {"id": request_id, "ok": True, "result": await self.dispatch(session, request)}
+                except (ValueError, TypeError) as e:  # bad input, bad JSON or wrong arguments
+                    response = {"id": request_id, "ok": False, "error": str(e)}
+                except Exception as e:
+                    response = {"id": request_id, "ok": False, "error": f"Internal error: {e}"}
+                self.requests += 1
+                writer.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.shutdown(wait=False)
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, server=None):
+    server = server or Server()
+    listener = await server.start(host, port)
+    addr = listener.sockets[0].getsockname()
+    print(f"🚀 Hosla server listening on {addr[0]}:{addr[1]}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
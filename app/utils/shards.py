@@ -0,0 +1,198 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pandas as pd
+
+from app.utils import roster, storage
+from app.utils.config import BASE_DIR
+
+# ---------------------------------------
+# Per-member sharded data layout
+# ---------------------------------------
+# Optional layout where each dataset keeps one CSV per member:
+#   data/shards/manifest.json             datasets, key column, columns, members
+#   data/shards/<dataset>/<member>.csv    that member's rows only
+# A shard's file name is derived from the member key, so reading or
+# appending one member's data never touches anyone else's; the manifest is
+# only updated when a member gets their first shard.
+SHARD_DIR = os.path.join(BASE_DIR, "data", "shards")
+MANIFEST_FILE = "manifest.json"
+DATASETS = {"reminders": "Username", "health": "Patient Name"}
+FALLBACK_KEYS = {"health": ["User"]}  # legacy health rows name the member here
+UNASSIGNED = "_unassigned"
+
+def _manifest_path(shard_dir):
+    return os.path.join(shard_dir, MANIFEST_FILE)
+
+def load_manifest(shard_dir=SHARD_DIR):
+    try:
+        with open(_manifest_path(shard_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": 1, "datasets": {}}
+
+def is_enabled(dataset, shard_dir=SHARD_DIR):
+    """A dataset is sharded once it has been migrated (its directory exists)."""
+    return os.path.isdir(os.path.join(shard_dir, dataset))
+
+def member_key(name):
+    key = roster.normalize_name(name) if name is not None and not pd.isna(name) else ""
+    return key or UNASSIGNED
+
+def shard_file(key):
+    slug = re.sub(r"[^a-z0-9]+", "_", key).strip("_")[:40] or "member"
+    return f"{slug}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}.csv"
+
+def shard_path(dataset, member, shard_dir=SHARD_DIR):
+    return os.path.join(shard_dir, dataset, shard_file(member_key(member)))
+
+def paths(dataset, shard_dir=SHARD_DIR):
+    """{member key: shard path} for every member of a dataset."""
+    info = load_manifest(shard_dir)["datasets"].get(dataset, {})
+    base = os.path.join(shard_dir, dataset)
+    return {key: os.path.join(base, name) for key, name in info.get("members", {}).items()}
+
+def _register(dataset, keys, columns, shard_dir):
+    """Add new members (and the dataset itself) to the manifest."""
+    with storage.FileLock(_manifest_path(shard_dir)):
+        manifest = load_manifest(shard_dir)
+        info = manifest["datasets"].setdefault(dataset, {"key": DATASETS[dataset], "columns": list(columns), "members": {}})
+        new = {k: shard_file(k) for k in keys if k not in info["members"]}
+        if new:
+            info["members"].update(new)
+            storage.write_json(_manifest_path(shard_dir), manifest, indent=1)
+
+def row_keys(dataset, df):
+    """Member key of every row of a DataFrame."""
+    names = df[DATASETS[dataset]] if DATASETS[dataset] in df.columns else pd.Series("", index=df.index)
+    names = names.fillna("").astype(str)
+    for col in FALLBACK_KEYS.get(dataset, []):
+        if col in df.columns:
+            names = names.where(names.str.strip() != "", df[col].fillna("").astype(str))
+    return names.map(member_key)
+
+# ---------------------------------------
+# Reads
+# ---------------------------------------
+def read(dataset, member, shard_dir=SHARD_DIR, **read_kwargs):
+    """One member's rows (an empty frame if they have none). O(member's data)."""
+    path = shard_path(dataset, member, shard_dir)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        columns = load_manifest(shard_dir)["datasets"].get(dataset, {}).get("columns", [])
+        return pd.DataFrame(columns=columns)
+    return pd.read_csv(path, **read_kwargs)
+
+def read_all(dataset, shard_dir=SHARD_DIR, workers=8, **read_kwargs):
+    """Every member's rows, with shards read concurrently."""
+    files = [p for p in paths(dataset, shard_dir).values() if os.path.exists(p) and os.path.getsize(p) > 0]
+    if not files:
+        return read(dataset, None, shard_dir)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda p: pd.read_csv(p, **read_kwargs), files))
+    return pd.concat(frames, ignore_index=True)
+
+def map_shards(dataset, fn, shard_dir=SHARD_DIR, workers=None):
+    """Run fn(path) for every shard in a process pool; returns {member key: result}.
+
+    fn must be a picklable top-level function. Shards are independent, so
+    batch jobs can process members in parallel without any locking.
+    """
+    items = list(paths(dataset, shard_dir).items())
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(fn, [p for _, p in items], chunksize=max(1, len(items) // 64))
+        return {key: result for (key, _), result in zip(items, results)}
+
+# ---------------------------------------
+# Writes
+# ---------------------------------------
+def append(dataset, rows, columns, shard_dir=SHARD_DIR):
+    """Append dict rows, each to its member's shard (locked per shard)."""
+    groups = {}
+    frame = pd.DataFrame(rows, dtype=object)
+    for key, row in zip(row_keys(dataset, frame), rows):
+        groups.setdefault(key, []).append(row)
+    new = [k for k in groups if not os.path.exists(os.path.join(shard_dir, dataset, shard_file(k)))]
+    for key, group in groups.items():
+        storage.append_rows(os.path.join(shard_dir, dataset, shard_file(key)), group, columns)
+    if new:
+        _register(dataset, new, columns, shard_dir)
+
+def rewrite_member(dataset, member, df, shard_dir=SHARD_DIR):
+    """Atomically replace one member's shard with df."""
+    key = member_key(member)
+    path = os.path.join(shard_dir, dataset, shard_file(key))
+    is_new = not os.path.exists(path)
+    storage.rewrite_frame(path, df)
+    if is_new:
+        _register(dataset, [key], df.columns, shard_dir)
+
+def rewrite_all(dataset, df, shard_dir=SHARD_DIR):
+    """Replace every shard from a full table; members missing from df are emptied."""
+    keys = row_keys(dataset, df)
+    touched = set()
+    for key, part in df.groupby(keys, sort=False):
+        rewrite_member(dataset, key, part, shard_dir)
+        touched.add(key)
+    for key in set(paths(dataset, shard_dir)) - touched:
+        rewrite_member(dataset, key, df.iloc[0:0], shard_dir)
+
+# ---------------------------------------
+# Migration
+# ---------------------------------------
+def migrate(dataset, src_path, columns=None, shard_dir=SHARD_DIR, chunksize=100_000, overwrite=False):
+    """Split a single-file dataset into per-member shards.
+
+    Shards are built in a staging directory and swapped in at the end, so
+    readers see either the old single file or the complete shard set.
+    Returns (rows, members).
+    """
+    target = os.path.join(shard_dir, dataset)
+    if is_enabled(dataset, shard_dir) and not overwrite:
+        raise FileExistsError(f"{dataset} is already sharded in {target}")
+    staging = target + ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    header = storage.read_header(src_path)
+    columns = header + [c for c in (columns or []) if c not in header]
+    rows, members = 0, set()
+    if header:
+        for chunk in pd.read_csv(src_path, dtype=str, keep_default_na=False, chunksize=chunksize):
+            chunk = chunk.reindex(columns=columns, fill_value="")
+            for key, part in chunk.groupby(row_keys(dataset, chunk), sort=False):
+                path = os.path.join(staging, shard_file(key))
+                part.to_csv(path, mode="a", header=not os.path.exists(path), index=False, lineterminator="\n")
+                members.add(key)
+            rows += len(chunk)
+
+    with storage.FileLock(_manifest_path(shard_dir)):
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(staging, target)
+        manifest = load_manifest(shard_dir)
+        manifest["datasets"][dataset] = {
+            "key": DATASETS[dataset],
+            "columns": columns,
+            "members": {k: shard_file(k) for k in sorted(members)},
+        }
+        storage.write_json(_manifest_path(shard_dir), manifest, indent=1)
+    return rows, len(members)
+
+def unshard(dataset, dest_path, shard_dir=SHARD_DIR):
+    """Merge a dataset's shards back into one file and disable sharding for it."""
+    df = read_all(dataset, shard_dir, dtype=str, keep_default_na=False)
+    storage.rewrite_frame(dest_path, df)
+    with storage.FileLock(_manifest_path(shard_dir)):
+        shutil.rmtree(os.path.join(shard_dir, dataset))
+        manifest = load_manifest(shard_dir)
+        manifest["datasets"].pop(dataset, None)
+        storage.write_json(_manifest_path(shard_dir), manifest, indent=1)
+    return len(df)
+
+def count_rows(path):
+    """Data rows in one shard (for map_shards)."""
+    with open(path, "rb") as f:
+        return max(0, sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) - 1)
@@ -1,22 +1,54 @@
+import os
+import sys
 import webbrowser
 import requests
 import urllib.parse
 
-def find_song_from_lyrics(lyrics):
+from app.utils import lyrics_index, lyrics_embeddings
+
+def print_results(results):
+    for i, r in enumerate(results, start=1):
+        by = f" – {r['artist']}" if r["artist"] else ""
+        print(f"{i}. 🎵 {r['title']}{by}\n   “{r['line']}”")
+
+def find_song_from_lyrics(lyrics, k=5):
     """
-    Finds a song from partial lyrics using YouTube search.
-    Optionally can integrate with Genius API or Spotify for more accuracy.
+    Finds a song from partial lyrics.
+    Uses the offline lyrics index when one has been built (see
+    run_lyrics_index.py), then the semantic index for paraphrased or
+    half-remembered lyrics (run_lyrics_embeddings.py), and falls back to a
+    YouTube search link.
     """
     if len(lyrics.strip()) < 3:
         print("❌ Please provide a longer lyric snippet.")
         return None
 
+    if lyrics_index.is_enabled():
+        results = lyrics_index.search(lyrics, k=k)
+        if results:
+            print(f"🎶 Best matches for: {lyrics}")
+            print_results(results)
+            return results
+        print("📭 No match in the local lyrics index.")
+
+    if lyrics_embeddings.is_enabled():
+        try:
+            results = lyrics_embeddings.search(lyrics, k=k)
+        except ImportError as e:
+            print(f"⚠️ Semantic search unavailable: {e}")
+            results = []
+        if results:
+            print(f"🎶 Songs close in meaning to: {lyrics}")
+            print_results(results)
+            return results
+
     print("🔎 Searching for the song on YouTube...")
     query = urllib.parse.quote_plus(f"{lyrics} song")
     youtube_search_url = f"https://www.youtube.com/results?search_query={query}"
 
-    # Directly open YouTube search page in browser
-    webbrowser.open(youtube_search_url)
+    # Only open a browser where there is a display to show it on
+    if sys.platform in ("win32", "darwin") or os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+        webbrowser.open(youtube_search_url)
 
     print(f"🎶 Showing results for: {lyrics}")
     print(f"➡️ Opening YouTube: {youtube_search_url}")
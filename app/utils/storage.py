@@ -0,0 +1,208 @@
+import os
+import io
+import csv
+import json
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from app.utils import profiling
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ---------------------------------------
+# Shared file storage primitives
+# ---------------------------------------
+# Every CSV log and side file is written through these helpers:
+#   - FileLock: exclusive advisory lock on a sidecar '<file>.lock'
+#   - append_rows: whole rows appended under the lock, then fsync'ed
+#   - atomic_write / rewrite_csv / write_json: write a temp file, then rename
+# Readers never need the lock: they see either the old or the new file, and
+# appended rows only become visible once complete.
+_held = threading.local()
+
+class FileLock:
+    """Exclusive advisory lock on a sidecar '<file>.lock' shared by all writers.
+
+    Re-entrant within a thread, so a locked read-modify-write can call the
+    other (locking) helpers on the same file.
+    """
+
+    def __init__(self, path):
+        self.lock_path = path + ".lock"
+        self._fh = None
+
+    def __enter__(self):
+        counts = _held.__dict__.setdefault("counts", {})
+        if counts.get(self.lock_path):
+            counts[self.lock_path] += 1
+            return self
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        self._fh = open(self.lock_path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        else:
+            self._fh.seek(0)
+            msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+        counts[self.lock_path] = 1
+        return self
+
+    def __exit__(self, *exc):
+        counts = _held.counts
+        counts[self.lock_path] -= 1
+        if counts[self.lock_path] or self._fh is None:
+            return
+        del counts[self.lock_path]
+        if fcntl is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+        else:
+            self._fh.seek(0)
+            msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        self._fh.close()
+        self._fh = None
+
+def read_header(path):
+    """CSV header of path ([] if the file is missing or empty)."""
+    try:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), [])
+    except FileNotFoundError:
+        return []
+
+def append_bytes(path, data):
+    """Append pre-encoded complete lines under the lock and fsync.
+
+    A missing newline at the end of the file (left by an older writer or a
+    crash) is repaired first so the new rows never merge into the last one.
+    """
+    with profiling.span("storage.append"), FileLock(path):
+        with open(path, "a+b") as f:
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b"\n", b"\r"):
+                    f.write(b"\n")
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+def append_rows(path, rows, fieldnames):
+    """Append dict rows to a CSV in the file's own column order.
+
+    A new or empty file gets `fieldnames` as its header. Keys the file has no
+    column for are dropped; columns missing from a row are left empty.
+    Returns the header the rows were written with.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with FileLock(path):
+        header = read_header(path)
+        buf = io.StringIO()
+        if not header:
+            header = list(fieldnames)
+            csv.writer(buf, lineterminator="\n").writerow(header)
+        writer = csv.DictWriter(buf, fieldnames=header, extrasaction="ignore", lineterminator="\n")
+        writer.writerows(rows)
+        append_bytes(path, buf.getvalue().encode("utf-8"))
+    return header
+
+@contextmanager
+def atomic_write(path, mode="w", encoding="utf-8", newline=""):
+    """Open a temp file next to path; on success it is fsync'ed and renamed
+    over path under the lock, so readers never see a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Unique per call: threads of one process may rewrite the same file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+    except FileNotFoundError:
+        os.chmod(tmp_path, 0o644)  # mkstemp creates files private (0600)
+    kwargs = {} if "b" in mode else {"encoding": encoding, "newline": newline}
+    try:
+        with profiling.span("storage.rewrite"):
+            with os.fdopen(fd, mode, **kwargs) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            with FileLock(path):
+                os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def rewrite_csv(path, rows, fieldnames):
+    """Atomically replace a CSV with dict rows."""
+    with atomic_write(path) as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def rewrite_frame(path, df):
+    """Atomically replace a CSV with a DataFrame."""
+    with atomic_write(path) as f:
+        df.to_csv(f, index=False, lineterminator="\n")
+
+def read_rows(path):
+    """All rows of a CSV as dicts ([] if the file is missing)."""
+    try:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    except FileNotFoundError:
+        return []
+
+def write_json(path, obj, **kwargs):
+    """Atomically replace a JSON side file."""
+    with atomic_write(path) as f:
+        json.dump(obj, f, ensure_ascii=False, **kwargs)
+
+# ---------------------------------------
+# Versioned directories (rebuilt indexes)
+# ---------------------------------------
+# A rebuilt index is written to a new <root>/vNNNNNN directory and published
+# by atomically rewriting <root>/CURRENT. Readers resolve CURRENT once and
+# open every file from that version, so a rebuild never pulls files from
+# under them. The version before the current one is kept for readers still
+# opening it and removed by the next publish.
+VERSION_POINTER = "CURRENT"
+
+def _version_number(name):
+    return int(name[1:]) if name[:1] == "v" and name[1:].isdigit() else None
+
+def current_version(root):
+    """Directory of the published version under root, or None."""
+    try:
+        with open(os.path.join(root, VERSION_POINTER), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(root, name) if name else None
+
+def new_version(root):
+    """A fresh, empty version directory; publish_version() it once complete."""
+    os.makedirs(root, exist_ok=True)
+    while True:
+        numbers = [n for n in map(_version_number, os.listdir(root)) if n is not None]
+        path = os.path.join(root, f"v{max(numbers, default=0) + 1:06d}")
+        try:
+            os.makedirs(path)
+            return path
+        except FileExistsError:  # another build took this number
+            continue
+
+def publish_version(root, version_dir):
+    """Point CURRENT at version_dir, then delete versions older than the
+    one it replaced. Returns the new version's directory."""
+    with FileLock(os.path.join(root, VERSION_POINTER)):
+        previous = current_version(root)
+        with atomic_write(os.path.join(root, VERSION_POINTER)) as f:
+            f.write(os.path.basename(version_dir))
+        oldest_kept = _version_number(os.path.basename(previous or version_dir))
+        for name in os.listdir(root):
+            number = _version_number(name)
+            if number is not None and number < oldest_kept:
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return version_dir
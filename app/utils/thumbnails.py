@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from app.utils import storage
+from app.utils.config import BASE_DIR, IMAGE_DIR
+
+# ---------------------------------------
+# Profile picture thumbnails
+# ---------------------------------------
+# Member photos are turned into small square JPEG thumbnails, named by the
+# photo's content hash so unchanged photos are never reprocessed and
+# identical photos share one file:
+#   data/thumbnails/manifest.json    photo file -> hash, source signature, thumbnail
+#   data/thumbnails/<sha1>_<px>.jpg  the thumbnail
+# Lookups go through the manifest held in memory and never touch the photos.
+PHOTO_DIR = os.path.join(BASE_DIR, IMAGE_DIR)
+THUMB_DIR = os.path.join(BASE_DIR, "data", "thumbnails")
+MANIFEST_FILE = "manifest.json"
+THUMB_SIZE = 160           # pixels per side
+MAX_THUMB_BYTES = 10_000   # JPEG quality is lowered until the file fits
+JPEG_QUALITIES = (85, 75, 65, 55, 45, 35)
+PHOTO_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+
+_manifest = {"data": None}
+
+def _manifest_path(thumb_dir):
+    return os.path.join(thumb_dir, MANIFEST_FILE)
+
+def load_manifest(thumb_dir=THUMB_DIR, refresh=False):
+    """The manifest, read once per process (build() keeps it current)."""
+    if refresh or _manifest["data"] is None or _manifest["dir"] != thumb_dir:
+        try:
+            with open(_manifest_path(thumb_dir), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {"version": 1, "size": THUMB_SIZE, "photos": {}}
+        _manifest.update(data=data, dir=thumb_dir)
+    return _manifest["data"]
+
+def thumbnail_path(photo_name, thumb_dir=THUMB_DIR):
+    """Thumbnail of a photo file name (as in the roster), or None. O(1), no disk access."""
+    entry = load_manifest(thumb_dir)["photos"].get(os.path.basename(str(photo_name).strip()))
+    return os.path.join(thumb_dir, entry["thumb"]) if entry else None
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def make_thumbnail(src, dest, size=THUMB_SIZE):
+    """Center-crop a photo to a square, resize it and write a JPEG of at most
+    MAX_THUMB_BYTES (runs in a worker process). Returns (width, height, bytes)."""
+    import cv2  # only the build needs OpenCV, lookups don't
+
+    image = cv2.imread(src, cv2.IMREAD_COLOR)  # applies EXIF orientation
+    if image is None and src.lower().endswith(".gif"):
+        capture = cv2.VideoCapture(src)  # imread has no GIF support; use the first frame
+        ok, image = capture.read()
+        capture.release()
+        image = image if ok else None
+    if image is None:
+        raise ValueError(f"Unreadable image: {src}")
+    h, w = image.shape[:2]
+    side = min(h, w)
+    top, left = (h - side) // 2, (w - side) // 2
+    image = image[top:top + side, left:left + side]
+    if side > size:
+        image = cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
+    for quality in JPEG_QUALITIES:
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+        if ok and len(data) <= MAX_THUMB_BYTES:
+            break
+    if not ok:
+        raise ValueError(f"Could not encode a thumbnail for {src}")
+    # Content-addressed, so no lock is needed: temp file, then rename
+    tmp_path = f"{dest}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data.tobytes())
+    os.replace(tmp_path, dest)
+    return image.shape[1], image.shape[0], len(data)
+
+def _make_thumbnail_job(args):
+    src, dest, size = args
+    try:
+        return make_thumbnail(src, dest, size), None
+    except Exception as e:  # one bad photo must not stop the batch
+        return None, str(e)
+
+def build(photo_dir=PHOTO_DIR, thumb_dir=THUMB_DIR, size=THUMB_SIZE, workers=None, full=False):
+    """Create thumbnails for new or changed photos and drop unused ones.
+
+    Photos whose size and mtime are unchanged are skipped without reading
+    them; the rest are hashed, and only hashes without a thumbnail are
+    processed (in a process pool). Returns a report dict.
+    """
+    old = load_manifest(thumb_dir, refresh=True)
+    if full or old.get("size") != size:
+        old = {"photos": {}}
+    photos, jobs = {}, {}
+    known = {entry["thumb"]: entry for entry in old["photos"].values()}
+    report = {"photos": 0, "unchanged": 0, "generated": 0, "reused": 0, "removed": 0, "failed": {}}
+
+    for name in sorted(os.listdir(photo_dir)) if os.path.isdir(photo_dir) else []:
+        if not name.lower().endswith(PHOTO_EXTENSIONS):
+            continue
+        src = os.path.join(photo_dir, name)
+        st = os.stat(src)
+        sig = [st.st_mtime_ns, st.st_size]
+        prev = old["photos"].get(name)
+        report["photos"] += 1
+        if prev and prev["sig"] == sig and os.path.exists(os.path.join(thumb_dir, prev["thumb"])):
+            photos[name] = prev
+            report["unchanged"] += 1
+            continue
+        digest = file_hash(src)
+        thumb = f"{digest}_{size}.jpg"
+        photos[name] = {"sha1": digest, "sig": sig, "thumb": thumb}
+        if thumb in known and os.path.exists(os.path.join(thumb_dir, thumb)):
+            photos[name].update({k: known[thumb][k] for k in ("width", "height", "bytes")})
+            report["reused"] += 1
+        elif thumb in jobs:
+            report["reused"] += 1
+        else:
+            jobs[thumb] = src
+
+    os.makedirs(thumb_dir, exist_ok=True)
+    if jobs:
+        args = [(src, os.path.join(thumb_dir, thumb), size) for thumb, src in jobs.items()]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = dict(zip(jobs, pool.map(_make_thumbnail_job, args)))
+        for name, entry in list(photos.items()):
+            if entry["thumb"] not in results:
+                continue
+            info, error = results[entry["thumb"]]
+            if error:
+                report["failed"][name] = error
+                del photos[name]
+            else:
+                entry.update(width=info[0], height=info[1], bytes=info[2])
+        report["generated"] = sum(1 for info, error in results.values() if not error)
+
+    manifest = {"version": 1, "size": size, "photos": photos}
+    storage.write_json(_manifest_path(thumb_dir), manifest, indent=1)
+    _manifest.update(data=manifest, dir=thumb_dir)
+
+    # Thumbnails no photo refers to any more
+    used = {entry["thumb"] for entry in photos.values()}
+    for name in os.listdir(thumb_dir):
+        if name.endswith(".jpg") and name not in used:
+            os.remove(os.path.join(thumb_dir, name))
+            report["removed"] += 1
+    return report
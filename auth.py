@@ -4,6 +4,7 @@ import requests
 import io
 import re
 import gspread
+from app.utils import config, profiling
 from google.oauth2.service_account import Credentials
 
 # Google Sheet (public CSV link for read)
@@ -17,14 +18,15 @@ WORKSHEET_NAME = "Hosla Member Details"
 SERVICE_ACCOUNT_FILE = "hosla-creds.json"
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
 
-try:
-    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    spreadsheet = client.open_by_url(SPREADSHEET_URL)
-    sheet = spreadsheet.worksheet(WORKSHEET_NAME)
-except FileNotFoundError:
-    sheet = None  # Fallback if creds missing
-    print("⚠️ hosla-472907-c7d47bfcd616.json not found, running in READ-only mode")
+sheet = None  # read-only without credentials, or with a local roster stand-in
+if not config.LOCAL_ROSTER_CSV:
+    try:
+        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
+        client = gspread.authorize(creds)
+        spreadsheet = client.open_by_url(SPREADSHEET_URL)
+        sheet = spreadsheet.worksheet(WORKSHEET_NAME)
+    except FileNotFoundError:
+        print("⚠️ hosla-472907-c7d47bfcd616.json not found, running in READ-only mode")
 
 # -----------------------------
 # Helpers
@@ -39,6 +41,8 @@ def is_valid_email(email):
 
 def load_sheet():
     """Fetch Google Sheet as DataFrame using gspread to preserve exact data."""
+    if config.LOCAL_ROSTER_CSV:
+        return pd.read_csv(config.LOCAL_ROSTER_CSV, dtype=str, keep_default_na=False)
     if sheet is None:
         response = requests.get(SHEET_URL)
         response.raise_for_status()
@@ -52,8 +56,10 @@ def load_sheet():
 # -----------------------------
 # Authentication
 # -----------------------------
+@profiling.timed("auth.authenticate")
 def authenticate_user(username, password, debug=False):
-    df = load_sheet()
+    with profiling.span("auth.load_sheet"):
+        df = load_sheet()
 
     username = str(username).strip().lower()
     df_username_series = df["Username"].astype(str).str.strip().str.lower()
@@ -85,7 +91,9 @@ def authenticate_user(username, password, debug=False):
 
     if stored_hash.startswith(("$2b$", "$2a$", "$2y$")):
         try:
-            if bcrypt.checkpw(password.encode(), stored_hash.encode()):
+            with profiling.span("auth.bcrypt"):
+                ok = bcrypt.checkpw(password.encode(), stored_hash.encode())
+            if ok:
                 if debug:
                     print("DEBUG: bcrypt.checkpw -> True (login successful)")
                 return row.to_dict()
@@ -125,7 +133,8 @@ def register_user(full_name, age, role, interests, locality, city, pin_code,
         print(f"⚠️ Username '{username}' already exists. Choose another.")
         return False
 
-    hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=12)).decode()
+    with profiling.span("auth.bcrypt"):
+        hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=12)).decode()
     if not bcrypt.checkpw(password.encode(), hashed_pw.encode()):
         raise ValueError("❌ Hash verification failed after generation!")
 
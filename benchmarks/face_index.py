@@ -0,0 +1,91 @@
+"""Latency benchmark for app.utils.face_index.
+
+Writes an index of synthetic 128-d face encodings (one member per face,
+spread like face_recognition encodings: same-person distance ~0.3,
+different people ~1.4), then identifies noisy copies of random faces with
+the vectorized search and with a per-photo comparison loop.
+
+    python -m benchmarks.face_index --faces 10000 --queries 200
+    python -m benchmarks.face_index --photos data/Hosla_Members_Pic   # also time real encoding
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+from app.utils import face_index, storage
+
+def write_synthetic_index(face_dir, n, seed=0):
+    rng = np.random.default_rng(seed)
+    encodings = rng.normal(0, 0.09, (n, face_index.ENCODING_DIM)).astype(np.float32)
+    version_dir = storage.new_version(face_dir)
+    np.save(os.path.join(version_dir, "encodings.npy"), encodings)
+    faces = [{"photo": f"member_{i}.jpeg", "member": f"Member {i}", "sha1": "", "sig": [0, 0]} for i in range(n)]
+    with open(os.path.join(version_dir, "faces.json"), "w", encoding="utf-8") as f:
+        json.dump(faces, f)
+    storage.publish_version(face_dir, version_dir)
+    return encodings
+
+def loop_identify(encodings, faces, query, threshold):
+    """The per-photo comparison this index replaces."""
+    best = None
+    for encoding, face in zip(encodings, faces):
+        distance = np.linalg.norm(encoding - query)
+        if distance <= threshold and (best is None or distance < best[1]):
+            best = (face["member"], distance)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--loop-queries", type=int, default=20, help="Queries for the (slow) per-photo loop")
+    parser.add_argument("--photos", help="Also build a real index from this photo directory")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="face_bench_")
+    try:
+        face_dir = os.path.join(work, "index")
+        encodings = write_synthetic_index(face_dir, args.faces)
+        rng = np.random.default_rng(1)
+        targets = rng.integers(0, args.faces, args.queries)
+        queries = encodings[targets] + rng.normal(0, 0.025, (args.queries, face_index.ENCODING_DIM)).astype(np.float32)
+
+        start = time.perf_counter()
+        face_index.nearest(queries[:1], face_dir=face_dir)
+        print(f"📂 Loaded {args.faces} faces in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        times, hits = [], 0
+        for target, query in zip(targets, queries):
+            start = time.perf_counter()
+            match = face_index.nearest(query, k=1, face_dir=face_dir)[0]
+            times.append((time.perf_counter() - start) * 1000)
+            hits += bool(match) and match[0]["member"] == f"Member {target}"
+        times = np.array(times)
+        print(f"⚡ Vectorized: p50={np.percentile(times, 50):.2f} ms  p95={np.percentile(times, 95):.2f} ms  "
+              f"accuracy={hits / args.queries:.3f}")
+
+        start = time.perf_counter()
+        face_index.nearest(queries, k=1, face_dir=face_dir)
+        print(f"📦 Batch of {args.queries}: {(time.perf_counter() - start) * 1000 / args.queries:.3f} ms/face")
+
+        index = face_index._index(face_dir)
+        start = time.perf_counter()
+        for query in queries[:args.loop_queries]:
+            loop_identify(index["encodings"], index["faces"], query, face_index.MATCH_THRESHOLD)
+        per_query = (time.perf_counter() - start) * 1000 / max(1, min(args.loop_queries, args.queries))
+        print(f"🐢 Per-photo loop: {per_query:.1f} ms/query ({per_query / np.percentile(times, 50):.0f}x slower)")
+
+        if args.photos:
+            start = time.perf_counter()
+            report = face_index.build(args.photos, os.path.join(work, "real"))
+            print(f"🏗️ Encoded {report['encoded']} photo(s) in {time.perf_counter() - start:.1f}s "
+                  f"({len(report['no_face'])} without a face, {len(report['failed'])} failed)")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Recall and latency benchmark for app.utils.lyrics_embeddings.
+
+Builds an index over a lyrics corpus (a synthetic one by default), then
+queries it with fragments of random passages, some with words dropped, and
+reports recall@k and latency for the exact scan and for IVF probing.
+
+    python -m benchmarks.lyrics_embeddings --model path/to/tiny-model
+    python -m benchmarks.lyrics_embeddings --corpus data/lyrics --queries 500
+    python -m benchmarks.lyrics_embeddings --hashing --songs 50000   # no model: index mechanics only
+"""
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+from app.utils import lyrics_embeddings
+
+WORDS = ("ami tumi bhalobasha mon akash nodi gaan raat din chand phool brishti hawa pother "
+         "dil pyaar sapna zindagi raah baarish yaad aankhen tera mera chalo saath "
+         "love heart night dream river rain road home light fire wind sky song").split()
+
+def synthetic_corpus(path, songs, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(path, exist_ok=True)
+    per_file = 1000
+    for f in range(0, songs, per_file):
+        with open(os.path.join(path, f"songs_{f // per_file:04d}.csv"), "w", encoding="utf-8") as out:
+            out.write("title,artist,lyrics\n")
+            for s in range(f, min(songs, f + per_file)):
+                lines = [" ".join(rng.choices(WORDS, k=rng.randint(4, 8))) + f" {s % 997}"
+                         for _ in range(rng.randint(8, 24))]
+                out.write(f'Song {s},Artist {s % 300},"' + "\n".join(lines) + '"\n')
+
+def hashing_encoder(dim=256):
+    """Word/bigram feature hashing: a model-free stand-in for index mechanics."""
+    def encode(texts):
+        out = np.zeros((len(texts), dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = text.lower().replace("/", " ").split()
+            for token in words + [a + " " + b for a, b in zip(words, words[1:])]:
+                out[i, hash(token) % dim] += 1.0
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+    return encode
+
+def make_queries(index, n, seed=1):
+    """(query text, expected song) pairs from random passages."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        row = rng.randrange(len(index.vectors))
+        words = index.passage_text(row).replace(" / ", " ").split()
+        start = rng.randrange(max(1, len(words) - 8))
+        fragment = [w for w in words[start:start + 8] if rng.random() > 0.2] or words[:3]
+        queries.append((" ".join(fragment), int(index.passage_song[row])))
+    return queries
+
+def run(index_dir, queries, encode, k, probes):
+    index = lyrics_embeddings.load_index(index_dir)
+    vectors = encode([q for q, _ in queries])
+    hits, times = 0, []
+    for (_, song), vec in zip(queries, vectors):
+        start = time.perf_counter()
+        results = lyrics_embeddings.search_vector(vec, k, index_dir, probes)
+        times.append((time.perf_counter() - start) * 1000)
+        hits += any(r["title"] == index.songs[song][0] and r["artist"] == index.songs[song][1] for r in results)
+    times = np.array(times)
+    return hits / len(queries), np.percentile(times, 50), np.percentile(times, 95)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="Lyrics corpus directory (default: synthetic)")
+    parser.add_argument("--songs", type=int, default=20_000, help="Synthetic corpus size")
+    parser.add_argument("--model", default=lyrics_embeddings.DEFAULT_MODEL,
+                        help="sentence-transformers model name or local path")
+    parser.add_argument("--hashing", action="store_true", help="Use a feature-hashing encoder instead of a model")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--ivf-min", type=int, default=lyrics_embeddings.IVF_MIN_PASSAGES,
+                        help="Passages needed before IVF lists are built")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="lyrics_emb_bench_")
+    try:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = os.path.join(work, "corpus")
+            synthetic_corpus(corpus, args.songs)
+        encode = hashing_encoder() if args.hashing else lyrics_embeddings.model_encoder(args.model)
+        model_name = "hashing" if args.hashing else args.model
+        lyrics_embeddings.IVF_MIN_PASSAGES = args.ivf_min
+
+        index_dir = os.path.join(work, "index")
+        start = time.perf_counter()
+        report = lyrics_embeddings.build_index(corpus, index_dir, model_name, encode=encode)
+        print(f"🏗️ Embedded {report['passages']} passages into {report['lists']} list(s) "
+              f"in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        lyrics_embeddings.build_index(corpus, index_dir, model_name, encode=encode)
+        print(f"🔁 No-op refresh in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        index = lyrics_embeddings.load_index(index_dir)
+        queries = make_queries(index, args.queries)
+        start = time.perf_counter()
+        encode([q for q, _ in queries[:50]])
+        print(f"🔤 Query encoding: {(time.perf_counter() - start) * 1000 / min(50, len(queries)):.1f} ms/query")
+
+        settings = [("exact", report["lists"])]
+        if report["lists"] > 1:
+            settings += [(f"ivf probes={p}", p) for p in (4, 8, 16) if p < report["lists"]]
+        for label, probes in settings:
+            recall, p50, p95 = run(index_dir, queries, encode, args.k, probes)
+            print(f"📊 {label:<16} recall@{args.k}={recall:.3f}  p50={p50:.2f} ms  p95={p95:.2f} ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
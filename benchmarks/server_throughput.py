@@ -0,0 +1,152 @@
+"""Throughput benchmark for app.utils.server with simulated clients.
+
+Starts the server in a child process on a free port with a synthetic
+roster and temporary data files, then runs N concurrent clients that log
+in and issue a mix of menu actions (add/list reminders, members like me,
+emergencies, inbox/messages). Reports requests/s and latency, first with a
+single client (the old one-session-per-process model) and then with N.
+
+Logins verify a PBKDF2 hash so they cost CPU like bcrypt does.
+
+    python -m benchmarks.server_throughput --clients 50 --requests 40
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import hashlib
+import argparse
+import tempfile
+from multiprocessing import Process, Queue
+import numpy as np
+import pandas as pd
+
+from app.utils import emergency, log_partitions, reminder, roster, server, shards
+
+CITIES = ["Kolkata", "Delhi", "Mumbai", "Pune", "Siliguri"]
+INTERESTS = ["Music", "Reading", "Yoga", "Gardening", "Chess", "Cooking", "Travel", "Painting"]
+SALT = b"hosla-bench"
+
+def synthetic_roster(n, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "Member Name": [f"Member {i}" for i in range(n)],
+        "Username": [f"member{i}" for i in range(n)],
+        "Active": "Yes",
+        "Age": [str(rng.randint(60, 90)) for _ in range(n)],
+        "City": [rng.choice(CITIES) for _ in range(n)],
+        "Locality": "", "Pin Code": "700001", "Contact": "9800000000",
+        "Interests": [", ".join(rng.sample(INTERESTS, 3)) for _ in range(n)],
+    })
+
+def make_authenticate(df):
+    hashes = {u: hashlib.pbkdf2_hmac("sha256", u.encode(), SALT, 50_000) for u in df["Username"][:2000]}
+    records = {u: r for u, r in zip(df["Username"], df.to_dict("records"))}
+
+    def authenticate(username, password):
+        expected = hashes.get(username)
+        if expected is None or hashlib.pbkdf2_hmac("sha256", password.encode(), SALT, 50_000) != expected:
+            raise ValueError("Invalid credentials.")
+        return records[username]
+    return authenticate
+
+def workload(rng, with_messages):
+    actions = [
+        ("reminders", {"days": 7}),
+        ("add_reminder", {"title": "Walk", "date_str": "01/01/2030", "times": "07:00", "frequency": "daily"}),
+        ("members_like_me", {"page": 1}),
+        ("emergencies", {}),
+        ("find_members", {"name": "Member 1"}),
+    ]
+    if with_messages:
+        actions += [("inbox", {}), ("send_message", {"to": f"Member {rng.randrange(100)}", "message": "Hello!"})]
+    return rng.choice(actions)
+
+async def client(port, user_no, requests, with_messages, latencies, errors):
+    rng = random.Random(user_no)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def call(action, args):
+        start = time.perf_counter()
+        writer.write(json.dumps({"id": action, "action": action, "args": args}).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append((time.perf_counter() - start) * 1000)
+        if not response["ok"]:
+            errors.append(f"{action}: {response['error']}")
+
+    await call("login", {"username": f"member{user_no}", "password": f"member{user_no}"})
+    for _ in range(requests):
+        await call(*workload(rng, with_messages))
+    writer.write(b'{"action": "quit"}\n')
+    await writer.drain()
+    writer.close()
+
+async def run_clients(port, clients, requests, with_messages):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, i, requests, with_messages, latencies, errors) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 95), errors
+
+def serve_synthetic(work, members, ready):
+    """Server process: synthetic roster, temporary data files, free port."""
+    df = synthetic_roster(members)
+    roster._cache.update(df=df, loaded_at=float("inf"), lookup=None)
+    reminder.REMINDER_FILE = os.path.join(work, "reminders.csv")
+    emergency.EMERGENCY_LOG = os.path.join(work, "emergency_logs.csv")
+    for i in range(20):
+        emergency.log_emergency(emergency.fetch_member_details(f"Member {i}"), "Benchmark")
+    try:
+        from app.utils import messaging
+        messaging.MESSAGE_LOG_PATH = os.path.join(work, "message_logs.csv")
+        with_messages = True
+    except ImportError as e:
+        print(f"⚠️ Skipping messaging actions ({e})")
+        with_messages = False
+
+    async def run():
+        app = server.Server(authenticate=make_authenticate(df))
+        listener = await app.start("127.0.0.1", 0)
+        ready.put((listener.sockets[0].getsockname()[1], with_messages))
+        async with listener:
+            await listener.serve_forever()
+    asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per client after login")
+    parser.add_argument("--members", type=int, default=5000, help="Synthetic roster size")
+    args = parser.parse_args()
+
+    # these layouts write under the checkout rather than the redirected paths
+    for name, enabled in (("reminders shards", shards.is_enabled("reminders")),
+                          ("messages partitions", log_partitions.is_enabled("messages")),
+                          ("emergencies partitions", log_partitions.is_enabled("emergencies"))):
+        if enabled:
+            sys.exit(f"❌ The {name} layout is enabled in this checkout; benchmark from a clean tree.")
+
+    work = tempfile.mkdtemp(prefix="server_bench_")
+    ready = Queue()
+    process = Process(target=serve_synthetic, args=(work, args.members, ready), daemon=True)
+    process.start()
+    try:
+        port, with_messages = ready.get(timeout=120)
+        asyncio.run(run_clients(port, 1, 2, with_messages))  # warm up the indexes and caches
+        for clients in (1, args.clients):
+            rps, p50, p95, errors = asyncio.run(run_clients(port, clients, args.requests, with_messages))
+            print(f"📊 {clients:>4} client(s): {rps:8.0f} req/s  p50={p50:.1f} ms  p95={p95:.1f} ms  "
+                  f"errors={len(errors)}")
+            for error in sorted(set(errors))[:5]:
+                print(f"   ⚠️ {error}")
+    finally:
+        process.terminate()
+        process.join()
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Contention benchmark for app.utils.storage.
+
+N writer processes append rows to one CSV while another process keeps
+rewriting it (marking rows resolved, like emergency.mark_resolved). At the
+end every appended row must be present exactly once and every line must
+parse with the right number of fields.
+
+    python -m benchmarks.storage_contention --writers 8 --rows 500
+    python -m benchmarks.storage_contention --unsafe   # old unlocked code paths
+"""
+import os
+import csv
+import time
+import argparse
+import tempfile
+from multiprocessing import Process, Event
+
+from app.utils import storage
+
+COLUMNS = ["Writer", "Seq", "Payload", "Status"]
+
+def _unsafe_append(path, row):
+    exists = os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        if not exists:
+            writer.writeheader()
+        writer.writerow(row)
+
+def _unsafe_rewrite(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row["Status"] = "Resolved"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def writer(path, writer_id, rows, unsafe):
+    for seq in range(rows):
+        # Payload with commas, quotes and non-ASCII text to catch torn rows
+        row = {"Writer": writer_id, "Seq": seq, "Payload": f'"ফোন", ok, #{seq}' * 3, "Status": "Pending"}
+        if unsafe:
+            _unsafe_append(path, row)
+        else:
+            storage.append_rows(path, [row], COLUMNS)
+
+def rewriter(path, stop, unsafe):
+    while not stop.is_set():
+        if unsafe:
+            try:
+                _unsafe_rewrite(path)
+            except (FileNotFoundError, csv.Error, KeyError):
+                pass
+        else:
+            with storage.FileLock(path):
+                rows = storage.read_rows(path)
+                for row in rows:
+                    row["Status"] = "Resolved"
+                storage.rewrite_csv(path, rows, COLUMNS)
+        time.sleep(0.001)
+
+def check(path, writers, rows):
+    """(missing, duplicated, malformed) row counts."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        lines = list(csv.reader(f))
+    header, body = lines[0], lines[1:]
+    malformed = sum(len(r) != len(COLUMNS) for r in body) + (header != COLUMNS)
+    seen = {}
+    for r in body:
+        if len(r) == len(COLUMNS):
+            seen[(r[0], r[1])] = seen.get((r[0], r[1]), 0) + 1
+    expected = {(str(w), str(s)) for w in range(writers) for s in range(rows)}
+    missing = len(expected - set(seen))
+    duplicated = sum(c - 1 for c in seen.values() if c > 1)
+    return missing, duplicated, malformed
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent writer benchmark for the storage layer.")
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent appending processes")
+    parser.add_argument("--rows", type=int, default=500, help="Rows appended by each writer")
+    parser.add_argument("--no-rewriter", action="store_true", help="Appends only, no concurrent rewrites")
+    parser.add_argument("--unsafe", action="store_true", help="Use plain unlocked appends and in-place rewrites")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "contention.csv")
+        stop = Event()
+        procs = [Process(target=writer, args=(path, i, args.rows, args.unsafe)) for i in range(args.writers)]
+        rw = None if args.no_rewriter else Process(target=rewriter, args=(path, stop, args.unsafe))
+
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        if rw:
+            rw.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        if rw:
+            rw.join()
+
+        total = args.writers * args.rows
+        missing, duplicated, malformed = check(path, args.writers, args.rows)
+        mode = "unsafe" if args.unsafe else "storage"
+        print(f"{mode}: {total} rows from {args.writers} writers in {elapsed:.2f}s "
+              f"({total / elapsed:,.0f} rows/s)")
+        print(f"  missing={missing} duplicated={duplicated} malformed={malformed}")
+        ok = missing == duplicated == malformed == 0
+        print("✅ no rows lost or corrupted" if ok else "❌ rows lost or corrupted")
+        return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,229 @@
+"""Hot-path benchmark suite on synthetic production-scale data.
+
+Copies a synthetic dataset (see benchmarks/synthetic_data.py; generated on
+the fly unless --data is given) into a scratch directory, points the app at
+it - the roster through HOSLA_ROSTER_CSV, the logs and data files through
+the module paths - and times each operation the way a member triggers it:
+
+    authenticate_user        roster load + password check
+    send_message             send one message, then read the chat history
+    view_messages_for_user   inbox of one member
+    mark_resolved            resolve one emergency (read + rewrite the log)
+    record_health_checkup    append one reading
+    generate_trends          headless chart + trend summary for one member
+    check_reminders          one member's alerts for the next 7 days
+
+Interactive prompts are answered from a script and printed output is
+discarded. Operations whose dependencies are missing are reported as
+skipped. Results are JSON so runs can be compared between releases:
+
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --data /tmp/hosla --compare bench.json --tolerance 1.25
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import builtins
+import warnings
+import functools
+import argparse
+import platform
+import tempfile
+import contextlib
+import statistics
+
+def _timings(fn, repeat):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+@contextlib.contextmanager
+def scripted(answers):
+    """Answer input() prompts from `answers` (cycled); silence print() and warnings."""
+    answers = list(answers)
+    position = {"i": 0}
+
+    def fake_input(prompt=""):
+        if not answers:
+            return ""
+        answer = answers[position["i"] % len(answers)]
+        position["i"] += 1
+        return answer
+
+    real_input = builtins.input
+    builtins.input = fake_input
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull), \
+                warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            yield
+    finally:
+        builtins.input = real_input
+
+def point_app_at(work):
+    """Redirect every module path used by the suite into `work`."""
+    from app.utils import adherence, emergency, health_charts, health_checkup, reminder, roster
+    from app.utils import health_aggregates, health_store, log_partitions, shards
+    for name, enabled in (("reminders shards", shards.is_enabled("reminders")),
+                          ("health shards", shards.is_enabled("health")),
+                          ("health store", health_store.is_enabled()),
+                          ("health aggregates", health_aggregates.is_enabled()),
+                          ("messages partitions", log_partitions.is_enabled("messages")),
+                          ("emergencies partitions", log_partitions.is_enabled("emergencies"))):
+        if enabled:
+            sys.exit(f"❌ The {name} layout is enabled in this checkout; benchmark from a clean tree.")
+    health_checkup.BASE_DIR = work
+    # out_dir defaults are bound at import, so rebind the function generate_trends calls
+    health_charts.render_chart = functools.partial(health_charts.render_chart,
+                                                   out_dir=os.path.join(work, "data", "charts"))
+    adherence.ADHERENCE_LOG = os.path.join(work, "logs", "adherence_log.csv")
+    adherence.ADHERENCE_STATS = os.path.join(work, "logs", "adherence_stats.json")
+    reminder.REMINDER_FILE = os.path.join(work, "reminders.csv")
+    emergency.EMERGENCY_LOG = os.path.join(work, "logs", "emergency_logs.csv")
+    roster.load_roster(refresh=True)
+
+def build_cases(work, members, rng):
+    """{name: fn(i)}; a name maps to an error string when the operation
+    cannot run here."""
+    import pandas as pd
+    roster_df = pd.read_csv(os.path.join(work, "roster.csv"), dtype=str, keep_default_na=False)
+    names = [roster_df.at[rng.randrange(len(roster_df)), "Member Name"] for _ in range(members)]
+    users = roster_df.set_index("Member Name")["Username"]
+    cases = {}
+
+    try:
+        from auth import authenticate_user
+        cases["authenticate_user"] = lambda i: authenticate_user(users[names[i % members]], "password")
+    except ImportError as e:
+        cases["authenticate_user"] = f"skipped: {e}"
+
+    try:
+        from app.utils import messaging
+        messaging.MESSAGE_LOG_PATH = os.path.join(work, "logs", "message_logs.csv")
+
+        def send(i):
+            other = names[(i + 1) % members]
+            with scripted([other, "1", "Benchmark hello", "2"]):  # recipient, English, text, only this member
+                messaging.send_message(names[i % members])
+
+        def inbox(i):
+            with scripted(["n"]):
+                messaging.view_messages_for_user(names[i % members])
+        cases["send_message"] = send
+        cases["view_messages_for_user"] = inbox
+    except ImportError as e:
+        cases["send_message"] = cases["view_messages_for_user"] = f"skipped: {e}"
+
+    from app.utils import emergency, health_checkup, reminder
+    emergencies = len(emergency.view_emergencies())
+    cases["mark_resolved"] = lambda i: emergency.mark_resolved(rng.randrange(emergencies))
+    cases["record_health_checkup"] = \
+        lambda i: health_checkup.record_health_checkup(names[i % members], 98.6, 128, 84, 74, 190, 70)
+
+    def trends(i):
+        with scripted([]):
+            health_checkup.generate_trends(names[i % members], headless=True)
+    cases["generate_trends"] = trends
+
+    def reminders(i):
+        with scripted([]):
+            reminder.check_reminders(names[i % members])
+    cases["check_reminders"] = reminders
+    return cases
+
+def run(work, repeat, only=None, seed=0):
+    rng = random.Random(seed)
+    cases = build_cases(work, max(repeat, 1), rng)
+    results = {}
+    for name, fn in cases.items():
+        if only and name not in only:
+            continue
+        if isinstance(fn, str):
+            results[name] = {"status": fn}
+            print(f"⏭️ {name}: {fn}")
+            continue
+        try:
+            fn(repeat)  # warm-up: imports, caches, first read of each file
+            times = _timings(fn, repeat)
+        except Exception as e:
+            results[name] = {"status": f"error: {e}"}
+            print(f"❌ {name}: {e}")
+            continue
+        ordered = sorted(times)
+        results[name] = {
+            "status": "ok", "runs": repeat,
+            "median_ms": round(statistics.median(times), 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+            "min_ms": round(ordered[0], 3),
+        }
+        print(f"📊 {name:<24} median={results[name]['median_ms']:9.1f} ms  p95={results[name]['p95_ms']:9.1f} ms")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Names of operations whose median got slower than tolerance x baseline."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name, {})
+        if current.get("status") != "ok" or before.get("status") != "ok":
+            continue
+        ratio = current["median_ms"] / max(before["median_ms"], 1e-6)
+        marker = "🔴" if ratio > tolerance else "🟢"
+        print(f"{marker} {name:<24} {before['median_ms']:9.1f} -> {current['median_ms']:9.1f} ms ({ratio:.2f}x)")
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", help="Dataset from benchmarks.synthetic_data (generated when omitted)")
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--vitals", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per operation")
+    parser.add_argument("--only", nargs="*", help="Run only these operations")
+    parser.add_argument("--out", help="Write results as JSON here")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --out")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Slowdown factor counted as a regression")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="hosla_suite_")
+    # Must be set before config (and so auth / roster) is first imported
+    os.environ["HOSLA_ROSTER_CSV"] = os.path.join(work, "roster.csv")
+    try:
+        if args.data:
+            shutil.copytree(args.data, work, dirs_exist_ok=True)
+        else:
+            from benchmarks import synthetic_data
+            print(f"⏳ Generating {args.members} members, {args.messages} messages, {args.vitals} vitals...")
+            synthetic_data.generate(work, members=args.members, messages=args.messages, vitals=args.vitals)
+        point_app_at(work)
+
+        results = run(work, args.repeat, args.only)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": {"data": args.data, "members": args.members, "messages": args.messages, "vitals": args.vitals},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(f"❌ Regressions: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+    main()
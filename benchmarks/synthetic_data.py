@@ -0,0 +1,207 @@
+"""Synthetic Hosla data at configurable scale.
+
+Writes a roster (the local stand-in for the Google Sheet, see
+HOSLA_ROSTER_CSV in config.py), message and emergency logs, reminders and
+health records with the same columns as the real files:
+
+    <out>/roster.csv
+    <out>/logs/message_logs.csv       direct messages and broadcasts, Indic text
+    <out>/logs/emergency_logs.csv
+    <out>/reminders.csv
+    <out>/data/health_data.csv
+
+    python -m benchmarks.synthetic_data --out /tmp/hosla --members 10000 --messages 1000000 --vitals 500000
+"""
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = ["Rina", "Krishna", "Amiya", "Dipanwita", "Sunil", "Gita", "Anil", "Sabita", "Tapan", "Maya",
+               "Ramesh", "Lakshmi", "Gopal", "Kamala", "Arun", "Sita", "Bimal", "Chhaya", "Prakash", "Usha"]
+LAST_NAMES = ["Dutta", "Ghosh", "Dasgupta", "Dawn", "Mitra", "Sen", "Banerjee", "Chatterjee", "Roy", "Bose",
+              "Sharma", "Iyer", "Reddy", "Singh", "Patil", "Nair", "Mukherjee", "Das", "Gupta", "Rao"]
+CITIES = ["Kolkata", "Bishnupur", "Siliguri", "Delhi", "Mumbai", "Pune", "Chennai", "Hyderabad", "Bengaluru", "Patna"]
+INTERESTS = ["Music", "Reading", "Yoga", "Gardening", "Chess", "Cooking", "Travel", "Painting",
+             "Classical music", "Bird watching", "Rabindra Sangeet", "Cricket", "Meditation", "Knitting"]
+ROLES = ["Member", "Member", "Member", "Volunteer", "Coordinator"]
+CAUSES = ["chest pain", "fall at home", "dizziness", "anxiety", "breathlessness", "high fever", "low sugar"]
+# (language, message, English translation)
+MESSAGES = [
+    ("bn", "আজকের পডকাস্টটি অসাধারণ ছিল।", "Today's podcast was great."),
+    ("bn", "কাল সকালে হাঁটতে যাবেন?", "Will you go for a walk tomorrow morning?"),
+    ("bn", "ওষুধ খেতে ভুলবেন না।", "Don't forget to take your medicine."),
+    ("hi", "आप कैसे हैं?", "How are you?"),
+    ("hi", "कल योग कक्षा सुबह सात बजे है।", "Tomorrow's yoga class is at seven in the morning."),
+    ("ta", "இன்று வானிலை நன்றாக உள்ளது.", "The weather is nice today."),
+    ("te", "మీ ఆరోగ్యం ఎలా ఉంది?", "How is your health?"),
+    ("mr", "उद्या भेटूया.", "Let's meet tomorrow."),
+    ("en", "Happy birthday! Have a lovely day.", "Happy birthday! Have a lovely day."),
+    ("en", "The community meeting is on Sunday at 5 pm.", "The community meeting is on Sunday at 5 pm."),
+    ("bn", "গানের আসর শনিবার সন্ধ্যায়।", "[Translation Failed]"),
+]
+DAY = 86_400
+
+def _timestamps(rng, n, years):
+    now = int(time.time())
+    seconds = np.sort(rng.integers(now - years * 365 * DAY, now, n))
+    return pd.to_datetime(seconds, unit="s").strftime("%Y-%m-%d %H:%M:%S")
+
+def make_roster(rng, n, password_hash):
+    first = rng.choice(FIRST_NAMES, n)
+    last = rng.choice(LAST_NAMES, n)
+    names = pd.Series(first, dtype=object) + " " + pd.Series(last, dtype=object) + " " + pd.Series(range(n)).astype(str)
+    interests = [", ".join(rng.choice(INTERESTS, rng.integers(1, 5), replace=False)) for _ in range(n)]
+    return pd.DataFrame({
+        "Member Name": names,
+        "Age": rng.integers(55, 95, n),
+        "Role": rng.choice(ROLES, n),
+        "Interests": interests,
+        "Locality": "Ward " + pd.Series(rng.integers(1, 40, n)).astype(str),
+        "City": rng.choice(CITIES, n),
+        "Pin Code": rng.integers(700001, 799999, n),
+        "Active": np.where(rng.random(n) < 0.8, "Yes", "No"),
+        "Profile Picture": "",
+        "Contact": rng.integers(6_000_000_000, 9_999_999_999, n),
+        "Email": "member" + pd.Series(range(n)).astype(str) + "@example.org",
+        "DOB": "01-01-1950",
+        "Username": "member" + pd.Series(range(n)).astype(str),
+        "Password": password_hash,
+    })
+
+def make_messages(rng, names, n, years, broadcast_share=0.3):
+    """n message rows; about broadcast_share of them belong to broadcasts (one
+    message to 20-200 recipients with the same timestamp)."""
+    broadcast_rows = int(n * broadcast_share)
+    sizes = []
+    while sum(sizes) < broadcast_rows:
+        sizes.append(int(rng.integers(20, 201)))
+    sizes[-1] -= sum(sizes) - broadcast_rows
+    events = (n - broadcast_rows) + len(sizes)
+    repeat = np.concatenate([np.ones(n - broadcast_rows, dtype=int), np.array(sizes, dtype=int)])
+    order = rng.permutation(events)
+    repeat = repeat[order]
+
+    senders = rng.choice(names, events)
+    texts = rng.integers(0, len(MESSAGES), events)
+    stamps = _timestamps(rng, events, years)
+    lang, message, translation = (np.array([m[i] for m in MESSAGES], dtype=object) for i in range(3))
+    rows = np.repeat(np.arange(events), repeat)
+    return pd.DataFrame({
+        "From": senders[rows],
+        "To": rng.choice(names, len(rows)),
+        "Message": message[texts[rows]],
+        "Language": lang[texts[rows]],
+        "Translation": translation[texts[rows]],
+        "Timestamp": np.asarray(stamps)[rows],
+    })
+
+def make_emergencies(rng, roster, n, years):
+    rows = rng.integers(0, len(roster), n)
+    times = _timestamps(rng, n, years)
+    resolved = rng.random(n) < 0.9
+    resolved_at = (pd.to_datetime(times) + pd.to_timedelta(rng.integers(5, 240, n), unit="min")).strftime("%Y-%m-%d %H:%M:%S")
+    return pd.DataFrame({
+        "Member Name": roster["Member Name"].to_numpy()[rows],
+        "Locality": roster["Locality"].to_numpy()[rows],
+        "City": roster["City"].to_numpy()[rows],
+        "Pin Code": roster["Pin Code"].to_numpy()[rows],
+        "Contact": roster["Contact"].to_numpy()[rows],
+        "Time": times,
+        "Cause": rng.choice(CAUSES, n),
+        "Status": np.where(resolved, "Resolved", "Pending"),
+        "Resolved At": np.where(resolved, resolved_at, ""),
+    })
+
+def make_reminders(rng, names, n):
+    days = pd.Timestamp.today().normalize() - pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    hours = rng.choice(["08:00", "09:00", "13:00", "20:00", "08:00,20:00", "09:00,14:00,21:00"], n)
+    return pd.DataFrame({
+        "ID": [f"{i:012x}" for i in range(n)],
+        "Username": rng.choice(names, n),
+        "Title": rng.choice(["Metformin", "Amlodipine", "Walk", "Vitamin D", "Doctor visit", "Yoga"], n),
+        "Notes": "",
+        "Date": days.strftime("%Y-%m-%d"),
+        "Time(s)": hours,
+        "Frequency": rng.choice(["daily", "daily", "weekly", "monthly", "once"], n),
+        "Taken": "",
+    })
+
+def make_vitals(rng, roster, n, years):
+    from app.utils.health_checkup import HEALTH_COLUMNS, generate_advice_batch
+    rows = rng.integers(0, len(roster), n)
+    vitals = {
+        "temp": np.round(rng.normal(98.4, 1.0, n), 1),
+        "sys": rng.normal(130, 15, n).astype(int),
+        "dia": rng.normal(82, 10, n).astype(int),
+        "hr": rng.normal(76, 12, n).astype(int),
+        "chol": rng.normal(200, 35, n).astype(int),
+    }
+    ages = roster["Age"].to_numpy()[rows]
+    flags, advice = generate_advice_batch(vitals["temp"], vitals["sys"], vitals["dia"], vitals["hr"], vitals["chol"], ages)
+    df = pd.DataFrame({
+        "Timestamp": _timestamps(rng, n, years),
+        "Patient Name": roster["Member Name"].to_numpy()[rows],
+        "Age": ages,
+        "Temperature (°F)": vitals["temp"],
+        "Blood Pressure (mmHg)": pd.Series(vitals["sys"]).astype(str) + "/" + pd.Series(vitals["dia"]).astype(str),
+        "Heart Rate (bpm)": vitals["hr"],
+        "Cholesterol (mg/dL)": vitals["chol"],
+        "Flags": flags,
+        "Advice": advice,
+    })
+    return df[HEALTH_COLUMNS]
+
+def password_hash(password):
+    """One bcrypt hash shared by every member (hashing each would take hours);
+    plaintext, which auth also accepts, when bcrypt is unavailable."""
+    try:
+        import bcrypt
+    except ImportError:
+        return password
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=12)).decode()
+
+def generate(out, members=10_000, messages=1_000_000, emergencies=20_000, reminders=50_000,
+             vitals=500_000, years=3, seed=0, password="password"):
+    """Write every dataset under `out`; returns {dataset: (path, rows)}."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(out, "logs"), exist_ok=True)
+    os.makedirs(os.path.join(out, "data"), exist_ok=True)
+    roster = make_roster(rng, members, password_hash(password))
+    names = roster["Member Name"].to_numpy()
+    frames = {
+        "roster": ("roster.csv", roster),
+        "messages": (os.path.join("logs", "message_logs.csv"), make_messages(rng, names, messages, years)),
+        "emergencies": (os.path.join("logs", "emergency_logs.csv"), make_emergencies(rng, roster, emergencies, years)),
+        "reminders": ("reminders.csv", make_reminders(rng, names, reminders)),
+        "vitals": (os.path.join("data", "health_data.csv"), make_vitals(rng, roster, vitals, years)),
+    }
+    written = {}
+    for name, (rel, df) in frames.items():
+        path = os.path.join(out, rel)
+        df.to_csv(path, index=False, lineterminator="\n")
+        written[name] = (path, len(df))
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--emergencies", type=int, default=20_000)
+    parser.add_argument("--reminders", type=int, default=50_000)
+    parser.add_argument("--vitals", type=int, default=500_000)
+    parser.add_argument("--years", type=int, default=3, help="Time span of the logs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = generate(args.out, args.members, args.messages, args.emergencies, args.reminders,
+                       args.vitals, args.years, args.seed)
+    for name, (path, rows) in written.items():
+        print(f"✅ {name}: {rows} rows -> {path}")
+    print(f"⏱️ Generated in {time.perf_counter() - start:.1f}s. Password for every member: 'password'")
+
+if __name__ == "__main__":
+    main()
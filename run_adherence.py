@@ -0,0 +1,41 @@
+import argparse
+from app.utils import adherence
+
+def _percent(rate):
+    return "n/a" if rate is None else f"{rate:.0%}"
+
+def report(member=None):
+    stats = adherence.update_stats()
+    members = {k: v for k, v in stats["members"].items() if not member or k == member.strip().lower()}
+    if not members:
+        print("📭 No adherence data yet.")
+        return
+    print("\n💊 Medication adherence:")
+    for name, counts in sorted(members.items(), key=lambda kv: adherence.on_time_rate(kv[1]) or 0):
+        rate = adherence.on_time_rate(counts)
+        print(f"\n👤 {name}: {_percent(rate)} on time | taken {counts['taken']}, late {counts['late']}, "
+              f"missed {counts['missed']} (longest missed streak {counts['max_streak']})")
+        for key, med in sorted(stats["medicines"].items()):
+            user, medicine = key.split("|", 1)
+            if user != name:
+                continue
+            streak = f" ⚠️ {med['streak']} missed in a row" if med["streak"] >= 2 else ""
+            print(f"  🔹 {medicine}: {_percent(adherence.on_time_rate(med))} on time "
+                  f"({med['taken']}/{med['late']}/{med['missed']} taken/late/missed){streak}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Medication adherence log maintenance and reports.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sweep", help="Log doses that passed their grace period unmarked as Missed")
+    rep = sub.add_parser("report", help="On-time rates and missed streaks per member and medicine")
+    rep.add_argument("--user", help="Only this member")
+    args = parser.parse_args()
+
+    if args.command == "sweep":
+        missed = adherence.sweep_missed()
+        print(f"✅ Logged {missed} missed dose(s).")
+    else:
+        report(args.user)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import os
 import sys
 import re
-from app.utils import config, member_info, reminder, messaging, emergency, health_checkup, song_search
+import argparse
+import builtins
+from app.utils import config, member_info, member_match, profiling, reminder, messaging, emergency, health_checkup, song_search
 from auth import authenticate_user, register_user, reset_password  # ✅ Import password reset
 
 # -----------------------------
@@ -16,6 +18,9 @@ def is_valid_email(email):
     return bool(re.fullmatch(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$", email.strip()))
 
 def print_emergencies_table(items):
+    if emergency.older_resolved_hidden():
+        print("ℹ️ Resolved emergencies from earlier months are hidden; "
+              "run_view_emergencies.py --all lists them.")
     if not items:
         print("📭 No emergencies logged yet.")
         return
@@ -53,10 +58,18 @@ def manage_health_checkups(input_name):
     print("\n✅ Health Checkup Recorded!")
     print(f"Flags: {record['Flags']}")
     print(f"Advice: {record['Advice']}")
+    for alert in record.get("Alerts", []):
+        print(alert)
 
 # -----------------------------
 # Main chatbot loop
 # -----------------------------
+MENU_ACTIONS = {
+    "1": "add_reminder", "2": "check_reminders", "3": "mark_taken", "4": "send_message",
+    "5": "view_messages", "6": "raise_emergency", "7": "view_emergencies", "8": "resolve_emergency",
+    "9": "health_checkup", "10": "health_trends", "11": "find_song", "12": "members_like_me", "13": "exit",
+}
+
 def main():
     print("=== Hosla Member Chatbot ===")
 
@@ -125,16 +138,18 @@ def main():
     username = input("Enter your username: ").strip()
     password = input("Enter your password: ").strip()
 
-    user_record = authenticate_user(username, password)
+    with profiling.span("menu.login"):
+        user_record = authenticate_user(username, password)
     if not user_record:
         print("🚫 Invalid credentials. Please check your username/password.")
         sys.exit(0)
 
     member_name = user_record.get("Member Name", username)
 
-    greeting, pic_path, active_members = member_info.greet_user_and_show_active_members(
-        config.IMAGE_DIR, member_name
-    )
+    with profiling.span("menu.greeting"):
+        greeting, pic_path, active_members = member_info.greet_user_and_show_active_members(
+            config.IMAGE_DIR, member_name
+        )
 
     if active_members == [] and "No user found" in greeting:
         print("\n" + greeting)
@@ -146,7 +161,7 @@ def main():
         print(f"📷 Profile picture found at: {pic_path}")
     else:
         print("📷 No profile picture found.")
-    print("\n✅ Active Members:")
+    print("\n✅ Members Like You:")
     for m in active_members:
         print(" - " + m)
 
@@ -166,59 +181,73 @@ def main():
         print("9. Health Checkup Updates")
         print("10. View Health Trends")
         print("11. Find Song by Lyrics")
-        print("12. Exit")
+        print("12. Members Like Me")
+        print("13. Exit")
 
         choice = input("Choose an option: ").strip()
 
-        if choice == "1":
-            reminder.add_reminder(member_name)
-        elif choice == "2":
-            reminder.check_reminders(username=member_name, show_all=True)
-        elif choice == "3":
-            reminder.mark_as_taken(member_name)
-        elif choice == "4":
-            messaging.send_message(member_name)
-        elif choice == "5":
-            messaging.view_messages_for_user(member_name)
-        elif choice == "6":
-            details = emergency.fetch_member_details(member_name)
-            if not details:
-                print("❌ Your member details were not found in the Google Sheet.")
-            else:
-                cause = input("Enter reason for emergency: ").strip()
-                emergency.log_emergency(details, cause)
-                print("✅ Emergency logged.")
-        elif choice == "7":
-            items = emergency.view_emergencies()
-            print_emergencies_table(items)
-        elif choice == "8":
-            items = emergency.view_emergencies()
-            if not items:
-                print("📭 No emergencies to resolve.")
-            else:
+        with profiling.span("menu." + MENU_ACTIONS.get(choice, "invalid")):
+            if choice == "1":
+                reminder.add_reminder(member_name)
+            elif choice == "2":
+                reminder.check_reminders(username=member_name, show_all=True)
+            elif choice == "3":
+                reminder.mark_as_taken(member_name)
+            elif choice == "4":
+                messaging.send_message(member_name)
+            elif choice == "5":
+                messaging.view_messages_for_user(member_name)
+            elif choice == "6":
+                details = emergency.fetch_member_details(member_name)
+                if not details:
+                    print("❌ Your member details were not found in the Google Sheet.")
+                else:
+                    cause = input("Enter reason for emergency: ").strip()
+                    emergency.log_emergency(details, cause)
+                    print("✅ Emergency logged.")
+            elif choice == "7":
+                items = emergency.view_emergencies()
                 print_emergencies_table(items)
-                try:
-                    idx = int(input("\nEnter the index to mark Resolved: ").strip())
-                    if emergency.mark_resolved(idx):
-                        print("✅ Marked as Resolved.")
-                    else:
-                        print("❌ Invalid index.")
-                except ValueError:
-                    print("❌ Please enter a valid number.")
-        elif choice == "9":
-            print("\n🩺 Entering Health Checkup Module...")
-            manage_health_checkups(member_name)
-        elif choice == "10":
-            print(f"\n📊 Viewing Health Trends for {member_name}...")
-            health_checkup.generate_trends(member_name)
-        elif choice == "11":
-            lyrics = input("🎶 Enter some song lyrics: ").strip()
-            song_search.find_song_from_lyrics(lyrics)
-        elif choice == "12":
-            print("👋 Goodbye! Stay healthy, Stay safe. Hosla is always with you. For any enquiry call 7811009309")
-            break
-        else:
-            print("❌ Invalid choice. Try again.")
+            elif choice == "8":
+                items = emergency.view_emergencies()
+                if not items:
+                    print("📭 No emergencies to resolve.")
+                else:
+                    print_emergencies_table(items)
+                    try:
+                        idx = int(input("\nEnter the index to mark Resolved: ").strip())
+                        if emergency.mark_resolved(idx):
+                            print("✅ Marked as Resolved.")
+                        else:
+                            print("❌ Invalid index.")
+                    except ValueError:
+                        print("❌ Please enter a valid number.")
+            elif choice == "9":
+                print("\n🩺 Entering Health Checkup Module...")
+                manage_health_checkups(member_name)
+            elif choice == "10":
+                print(f"\n📊 Viewing Health Trends for {member_name}...")
+                health_checkup.generate_trends(member_name)
+            elif choice == "11":
+                lyrics = input("🎶 Enter some song lyrics: ").strip()
+                song_search.find_song_from_lyrics(lyrics)
+            elif choice == "12":
+                member_match.browse_members_like_me(member_name)
+            elif choice == "13":
+                print("👋 Goodbye! Stay healthy, Stay safe. Hosla is always with you. For any enquiry call 7811009309")
+                break
+            else:
+                print("❌ Invalid choice. Try again.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hosla member chatbot.")
+    parser.add_argument("--profile", action="store_true", help="Print a per-action latency breakdown at exit")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="Also write profiling spans to PATH (.prom: Prometheus text, otherwise JSON lines)")
+    args = parser.parse_args()
+    if args.profile or args.profile_out:
+        out = args.profile_out or ""
+        profiling.enable(jsonl_path=None if out.endswith(".prom") else out or None,
+                         prometheus_path=out if out.endswith(".prom") else None, report=args.profile)
+        builtins.input = profiling.untimed(builtins.input)  # report machine time, not typing time
     main()
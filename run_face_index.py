@@ -0,0 +1,42 @@
+import time
+import argparse
+from app.utils import face_index
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the member face index or identify a member from a photo.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Encode new and changed member photos")
+    build.add_argument("--photos", default=face_index.PHOTO_DIR, help="Member photo directory")
+    build.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    build.add_argument("--full", action="store_true", help="Re-encode every photo")
+    identify = sub.add_parser("identify", help="Find the member(s) in a photo")
+    identify.add_argument("photo")
+    identify.add_argument("-k", type=int, default=3, help="Candidates per face")
+    identify.add_argument("--threshold", type=float, default=face_index.MATCH_THRESHOLD,
+                          help="Maximum face distance for a match (lower is stricter)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        report = face_index.build(args.photos, workers=args.workers, full=args.full)
+        print(f"✅ {report['photos']} photo(s): {report['encoded']} encoded, {report['unchanged']} unchanged, "
+              f"{report['removed']} removed in {time.perf_counter() - start:.1f}s.")
+        for name in report["no_face"]:
+            print(f"⚠️ {name}: no face found")
+        for name, error in report["failed"].items():
+            print(f"⚠️ {name}: {error}")
+    else:
+        start = time.perf_counter()
+        results = face_index.identify(args.photo, k=args.k, threshold=args.threshold)
+        elapsed = (time.perf_counter() - start) * 1000
+        if not results:
+            print("📭 No face found in the photo.")
+        for n, matches in enumerate(results, start=1):
+            if not matches:
+                print(f"👤 Face {n}: no matching member.")
+            for m in matches:
+                print(f"👤 Face {n}: {m['member']} (distance {m['distance']}, photo {m['photo']})")
+        print(f"\n⏱️ {elapsed:.0f} ms (including face detection)")
+
+if __name__ == "__main__":
+    main()
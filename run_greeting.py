@@ -12,6 +12,6 @@ if pic_path:
 else:
     print("⚠️ No profile picture available.")
 
-print("\n🔆 Active Members:")
+print("\n🔆 Members Like You:")
 for member in active_members:
     print("•", member)
@@ -0,0 +1,27 @@
+import argparse
+from app.utils import health_aggregates
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain per-member running health aggregates.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Recompute aggregates from data/health_data.csv")
+    show = sub.add_parser("show", help="Show a member's aggregates")
+    show.add_argument("name")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        members = health_aggregates.rebuild()
+        print(f"✅ Rebuilt health aggregates for {members} member(s).")
+    elif args.command == "show":
+        state = health_aggregates.get(args.name)
+        if not state:
+            print(f"📭 No health aggregates found for {args.name}.")
+            return
+        print(f"\n📊 {state['name']}: {state['count']} reading(s), last at {state['last_timestamp']}")
+        for line in health_aggregates.trend_summary(state):
+            print(line)
+        if state["flag_counts"]:
+            print("Flags: " + ", ".join(f"{k} ×{v}" for k, v in state["flag_counts"].items()))
+
+if __name__ == "__main__":
+    main()
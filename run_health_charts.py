@@ -0,0 +1,17 @@
+import argparse
+from app.utils import health_charts
+
+def main():
+    parser = argparse.ArgumentParser(description="Render health trend charts for every member into data/charts/.")
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render charts even if the data is unchanged")
+    args = parser.parse_args()
+
+    rendered, skipped = health_charts.render_all_charts(
+        fmt=args.format, workers=args.workers, force=args.force
+    )
+    print(f"✅ Rendered {rendered} chart(s), {skipped} unchanged chart(s) skipped.")
+
+if __name__ == "__main__":
+    main()
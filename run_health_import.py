@@ -0,0 +1,28 @@
+import argparse
+from app.utils import health_import
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import vitals from a device or health-camp CSV export.")
+    parser.add_argument("path", help="CSV export to import")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Rows processed per batch")
+    parser.add_argument("--rejects", help="Where to write rejected rows (default: <path>_rejected.csv)")
+    parser.add_argument("--celsius", action="store_true", help="Temperatures in the file are °C")
+    parser.add_argument("--no-roster", action="store_true", help="Accept names without matching the member roster")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, don't write anything")
+    args = parser.parse_args()
+
+    report = health_import.import_vitals(
+        args.path,
+        chunksize=args.chunksize,
+        use_roster=not args.no_roster,
+        reject_path=args.rejects or health_import.default_reject_path(args.path),
+        celsius=True if args.celsius else None,
+        dry_run=args.dry_run,
+    )
+
+    print(f"\n📥 Read {report['read']} row(s): {report['imported']} imported, {report['rejected']} rejected.")
+    for reason, count in report["reasons"].most_common():
+        print(f"   ❌ {reason}: {count}")
+
+if __name__ == "__main__":
+    main()
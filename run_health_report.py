@@ -0,0 +1,33 @@
+import argparse
+from app.utils import health_trends
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank members whose vitals are deteriorating.")
+    parser.add_argument("--window-days", type=int, default=90, help="Only use readings from the last N days (0 = all)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--min-readings", type=int, default=3)
+    parser.add_argument("--out", help="Also write the full per-member trend table to this CSV file")
+    args = parser.parse_args()
+
+    trends = health_trends.compute_member_trends(
+        health_trends.load_history(), window_days=args.window_days or None
+    )
+    if trends.empty:
+        print("📭 No health records found yet.")
+        return
+
+    report = health_trends.deteriorating_members(trends, top=args.top, min_readings=args.min_readings)
+    if report.empty:
+        print("✅ No members with deteriorating vitals.")
+    else:
+        print(f"\n⚠️ Top {len(report)} deteriorating member(s):")
+        for i, row in report.iterrows():
+            print(f"{i + 1}. {row['Patient Name']} – score {row['deterioration_score']:.2f} "
+                  f"(worst: {row['worst_vital']}, {row['readings']} readings)")
+
+    if args.out:
+        trends.to_csv(args.out, index=False)
+        print(f"\n💾 Trend table saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
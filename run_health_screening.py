@@ -0,0 +1,23 @@
+import argparse
+from app.utils import health_checkup
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag every member's latest health reading.")
+    parser.add_argument("--out", help="Also write the at-risk list to this CSV file")
+    args = parser.parse_args()
+
+    at_risk = health_checkup.screen_latest()
+    if at_risk.empty:
+        print("✅ No members flagged on their latest reading.")
+        return
+
+    print(f"\n⚠️ {len(at_risk)} member(s) flagged on their latest reading:")
+    for _, row in at_risk.iterrows():
+        print(f"🔹 {row['Patient Name']} ({row['Timestamp']}): {row['Flags']}")
+
+    if args.out:
+        at_risk.to_csv(args.out, index=False)
+        print(f"\n💾 At-risk list saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+from app.utils import health_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the typed columnar health store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="Build the store from data/health_data.csv")
+    migrate.add_argument("--csv", help="Source CSV (defaults to data/health_data.csv)")
+    migrate.add_argument("--overwrite", action="store_true", help="Replace an existing store")
+
+    export = sub.add_parser("export", help="Export the store back to CSV")
+    export.add_argument("out", help="Destination CSV path")
+
+    tail = sub.add_parser("tail", help="Show a member's latest readings")
+    tail.add_argument("name")
+    tail.add_argument("-n", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "migrate":
+        rows = health_store.migrate_from_csv(args.csv, overwrite=args.overwrite)
+        print(f"✅ Migrated {rows} health record(s) into {health_store.STORE_DIR}")
+    elif args.command == "export":
+        rows = health_store.export_csv(args.out)
+        print(f"✅ Exported {rows} health record(s) to {args.out}")
+    elif args.command == "tail":
+        df = health_store.load(patient=args.name, last_n=args.n, display=True)
+        print(df.to_string(index=False) if not df.empty else f"📭 No health records found for {args.name}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import argparse
+from app.utils import config, emergency, log_partitions
+
+# messaging is not imported for its column list: it loads the translation stack
+SOURCES = {
+    "messages": (config.MESSAGE_LOG_PATH, None),
+    "emergencies": (emergency.EMERGENCY_LOG, emergency.EMERGENCY_COLUMNS),
+}
+
+def compact(log, month=None):
+    todo = [month] if month else log_partitions.closed_months(log)
+    if not todo:
+        print(f"📭 {log}: no closed month to compact.")
+    for m in todo:
+        before, after = log_partitions.compact(log, m)
+        print(f"🗜️  {log} {m}: {before} row(s) -> {after} stored row(s), gzip-compressed.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly partitions for the message and emergency logs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Split the single log file(s) into monthly partitions")
+    migrate.add_argument("log", choices=["messages", "emergencies", "all"])
+    migrate.add_argument("--overwrite", action="store_true", help="Rebuild partitions that already exist")
+    migrate.add_argument("--compact", action="store_true", help="Compact the closed months right away")
+    comp = sub.add_parser("compact", help="Compact and gzip closed months (all of them, or one)")
+    comp.add_argument("log", choices=["messages", "emergencies", "all"])
+    comp.add_argument("--month", help="YYYY-MM (may be the current month)")
+    export = sub.add_parser("export", help="Write a partitioned log (or a time range) to one CSV")
+    export.add_argument("log", choices=["messages", "emergencies"])
+    export.add_argument("dest")
+    export.add_argument("--since", help="YYYY-MM[-DD ...], inclusive")
+    export.add_argument("--until", help="YYYY-MM[-DD ...], exclusive")
+    reindex = sub.add_parser("reindex", help="Rebuild the member index (messages) or pending counts (emergencies)")
+    reindex.add_argument("log", choices=["messages", "emergencies", "all"])
+    sub.add_parser("status", help="Show partitioned logs with months and sizes")
+    args = parser.parse_args()
+    logs = list(SOURCES) if getattr(args, "log", None) == "all" else [getattr(args, "log", None)]
+
+    if args.command == "migrate":
+        for log in logs:
+            source, columns = SOURCES[log]
+            try:
+                rows, months = log_partitions.migrate(log, source, columns, overwrite=args.overwrite)
+            except FileExistsError as e:
+                print(f"⚠️ {e} (use --overwrite to rebuild)")
+                continue
+            print(f"✅ {log}: {rows} row(s) split into {months} monthly partition(s).")
+            print(f"   {source} is no longer read or written; keep it as a backup.")
+            if args.compact:
+                compact(log)
+    elif args.command == "compact":
+        for log in logs:
+            if not log_partitions.is_enabled(log):
+                print(f"📄 {log} is not partitioned (run migrate first).")
+                continue
+            compact(log, args.month)
+    elif args.command == "reindex":
+        for log in logs:
+            if not log_partitions.is_enabled(log):
+                print(f"📄 {log} is not partitioned (run migrate first).")
+                continue
+            n = log_partitions.reindex(log)
+            what = "member index entries" if log in log_partitions.MEMBER_ROLES else "pending emergencies"
+            print(f"✅ {log}: {n} {what}.")
+    elif args.command == "export":
+        if not log_partitions.is_enabled(args.log):
+            print(f"📄 {args.log} is not partitioned; {SOURCES[args.log][0]} is already a single file.")
+            return
+        rows = log_partitions.export(args.log, args.dest, args.since, args.until)
+        print(f"✅ Exported {rows} {args.log} row(s) to {args.dest}.")
+    else:
+        for log in SOURCES:
+            if not log_partitions.is_enabled(log):
+                print(f"📄 {log}: single file")
+                continue
+            entry = log_partitions.load_manifest()["logs"].get(log, {})
+            info = entry.get("months", {})
+            files = [p for m in info for p in log_partitions.partition_files(log, m)]
+            size = sum(os.path.getsize(p) for p in files) / 1e6
+            compacted = sum(1 for state in info.values() if state.get("compacted"))
+            span = f"{min(info)} .. {max(info)}" if info else "empty"
+            print(f"🗂️  {log}: {len(info)} month(s) ({span}), {compacted} compacted, {size:.1f} MB on disk")
+            if log in log_partitions.MEMBER_ROLES and entry.get("member_index") != "ready":
+                print(f"   ⚠️ No member index: readers open every month (run reindex {log})")
+            if log in log_partitions.PENDING and any("pending" not in state for state in info.values()):
+                print(f"   ⚠️ Pending counts unknown for some months (run reindex {log})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import time
+import argparse
+from app.utils import lyrics_embeddings, lyrics_index, song_search
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the semantic lyrics index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Embed new and changed files of the lyrics corpus")
+    build.add_argument("--corpus", default=lyrics_index.LYRICS_DIR, help="Lyrics corpus directory (.txt/.lrc/.csv)")
+    build.add_argument("--model", default=lyrics_embeddings.DEFAULT_MODEL,
+                       help="sentence-transformers model name or local path")
+    build.add_argument("--full", action="store_true", help="Re-embed everything")
+    search = sub.add_parser("search", help="Find songs close in meaning to a phrase")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5, help="Number of songs to show")
+    search.add_argument("--probes", type=int, default=lyrics_embeddings.IVF_PROBES,
+                        help="IVF lists to scan (large corpora only)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        report = lyrics_embeddings.build_index(args.corpus, model_name=args.model, full=args.full)
+        print(f"✅ {report['passages']} passage(s): {report['embedded']} embedded, {report['reused']} reused, "
+              f"{report['lists']} list(s) in {time.perf_counter() - start:.1f}s.")
+    else:
+        if not lyrics_embeddings.is_enabled():
+            print("📭 No semantic index yet; run: python run_lyrics_embeddings.py build")
+            return
+        encode = lyrics_embeddings.model_encoder(lyrics_embeddings.load_meta()["model"])
+        start = time.perf_counter()
+        results = lyrics_embeddings.search(args.query, k=args.k, encode=encode, probes=args.probes)
+        elapsed = (time.perf_counter() - start) * 1000
+        if not results:
+            print("📭 No matching songs.")
+        song_search.print_results(results)
+        print(f"\n⏱️ {elapsed:.1f} ms (including query encoding)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import time
+import argparse
+from app.utils import lyrics_index, song_search
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline lyrics search index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Index new and changed files of the lyrics corpus")
+    build.add_argument("--corpus", default=lyrics_index.LYRICS_DIR, help="Lyrics corpus directory (.txt/.lrc/.csv)")
+    build.add_argument("--full", action="store_true", help="Rebuild everything into a single segment")
+    search = sub.add_parser("search", help="Search the index for a lyric fragment")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5, help="Number of songs to show")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        report = lyrics_index.build_index(args.corpus, full=args.full)
+        print(f"✅ {report['mode'].capitalize()} build: {report['added']} file(s) indexed, "
+              f"{report['removed']} removed, {report['segments']} segment(s) "
+              f"in {time.perf_counter() - start:.1f}s.")
+    else:
+        if not lyrics_index.is_enabled():
+            print("📭 No lyrics index yet; run: python run_lyrics_index.py build")
+            return
+        start = time.perf_counter()
+        results = lyrics_index.search(args.query, k=args.k)
+        elapsed = (time.perf_counter() - start) * 1000
+        if not results:
+            print("📭 No matching songs.")
+        song_search.print_results(results)
+        print(f"\n⏱️ {elapsed:.1f} ms")
+
+if __name__ == "__main__":
+    main()
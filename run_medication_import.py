@@ -0,0 +1,30 @@
+import argparse
+from datetime import datetime
+from app.utils import medication_import
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import a medication schedule into daily reminders.")
+    parser.add_argument("path", nargs="?", default="medication_schedule.csv", help="Schedule CSV to import")
+    parser.add_argument("--start", help="First day for new reminders, YYYY-MM-DD (default: today)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Rows processed per batch")
+    parser.add_argument("--rejects", help="Where to write rejected rows (default: <path>_rejected.csv)")
+    parser.add_argument("--no-roster", action="store_true", help="Use names as usernames without matching the roster")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and count only, don't write reminders")
+    args = parser.parse_args()
+
+    report = medication_import.import_schedule(
+        args.path,
+        chunksize=args.chunksize,
+        use_roster=not args.no_roster,
+        reject_path=args.rejects or medication_import.default_reject_path(args.path),
+        start=datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None,
+        dry_run=args.dry_run,
+    )
+
+    print(f"\n💊 Read {report['read']} row(s): {report['added']} added, {report['updated']} updated, "
+          f"{report['removed']} removed, {report['rejected']} rejected.")
+    for reason, count in report["reasons"].most_common():
+        print(f"   ❌ {reason}: {count}")
+
+if __name__ == "__main__":
+    main()
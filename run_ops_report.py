@@ -0,0 +1,50 @@
+import argparse
+from datetime import datetime
+from app.utils import ops_report
+
+def print_day(report, top):
+    s = ops_report.summarize(report, top)
+    print(f"\n📅 Operations report for {s['day']}")
+    print(f"💬 Messages: {s['messages']} from {s['senders']} member(s), "
+          f"{s['translation_failed']} translation failure(s)")
+    if s["languages"]:
+        print(f"   Languages: {s['languages']}")
+        print(f"   Top senders: {s['top_senders']}")
+    print(f"🚨 Emergencies: {s['emergencies']} raised, {s['emergencies_pending']} still pending"
+          + (f", median {s['median_minutes_to_resolve']:.0f} min to resolve" if s["median_minutes_to_resolve"] != "" else ""))
+    if s["emergency_cities"]:
+        print(f"   By city: {s['emergency_cities']}")
+    print(f"🩺 Health: {s['health_readings']} reading(s), {s['flagged_readings']} flagged "
+          f"across {s['flagged_members']} member(s)")
+    for member, flags in list(report.get("health", {}).get("flagged_members", {}).items())[:top]:
+        print(f"   ⚠️ {member}: {flags}")
+    if s["doses"]:
+        print(f"💊 Doses: {s['doses']} due, {s['on_time_rate']:.0%} on time, {s['missed_doses']} missed")
+    if s["active_reminders"] != "":
+        print(f"⏰ Active reminders: {s['active_reminders']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily operations report over messages, emergencies, health and reminders.")
+    parser.add_argument("--day", default=datetime.now().strftime("%Y-%m-%d"), help="Day to print (YYYY-MM-DD, default today)")
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch instead of reading only new rows")
+    parser.add_argument("--since", help="First day written to --csv/--json (default: --day)")
+    parser.add_argument("--until", help="Last day written to --csv/--json (default: --day)")
+    parser.add_argument("--csv", help="Write one summary row per day to this CSV file")
+    parser.add_argument("--json", help="Write the full day reports to this JSON file")
+    parser.add_argument("--top", type=int, default=5, help="Members listed per section")
+    args = parser.parse_args()
+
+    start = datetime.now()
+    read = ops_report.update(full=args.full)
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"🔄 Report data updated in {elapsed:.1f}s (" + ", ".join(f"{k}: {v} row(s)" for k, v in read.items()) + ")")
+
+    print_day(ops_report.load_day(args.day), args.top)
+    days = ops_report.select_days(args.since or args.day, args.until or args.day)
+    if args.csv:
+        print(f"\n💾 {ops_report.write_csv(args.csv, days)} day(s) written to {args.csv}")
+    if args.json:
+        print(f"💾 {ops_report.write_json(args.json, days)} day(s) written to {args.json}")
+
+if __name__ == "__main__":
+    main()
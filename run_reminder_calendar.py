@@ -0,0 +1,33 @@
+import argparse
+from datetime import datetime, timedelta
+from app.utils import reminder
+
+def main():
+    parser = argparse.ArgumentParser(description="Show reminder alerts for a date range or the next few minutes.")
+    parser.add_argument("--user", help="Only this member's reminders")
+    parser.add_argument("--start", help="Range start, YYYY-MM-DD (default: today)")
+    parser.add_argument("--days", type=int, default=7, help="Range length in days (default: 7)")
+    parser.add_argument("--due-in", type=int, metavar="MINUTES", help="Instead, list alerts due in the next N minutes")
+    args = parser.parse_args()
+
+    if args.due_in is not None:
+        due = reminder.due_within(args.due_in, username=args.user)
+        if due.empty:
+            print(f"📭 Nothing due in the next {args.due_in} minute(s).")
+        for _, row in due.iterrows():
+            print(f"⏰ {row['Alert Time']:%Y-%m-%d %H:%M} {row['Username']}: {row['Title']}")
+        return
+
+    start = datetime.strptime(args.start, "%Y-%m-%d") if args.start else datetime.now().replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=args.days)
+    print(f"\n📅 Reminders from {start:%Y-%m-%d} to {end - timedelta(days=1):%Y-%m-%d}:")
+    current_day = None
+    for when, rem in reminder.iter_due(start, end, username=args.user):
+        if when.date() != current_day:
+            current_day = when.date()
+            print(f"\n{current_day:%A, %d %B %Y}")
+        print(f"  {when:%H:%M}  {rem.username}: {rem.title}" + (f" ({rem.notes})" if rem.notes else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import argparse
+from app.utils import reminder_scheduler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the reminder scheduler: fire alerts as they fall due.")
+    parser.add_argument("--poll", type=float, default=reminder_scheduler.POLL_INTERVAL,
+                        help="Seconds between checks of reminders.csv for changes")
+    args = parser.parse_args()
+
+    scheduler = reminder_scheduler.ReminderScheduler(poll_interval=args.poll)
+    scheduler.sync()
+    print(f"⏰ Reminder scheduler running with {len(scheduler.reminders)} reminder(s). Press Ctrl+C to stop.")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\n👋 Reminder scheduler stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import json
+import asyncio
+import argparse
+from app.utils import replay, roster, server
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a JSONL script of member sessions without a TTY and report latency.")
+    parser.add_argument("script", help="JSONL script (see app/utils/replay.py for the format)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Sessions running at once")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay every session this many times")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Scale recorded pauses (1 = real time, 0 = no pauses)")
+    parser.add_argument("--server", metavar="HOST:PORT", help="Replay against a running run_server.py instead of in-process")
+    parser.add_argument("--io-workers", type=int, default=server.IO_WORKERS)
+    parser.add_argument("--cpu-workers", type=int, default=server.CPU_WORKERS)
+    parser.add_argument("--out", help="Also write the report as JSON here")
+    parser.add_argument("--make-script", action="store_true",
+                        help="Write a synthetic script for roster members to SCRIPT instead of replaying")
+    parser.add_argument("--sessions", type=int, default=100, help="With --make-script: number of sessions")
+    parser.add_argument("--steps", type=int, default=10, help="With --make-script: actions per session")
+    parser.add_argument("--password", help="With --make-script: log in with this password (default: act as the member)")
+    args = parser.parse_args()
+
+    if args.make_script:
+        sessions = replay.make_sessions(roster.load_roster(), args.sessions, args.steps, args.password)
+        replay.write_script(args.script, sessions)
+        print(f"✅ Wrote {len(sessions)} sessions to {args.script}")
+        return
+
+    try:
+        sessions = replay.load_script(args.script)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read script: {e}")
+        return
+    if args.server:
+        host, _, port = args.server.rpartition(":")
+        target = replay.RemoteTarget(host or server.DEFAULT_HOST, int(port))
+    else:
+        print("⚠️ Replaying in-process: actions write to this tree's data and log files.")
+        target = replay.LocalTarget(server.Server(io_workers=args.io_workers, cpu_workers=args.cpu_workers))
+
+    print(f"▶️ Replaying {len(sessions)} session(s) x{args.repeat} with concurrency {args.concurrency}...")
+    report = asyncio.run(replay.replay(sessions, target, args.concurrency, args.repeat, args.speed))
+    if isinstance(target, replay.LocalTarget):
+        target.app.close()
+    replay.print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Report written to {args.out}")
+
+if __name__ == "__main__":
+    main()
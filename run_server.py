@@ -0,0 +1,20 @@
+import asyncio
+import argparse
+from app.utils import server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the member menu to many sessions from one process.")
+    parser.add_argument("--host", default=server.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    parser.add_argument("--io-workers", type=int, default=server.IO_WORKERS, help="Threads for file and roster work")
+    parser.add_argument("--cpu-workers", type=int, default=server.CPU_WORKERS,
+                        help="Threads for bcrypt, translation, charts and search")
+    args = parser.parse_args()
+    try:
+        asyncio.run(server.serve(args.host, args.port,
+                                 server.Server(io_workers=args.io_workers, cpu_workers=args.cpu_workers)))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped.")
+
+if __name__ == "__main__":
+    main()
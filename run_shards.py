@@ -0,0 +1,47 @@
+import argparse
+from app.utils import shards, reminder, health_checkup
+
+SOURCES = {
+    "reminders": (lambda: reminder.REMINDER_FILE, reminder.REMINDER_COLUMNS),
+    "health": (health_checkup.load_health_data, health_checkup.HEALTH_COLUMNS),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the per-member sharded layout for reminders and health data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Split the single data file(s) into per-member shards")
+    migrate.add_argument("dataset", choices=["reminders", "health", "all"])
+    migrate.add_argument("--overwrite", action="store_true", help="Rebuild shards that already exist")
+    unshard = sub.add_parser("unshard", help="Merge shards back into the single data file")
+    unshard.add_argument("dataset", choices=["reminders", "health"])
+    sub.add_parser("status", help="Show sharded datasets with member and row counts")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        for dataset in (SOURCES if args.dataset == "all" else [args.dataset]):
+            source, columns = SOURCES[dataset]
+            try:
+                rows, members = shards.migrate(dataset, source(), columns, overwrite=args.overwrite)
+            except FileExistsError as e:
+                print(f"⚠️ {e} (use --overwrite to rebuild)")
+                continue
+            print(f"✅ {dataset}: {rows} row(s) split into {members} member shard(s).")
+            print(f"   {source()} is no longer read or written; keep it as a backup.")
+    elif args.command == "unshard":
+        if not shards.is_enabled(args.dataset):
+            print(f"📭 {args.dataset} is not sharded.")
+            return
+        rows = shards.unshard(args.dataset, SOURCES[args.dataset][0]())
+        print(f"✅ Merged {rows} {args.dataset} row(s) back into {SOURCES[args.dataset][0]()}.")
+    else:
+        for dataset in SOURCES:
+            if not shards.is_enabled(dataset):
+                print(f"📄 {dataset}: single file")
+                continue
+            counts = shards.map_shards(dataset, shards.count_rows)
+            biggest = max(counts.items(), key=lambda kv: kv[1], default=("-", 0))
+            print(f"🗂️  {dataset}: {len(counts)} member shard(s), {sum(counts.values())} row(s), "
+                  f"largest {biggest[0]} ({biggest[1]})")
+
+if __name__ == "__main__":
+    main()
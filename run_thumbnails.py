@@ -0,0 +1,35 @@
+import time
+import argparse
+from app.utils import thumbnails
+
+def main():
+    parser = argparse.ArgumentParser(description="Build thumbnails for member profile pictures.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Thumbnail new and changed photos")
+    build.add_argument("--photos", default=thumbnails.PHOTO_DIR, help="Member photo directory")
+    build.add_argument("--size", type=int, default=thumbnails.THUMB_SIZE, help="Thumbnail side in pixels")
+    build.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    build.add_argument("--full", action="store_true", help="Regenerate every thumbnail")
+    sub.add_parser("status", help="Show thumbnail counts and sizes")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        report = thumbnails.build(args.photos, size=args.size, workers=args.workers, full=args.full)
+        print(f"✅ {report['photos']} photo(s): {report['generated']} generated, {report['reused']} reused, "
+              f"{report['unchanged']} unchanged, {report['removed']} removed "
+              f"in {time.perf_counter() - start:.1f}s.")
+        for name, error in report["failed"].items():
+            print(f"⚠️ {name}: {error}")
+    else:
+        manifest = thumbnails.load_manifest()
+        photos = manifest["photos"]
+        if not photos:
+            print("📭 No thumbnails yet; run: python run_thumbnails.py build")
+            return
+        sizes = [p["bytes"] for p in photos.values()]
+        print(f"🖼️ {len(photos)} thumbnail(s) at {manifest['size']}px, "
+              f"avg {sum(sizes) / len(sizes) / 1024:.1f} KB, max {max(sizes) / 1024:.1f} KB.")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
+import argparse
 from app.utils import emergency
 
 def main():
-    emergencies = emergency.view_emergencies()
+    parser = argparse.ArgumentParser(description="List emergencies and mark them resolved.")
+    parser.add_argument("--all", action="store_true",
+                        help="Also list resolved emergencies from earlier months")
+    args = parser.parse_args()
+
+    emergencies = emergency.view_emergencies(all_months=args.all)
+    if emergency.older_resolved_hidden(args.all):
+        print("ℹ️ Resolved emergencies from earlier months are hidden; use --all to list them.")
     if not emergencies:
         print("✅ No emergencies at the moment.")
         return
@@ -17,7 +25,7 @@ def main():
     choice = input("Mark any emergency as resolved? (y/n): ").strip().lower()
     if choice == "y":
         index = int(input("Enter emergency number: ")) - 1
-        if emergency.mark_resolved(index):
+        if emergency.mark_resolved(index, all_months=args.all):
             print("✅ Emergency marked as resolved.")
         else:
             print("❌ Invalid selection.")
@@ -0,0 +1,46 @@
+from app.utils import log_partitions, ops_report, reminder
+
+# messaging.MESSAGE_COLUMNS; messaging itself loads the translation stack
+MESSAGE_COLUMNS = ["From", "To", "Message", "Language", "Translation", "Timestamp"]
+MEMBERS = ["Rina Das", "Krishna Dutta", "Sabita Sharma", "Arun Sen"]
+
+def _messages():
+    rows = []
+    for day in range(1, 11):
+        stamp = f"2024-03-{day:02d} 09:00:00"
+        sender = MEMBERS[day % len(MEMBERS)]
+        # a broadcast (collapsed by compaction) and a direct message
+        rows += [{"From": sender, "To": to, "Message": f"Walk on day {day}?", "Language": "en",
+                  "Translation": f"Walk on day {day}?", "Timestamp": stamp} for to in MEMBERS if to != sender]
+        rows.append({"From": sender, "To": MEMBERS[(day + 1) % len(MEMBERS)], "Message": "আজ কেমন আছেন?",
+                     "Language": "bn", "Translation": "[Translation Failed]", "Timestamp": f"2024-03-{day:02d} 18:30:00"})
+    return rows
+
+def _report(part_dir, report_dir, full=False):
+    files = [p for m in log_partitions.months("messages", part_dir=part_dir)
+             for p in log_partitions.partition_files("messages", m, part_dir)]
+    ops_report.update(report_dir, full=full)
+    days = [d for d in ops_report.report_days(report_dir) if d.startswith("2024-03")]
+    return files, {d: ops_report.load_day(d, report_dir)["messages"] for d in days}
+
+def test_report_totals_survive_compaction(tmp_path, monkeypatch):
+    part_dir, report_dir = str(tmp_path / "partitions"), str(tmp_path / "reports")
+    monkeypatch.setattr(ops_report, "incremental_sources", lambda: {"messages": (
+        [p for m in log_partitions.months("messages", part_dir=part_dir)
+         for p in log_partitions.partition_files("messages", m, part_dir)], ops_report._fold_messages)})
+    monkeypatch.setattr(ops_report, "_partitioned_or", lambda log, path: [])
+    monkeypatch.setattr(reminder, "reminder_files", lambda: [])
+    rows = _messages()
+    log_partitions.append("messages", rows, MESSAGE_COLUMNS, part_dir=part_dir)
+
+    files, before = _report(part_dir, report_dir, full=True)
+    assert all(p.endswith(".csv") for p in files)
+    assert sum(day["messages"] for day in before.values()) == len(rows)
+
+    stored_before, stored_after = log_partitions.compact("messages", "2024-03", part_dir=part_dir)
+    assert stored_after < stored_before  # broadcasts were collapsed
+    files, after = _report(part_dir, report_dir)  # the replaced file rebuilds the source
+    assert all(p.endswith(".csv.gz") for p in files)
+    assert after == before
+    assert sum(day["messages"] for day in after.values()) == \
+        len(log_partitions.read_rows("messages", part_dir=part_dir)) == len(rows)